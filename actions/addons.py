@@ -1,14 +1,9 @@
+from utils.connection_db import borrow_connection, stream_rows
+
+
 class AddonsQuery:
-    
-    def __init__(self, db_connection):
-        self.db_connection = db_connection
 
-    def select_leads_clientes_suporte(self):
-        """
-        Consulta combinando as tabelas leads, clientes e suporte.
-        Retorna informações do cliente, do lead original e dos chamados de suporte.
-        """
-        query = """
+    LEADS_CLIENTES_SUPORTE_QUERY = """
         SELECT
             l.id_lead,
             l.nome AS nome_lead,
@@ -25,19 +20,49 @@ class AddonsQuery:
         ORDER BY s.data_solicitacao DESC;
         """
 
-        cursor = self.db_connection.cursor()
-        
-        try:
-            cursor.execute(query)
-            results = cursor.fetchall()
-            print("Consulta executada com sucesso.\n")
-            for row in results:
-                print(row)
-            return results
-        
-        except Exception as e:
-            print(f"Erro ao executar consulta com JOIN triplo: {e}")
-            return []
-        
-        finally:
-            cursor.close()
+    def __init__(self, db_connection):
+        """
+        Args:
+            db_connection: Conexão psycopg2 aberta ou `ConnectionDB` (com ou sem pool).
+        """
+        self.db_connection = db_connection
+
+    def select_leads_clientes_suporte(self, stream=False, itersize=2000):
+        """
+        Consulta combinando as tabelas leads, clientes e suporte.
+        Retorna informações do cliente, do lead original e dos chamados de suporte.
+
+        Args:
+            stream (bool, optional): Se True, retorna um gerador apoiado em cursor
+                server-side (ver `stream_leads_clientes_suporte`).
+            itersize (int, optional): Linhas buscadas por lote no modo streaming.
+        """
+        if stream:
+            return self.stream_leads_clientes_suporte(itersize)
+
+        query = self.LEADS_CLIENTES_SUPORTE_QUERY
+
+        with borrow_connection(self.db_connection) as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute(query)
+                results = cursor.fetchall()
+                print("Consulta executada com sucesso.\n")
+                for row in results:
+                    print(row)
+                return results
+
+            except Exception as e:
+                print(f"Erro ao executar consulta com JOIN triplo: {e}")
+                return []
+
+            finally:
+                cursor.close()
+
+    def stream_leads_clientes_suporte(self, itersize=2000):
+        """
+        Versão em streaming de `select_leads_clientes_suporte`: gera as linhas
+        a partir de um cursor nomeado, em memória constante e sem imprimi-las.
+        """
+        yield from stream_rows(self.db_connection, self.LEADS_CLIENTES_SUPORTE_QUERY, itersize=itersize)
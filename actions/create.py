@@ -1,14 +1,192 @@
+import re
+from datetime import date, datetime
+
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from actions.statements import reset_catalog
+from utils.connection_db import borrow_connection
+
+
+# Índices de apoio: (nome, tabela, método, colunas, condição do índice parcial)
+INDICES = [
+    # Chaves estrangeiras (joins das consultas e exclusões em cascata)
+    ("idx_suporte_cliente_data", "suporte", "btree", "id_cliente, data_solicitacao", None),
+    ("idx_clientes_id_lead", "clientes", "btree", "id_lead", None),
+    ("idx_financeiro_id_projeto", "financeiro", "btree", "id_projeto", None),
+    ("idx_tarefas_id_projeto", "tarefas", "btree", "id_projeto", None),
+    ("idx_conta_a_receber_id_cliente", "conta_a_receber", "btree", "id_cliente", None),
+    ("idx_contrato_cpf_responsavel", "contrato", "btree", "cpf_responsavel", None),
+    ("idx_cliente_contrato_id_contrato", "cliente_contrato", "btree", "id_contrato", None),
+    ("idx_usuario_projeto_id_projeto", "usuario_projeto", "btree", "id_projeto", None),
+    ("idx_usuario_tarefa_id_tarefa", "usuario_tarefa", "btree", "id_tarefa", None),
+
+    # Índices parciais para os filtros por status/prioridade
+    ("idx_tarefas_pendentes", "tarefas", "btree", "id_projeto", "status = 'Pendente'"),
+    ("idx_tarefas_alta_prioridade", "tarefas", "btree", "id_projeto", "prioridade = 'Alta'"),
+    ("idx_conta_a_pagar_pendentes", "conta_a_pagar", "btree", "data_vencimento", "status = 'Pendente'"),
+    ("idx_conta_a_receber_pendentes", "conta_a_receber", "btree", "data_recebimento", "status = 'Pendente'"),
+
+    # Compostos na mesma ordem das listagens (ordenação + chave primária)
+    ("idx_suporte_data_solicitacao", "suporte", "btree", "data_solicitacao DESC, id_chamado DESC", None),
+    ("idx_financeiro_data", "financeiro", "btree", "data DESC, id_financeiro DESC", None),
+    ("idx_conta_a_pagar_vencimento", "conta_a_pagar", "btree", "data_vencimento DESC, id_conta_pagar DESC", None),
+    ("idx_conta_a_receber_recebimento", "conta_a_receber", "btree", "data_recebimento DESC NULLS LAST, id_conta_receber DESC", None),
+]
+
+
+# Busca textual: colunas tsvector (dicionário português) geradas a partir dos
+# campos de texto, e índices GIN para elas e para busca por trigramas (pg_trgm)
+COLUNAS_BUSCA = {
+    "leads": ("nome", "email"),
+    "clientes": ("nome", "email"),
+    "suporte": ("nome_pedido", "descricao"),
+}
+
+INDICES_BUSCA = [
+    ("idx_leads_busca", "leads", "gin", "busca", None),
+    ("idx_leads_nome_trgm", "leads", "gin", "nome gin_trgm_ops", None),
+    ("idx_leads_email_trgm", "leads", "gin", "email gin_trgm_ops", None),
+    ("idx_leads_cpf_trgm", "leads", "gin", "cpf gin_trgm_ops", None),
+    ("idx_clientes_busca", "clientes", "gin", "busca", None),
+    ("idx_clientes_nome_trgm", "clientes", "gin", "nome gin_trgm_ops", None),
+    ("idx_clientes_email_trgm", "clientes", "gin", "email gin_trgm_ops", None),
+    ("idx_clientes_cpf_trgm", "clientes", "gin", "cpf gin_trgm_ops", None),
+    ("idx_suporte_busca", "suporte", "gin", "busca", None),
+    ("idx_suporte_nome_pedido_trgm", "suporte", "gin", "nome_pedido gin_trgm_ops", None),
+]
+
+
+# Tabela de suporte particionada por mês de data_solicitacao. A chave
+# primária precisa conter a coluna de partição; id_chamado continua único
+# por vir da sequência. Linhas fora das partições criadas vão para a DEFAULT.
+SUPORTE_PARTICIONADO = [
+    """
+    CREATE TABLE IF NOT EXISTS suporte (
+        id_chamado SERIAL,
+        nome_pedido VARCHAR(100) NOT NULL,
+        responsavel_solicitacao VARCHAR(100),
+        descricao TEXT,
+        data_solicitacao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        id_cliente INT NOT NULL,
+        PRIMARY KEY (id_chamado, data_solicitacao),
+        FOREIGN KEY (id_cliente) REFERENCES clientes (id_cliente) ON DELETE CASCADE
+    ) PARTITION BY RANGE (data_solicitacao);
+    """,
+    "CREATE TABLE IF NOT EXISTS suporte_default PARTITION OF suporte DEFAULT;",
+]
+
+# Arquivo: linhas antigas de suporte e financeiro movidas por
+# `manage.py arquivar` (core/archive.py). O resumo guarda os totais por projeto
+# do financeiro arquivado, somados aos das linhas ativas no relatório; as views
+# *_com_arquivo unem as linhas ativas e arquivadas (coluna `arquivado`).
+SUPORTE_COM_ARQUIVO = """
+    CREATE OR REPLACE VIEW suporte_com_arquivo AS
+    SELECT id_chamado, nome_pedido, responsavel_solicitacao, descricao, data_solicitacao, id_cliente,
+           FALSE AS arquivado
+    FROM suporte
+    UNION ALL
+    SELECT id_chamado, nome_pedido, responsavel_solicitacao, descricao, data_solicitacao, id_cliente,
+           TRUE AS arquivado
+    FROM suporte_arquivo;
+"""
+
+ARQUIVO_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS suporte_arquivo (
+        id_chamado INT PRIMARY KEY,
+        nome_pedido VARCHAR(100) NOT NULL,
+        responsavel_solicitacao VARCHAR(100),
+        descricao TEXT,
+        data_solicitacao TIMESTAMP NOT NULL,
+        id_cliente INT NOT NULL,
+        FOREIGN KEY (id_cliente) REFERENCES clientes (id_cliente) ON DELETE CASCADE
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_suporte_arquivo_data ON suporte_arquivo (data_solicitacao DESC, id_chamado DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_suporte_arquivo_cliente ON suporte_arquivo (id_cliente);",
+    """
+    CREATE TABLE IF NOT EXISTS financeiro_arquivo (
+        id_financeiro INT PRIMARY KEY,
+        descricao VARCHAR(200),
+        valor DECIMAL(10, 2) NOT NULL,
+        data DATE,
+        tipo VARCHAR(50),
+        id_projeto INT,
+        FOREIGN KEY (id_projeto) REFERENCES projeto (id_projeto) ON DELETE SET NULL
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_financeiro_arquivo_data ON financeiro_arquivo (data DESC, id_financeiro DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_financeiro_arquivo_projeto ON financeiro_arquivo (id_projeto);",
+    """
+    CREATE TABLE IF NOT EXISTS financeiro_arquivo_resumo (
+        id_projeto INT PRIMARY KEY,
+        total_registros BIGINT NOT NULL DEFAULT 0,
+        total_receitas NUMERIC NOT NULL DEFAULT 0,
+        total_despesas NUMERIC NOT NULL DEFAULT 0,
+        saldo NUMERIC NOT NULL DEFAULT 0,
+        soma_valor NUMERIC NOT NULL DEFAULT 0,
+        FOREIGN KEY (id_projeto) REFERENCES projeto (id_projeto) ON DELETE CASCADE
+    );
+    """,
+    SUPORTE_COM_ARQUIVO,
+    """
+    CREATE OR REPLACE VIEW financeiro_com_arquivo AS
+    SELECT id_financeiro, descricao, valor, data, tipo, id_projeto, FALSE AS arquivado
+    FROM financeiro
+    UNION ALL
+    SELECT id_financeiro, descricao, valor, data, tipo, id_projeto, TRUE AS arquivado
+    FROM financeiro_arquivo;
+    """,
+]
+
+# Meses futuros com partição criada de antemão
+MESES_FUTUROS = 3
+
+
+def month_start(value):
+    """Primeiro dia do mês de `value` (date ou datetime)."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Primeiro dia do mês `months` meses após o mês de `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    """Nome da partição mensal, ex.: suporte_2025_03."""
+    return f"{table}_{month.year:04d}_{month.month:02d}"
+
+
 class CreateTables:
     """
     Classe responsável por criar todas as tabelas do sistema Wevo Media.
     Baseado no esquema do banco de dados completo.
+
+    Aceita uma conexão psycopg2 aberta ou um `ConnectionDB` (com ou sem pool),
+    do qual uma conexão é emprestada durante a execução.
+
+    Com `partitioned_suporte=True`, a tabela `suporte` é criada particionada
+    por mês de `data_solicitacao` (ver `create_suporte_partitions`).
     """
 
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, partitioned_suporte=False):
         self.db_connection = db_connection
+        self.partitioned_suporte = partitioned_suporte
 
     def execute(self):
-        cursor = self.db_connection.cursor()
+        """
+        Cria as tabelas e o arquivo. Erros nas tabelas são apenas informados
+        (em um banco existente, os ALTER TABLE das restrições falham).
+
+        Raises:
+            psycopg2.Error: Se as tabelas ou views de arquivo não puderem ser criadas.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            self._execute(conn)
+
+    def _execute(self, conn):
+        cursor = conn.cursor()
 
         tabelas_sql = [
             # Tabela de Leads
@@ -190,16 +368,418 @@ class CreateTables:
             """,
         ]
 
+        if self.partitioned_suporte:
+            posicao = next(i for i, sql_cmd in enumerate(tabelas_sql) if "CREATE TABLE IF NOT EXISTS suporte" in sql_cmd)
+            tabelas_sql[posicao:posicao + 1] = SUPORTE_PARTICIONADO
+
         try:
             for sql_cmd in tabelas_sql:
                 cursor.execute(sql_cmd)
+            if self.partitioned_suporte:
+                self._create_partitions(cursor, "suporte", month_start(date.today()), MESES_FUTUROS)
 
-            self.db_connection.commit()
+            conn.commit()
             print("Todas as tabelas foram criadas com sucesso!")
 
         except Exception as e:
-            self.db_connection.rollback()
+            conn.rollback()
             print(f"Erro ao criar tabelas: {e}")
 
         finally:
             cursor.close()
+
+        # Em transação própria: em um banco existente os ALTER TABLE ... ADD
+        # CONSTRAINT acima falham, e o arquivo ainda precisa ser criado. Uma
+        # falha aqui é propagada (as telas dependem das views *_com_arquivo)
+        self._create_archive(conn)
+
+    def create_indexes(self, only_missing=True, indexes=INDICES):
+        """
+        Cria os índices de apoio definidos em INDICES com
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS, sem bloquear escritas.
+
+        O CONCURRENTLY não pode rodar dentro de uma transação, então a conexão
+        é colocada em autocommit durante a criação. Índices inválidos (deixados
+        por uma criação concorrente interrompida) são removidos e recriados.
+        Em tabelas particionadas o PostgreSQL não aceita CONCURRENTLY: o índice
+        é criado normalmente (em todas as partições, bloqueando escritas).
+
+        Args:
+            only_missing (bool, optional): Cria apenas os índices ausentes ou inválidos.
+            indexes (list, optional): Definições a considerar (padrão: INDICES).
+
+        Returns:
+            list: Nomes dos índices criados.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            pending = self._missing_indexes(conn, indexes) if only_missing else [
+                {"nome": nome, "invalido": False} for nome, _, _, _, _ in indexes
+            ]
+            if not pending:
+                print("Todos os índices já existem.")
+                return []
+
+            definitions = {nome: (tabela, metodo, colunas, condicao) for nome, tabela, metodo, colunas, condicao in indexes}
+            previous_autocommit = conn.autocommit
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = True
+            created = []
+
+            try:
+                with conn.cursor() as cursor:
+                    partitioned = self._partitioned_tables(cursor, {tabela for tabela, _, _, _ in definitions.values()})
+                    for index in pending:
+                        nome = index["nome"]
+                        tabela, metodo, colunas, condicao = definitions[nome]
+                        concurrently = "" if tabela in partitioned else " CONCURRENTLY"
+
+                        if index["invalido"]:
+                            cursor.execute(f"DROP INDEX{concurrently} IF EXISTS {nome};")
+
+                        sql_cmd = (
+                            f"CREATE INDEX{concurrently} IF NOT EXISTS {nome} "
+                            f"ON {tabela} USING {metodo} ({colunas})"
+                        )
+                        if condicao:
+                            sql_cmd += f" WHERE {condicao}"
+                        cursor.execute(sql_cmd + ";")
+                        created.append(nome)
+                        print(f"Índice '{nome}' criado em '{tabela}'.")
+
+            except Exception as e:
+                print(f"Erro ao criar índices: {e}")
+                raise
+
+            finally:
+                conn.autocommit = previous_autocommit
+
+            return created
+
+    def missing_indexes(self, indexes=INDICES + INDICES_BUSCA):
+        """
+        Lista os índices (de INDICES e INDICES_BUSCA) que não existem ou estão inválidos no banco.
+
+        Returns:
+            list[dict]: {"nome", "tabela", "metodo", "colunas", "condicao", "invalido"} de cada índice pendente.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            return self._missing_indexes(conn, indexes)
+
+    def _missing_indexes(self, conn, indexes):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT c.relname, i.indisvalid
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                WHERE c.relname = ANY(%s)
+                  AND pg_table_is_visible(c.oid);
+                """,
+                ([nome for nome, _, _, _, _ in indexes],)
+            )
+            existing = dict(cursor.fetchall())
+
+        return [
+            {"nome": nome, "tabela": tabela, "metodo": metodo, "colunas": colunas,
+             "condicao": condicao, "invalido": nome in existing}
+            for nome, tabela, metodo, colunas, condicao in indexes
+            if not existing.get(nome)
+        ]
+
+    def create_search(self):
+        """
+        Prepara a busca textual: habilita a extensão pg_trgm, adiciona as colunas
+        `busca` (tsvector gerado, dicionário 'portuguese') definidas em
+        COLUNAS_BUSCA e cria os índices GIN de INDICES_BUSCA.
+
+        Atenção: adicionar uma coluna gerada reescreve a tabela.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            cursor = conn.cursor()
+
+            try:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+                for tabela, colunas in COLUNAS_BUSCA.items():
+                    documento = " || ' ' || ".join(f"coalesce({coluna}, '')" for coluna in colunas)
+                    cursor.execute(
+                        f"""
+                        ALTER TABLE {tabela}
+                        ADD COLUMN IF NOT EXISTS busca tsvector
+                        GENERATED ALWAYS AS (to_tsvector('portuguese', {documento})) STORED;
+                        """
+                    )
+                conn.commit()
+                print("Colunas de busca criadas com sucesso!")
+
+            except Exception as e:
+                conn.rollback()
+                print(f"Erro ao preparar a busca: {e}")
+                raise
+
+            finally:
+                cursor.close()
+
+        return self.create_indexes(indexes=INDICES_BUSCA)
+
+    def create_archive(self):
+        """
+        Cria as tabelas de arquivo (suporte_arquivo, financeiro_arquivo e o
+        resumo do financeiro arquivado) e as views *_com_arquivo, para bancos
+        criados antes delas.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            self._create_archive(conn)
+
+    def _create_archive(self, conn):
+        # Todos os comandos de ARQUIVO_SQL são idempotentes
+        cursor = conn.cursor()
+        try:
+            for sql_cmd in ARQUIVO_SQL:
+                cursor.execute(sql_cmd)
+            conn.commit()
+            print("Tabelas de arquivo criadas com sucesso!")
+        except Exception as e:
+            conn.rollback()
+            print(f"Erro ao criar tabelas de arquivo: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    # =========================================================================
+    # PARTICIONAMENTO DE SUPORTE
+    # =========================================================================
+
+    @staticmethod
+    def _partitioned_tables(cursor, tables):
+        cursor.execute(
+            """
+            SELECT relname FROM pg_class
+            WHERE relkind = 'p' AND relname = ANY(%s) AND pg_table_is_visible(oid);
+            """,
+            (list(tables),)
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+    def is_partitioned(self, table="suporte"):
+        """Se a tabela existe e é particionada."""
+        with borrow_connection(self.db_connection) as conn:
+            with conn.cursor() as cursor:
+                return bool(self._partitioned_tables(cursor, [table]))
+
+    @staticmethod
+    def _create_partitions(cursor, table, start, months):
+        """Cria as partições mensais de `start` até `months` meses após o mês atual."""
+        created = []
+        last = add_months(date.today(), months)
+        month = month_start(start)
+        while month <= last:
+            name = partition_name(table, month)
+            cursor.execute("SELECT to_regclass(%s) IS NULL;", (name,))
+            if cursor.fetchone()[0]:
+                cursor.execute(
+                    f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s);",
+                    (month, add_months(month, 1))
+                )
+                created.append(name)
+            month = add_months(month, 1)
+        return created
+
+    def create_suporte_partitions(self, months_ahead=MESES_FUTUROS, start=None):
+        """
+        Cria as partições mensais de `suporte` que ainda não existem, do mês de
+        `start` (padrão: o mês atual) até `months_ahead` meses no futuro.
+
+        Meses que já têm linhas na partição DEFAULT não podem ganhar partição
+        própria (o PostgreSQL recusa); mantenha partições futuras criadas para
+        que a DEFAULT fique vazia.
+
+        Returns:
+            list: Nomes das partições criadas.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            cursor = conn.cursor()
+            try:
+                created = self._create_partitions(cursor, "suporte", start or date.today(), months_ahead)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Erro ao criar partições: {e}")
+                raise
+            finally:
+                cursor.close()
+
+        for name in created:
+            print(f"Partição '{name}' criada.")
+        return created
+
+    def suporte_partitions(self):
+        """
+        Partições de `suporte`, da mais antiga para a mais recente.
+
+        Returns:
+            list[dict]: {"nome", "inicio", "fim", "default"}; limites None são
+                MINVALUE/MAXVALUE (a partição DEFAULT vem por último).
+        """
+        with borrow_connection(self.db_connection) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass('suporte');
+                    """
+                )
+                rows = cursor.fetchall()
+
+        def bound(value):
+            value = value.strip()
+            return None if value in ("MINVALUE", "MAXVALUE") else datetime.fromisoformat(value.strip("'")).date()
+
+        partitions = []
+        for name, expression in rows:
+            match = re.search(r"FROM \((.+?)\) TO \((.+?)\)", expression)
+            inicio, fim = (bound(match.group(1)), bound(match.group(2))) if match else (None, None)
+            partitions.append({"nome": name, "inicio": inicio, "fim": fim, "default": match is None})
+
+        partitions.sort(key=lambda p: (p["default"], p["inicio"] or date.min))
+        return partitions
+
+    def detach_suporte_partitions(self, keep_months):
+        """
+        Desanexa as partições de `suporte` cujo período terminou há mais de
+        `keep_months` meses. O desanexo só altera o catálogo, mas exige um
+        bloqueio exclusivo breve em `suporte`: o DETACH PARTITION CONCURRENTLY
+        (PostgreSQL 14+), que não bloqueia, não é permitido quando existe uma
+        partição DEFAULT.
+
+        As partições desanexadas continuam no banco como tabelas comuns (com o
+        mesmo nome), fora das consultas do sistema; podem ser arquivadas ou
+        removidas depois.
+
+        Returns:
+            list: Nomes das partições desanexadas.
+        """
+        cutoff = add_months(date.today(), -keep_months)
+        partitions = self.suporte_partitions()
+        old = [
+            partition["nome"] for partition in partitions
+            if partition["fim"] is not None and partition["fim"] <= cutoff
+        ]
+        if not old:
+            return []
+        concurrently = "" if any(partition["default"] for partition in partitions) else " CONCURRENTLY"
+
+        with borrow_connection(self.db_connection) as conn:
+            previous_autocommit = conn.autocommit
+            if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    for name in old:
+                        cursor.execute(f"ALTER TABLE suporte DETACH PARTITION {name}{concurrently};")
+                        print(f"Partição '{name}' desanexada.")
+            finally:
+                conn.autocommit = previous_autocommit
+        return old
+
+    def partition_suporte(self, months_ahead=MESES_FUTUROS):
+        """
+        Converte uma tabela `suporte` comum na versão particionada, sem copiar
+        as linhas: a tabela atual vira a partição `suporte_historico` (do início
+        até o mês do chamado mais recente) e os meses seguintes ganham
+        partições mensais.
+
+        Roda em uma transação com bloqueio exclusivo em `suporte`, que percorre
+        a tabela para validar o limite da partição histórica e para criar o
+        índice da nova chave primária (id_chamado, data_solicitacao).
+        A view `suporte_com_arquivo` é recriada aqui; as demais (inclusive
+        materializadas) que leem `suporte` continuam apontando para
+        `suporte_historico` e devem ser recriadas.
+
+        Returns:
+            bool: False se a tabela já era particionada.
+        """
+        with borrow_connection(self.db_connection) as conn:
+            cursor = conn.cursor()
+            try:
+                if self._partitioned_tables(cursor, ["suporte"]):
+                    print("A tabela 'suporte' já é particionada.")
+                    return False
+
+                cursor.execute("LOCK TABLE suporte IN ACCESS EXCLUSIVE MODE;")
+                cursor.execute(
+                    """
+                    SELECT COALESCE(date_trunc('month', MAX(data_solicitacao)) + INTERVAL '1 month',
+                                    date_trunc('month', CURRENT_DATE))::date,
+                           pg_get_serial_sequence('suporte', 'id_chamado')
+                    FROM suporte;
+                    """
+                )
+                limite, sequence = cursor.fetchone()
+
+                cursor.execute("ALTER TABLE suporte RENAME TO suporte_historico;")
+                cursor.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = 'suporte_historico'::regclass AND contype = 'p';"
+                )
+                for (constraint,) in cursor.fetchall():
+                    cursor.execute(f"ALTER TABLE suporte_historico RENAME CONSTRAINT {constraint} TO suporte_historico_pkey;")
+                # Os índices do sistema passam a existir na tabela particionada; os
+                # da partição histórica ganham outro nome e são anexados a eles
+                cursor.execute(
+                    """
+                    SELECT c.relname FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE i.indrelid = 'suporte_historico'::regclass AND c.relname LIKE 'idx\\_suporte\\_%';
+                    """
+                )
+                for (index,) in cursor.fetchall():
+                    cursor.execute(f"ALTER INDEX {index} RENAME TO {index.replace('idx_suporte_', 'idx_suporte_historico_', 1)};")
+
+                cursor.execute("ALTER TABLE suporte_historico ALTER COLUMN data_solicitacao SET NOT NULL;")
+                cursor.execute(
+                    "ALTER TABLE suporte_historico ADD CONSTRAINT suporte_historico_limite "
+                    "CHECK (data_solicitacao < %s);",
+                    (limite,)
+                )
+                cursor.execute(
+                    """
+                    CREATE TABLE suporte (
+                        LIKE suporte_historico INCLUDING DEFAULTS INCLUDING GENERATED
+                    ) PARTITION BY RANGE (data_solicitacao);
+                    """
+                )
+                cursor.execute("ALTER TABLE suporte ADD PRIMARY KEY (id_chamado, data_solicitacao);")
+                cursor.execute(
+                    "ALTER TABLE suporte ADD FOREIGN KEY (id_cliente) "
+                    "REFERENCES clientes (id_cliente) ON DELETE CASCADE;"
+                )
+                if sequence:
+                    cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY suporte.id_chamado;")
+                # A CHECK já garante o limite: o ATTACH não percorre a tabela de novo
+                cursor.execute(
+                    "ALTER TABLE suporte ATTACH PARTITION suporte_historico FOR VALUES FROM (MINVALUE) TO (%s);",
+                    (limite,)
+                )
+                cursor.execute("ALTER TABLE suporte_historico DROP CONSTRAINT suporte_historico_limite;")
+                cursor.execute(SUPORTE_PARTICIONADO[1])
+                created = self._create_partitions(cursor, "suporte", limite, months_ahead)
+                cursor.execute("SELECT to_regclass('suporte_com_arquivo') IS NOT NULL;")
+                if cursor.fetchone()[0]:
+                    cursor.execute(SUPORTE_COM_ARQUIVO)
+
+                conn.commit()
+                # A chave primária de `suporte` passou a ser (id_chamado, data_solicitacao)
+                reset_catalog()
+            except Exception as e:
+                conn.rollback()
+                print(f"Erro ao particionar 'suporte': {e}")
+                raise
+            finally:
+                cursor.close()
+
+        print(f"'suporte' particionada: histórico até {limite}, {len(created)} partição(ões) mensal(is) criada(s).")
+        self.create_indexes(indexes=[index for index in INDICES + INDICES_BUSCA if index[1] == "suporte"])
+        return True
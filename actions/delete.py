@@ -1,9 +1,57 @@
+from psycopg2 import sql
+
+from actions.statements import compiled, where
+
+
 class DeleteQuery:
     def __init__(self, table_name, conditions):
+        """
+        Args:
+            table_name (str): Nome da tabela.
+            conditions (dict): Condições {coluna: valor} (ver `actions.statements.where`).
+        """
         self.table_name = table_name
         self.conditions = conditions
 
     def build_query(self):
-        condition_str = ' AND '.join(f"{key}='{value}'" for key, value in self.conditions.items())
-        query = f"DELETE FROM {self.table_name} WHERE {condition_str};"
-        return query
\ No newline at end of file
+        """
+        Returns:
+            tuple: (Statement compilado, lista de parâmetros)
+        """
+        if not self.conditions:
+            raise ValueError("DeleteQuery exige ao menos uma condição.")
+
+        conditions, params, condition_shape = where(self.conditions)
+
+        def build():
+            return sql.SQL("DELETE FROM {} WHERE {}").format(
+                sql.Identifier(self.table_name), conditions
+            )
+
+        return compiled(("delete", self.table_name, condition_shape), build), params
+
+    def build_batch_query(self, key, batch_size):
+        """
+        Monta a exclusão de um lote: no máximo `batch_size` linhas que atendem
+        às condições, escolhidas pela chave `key`.
+
+        As linhas bloqueadas por outras transações são puladas (SKIP LOCKED),
+        para que a limpeza não espere nem bloqueie a aplicação.
+
+        Returns:
+            tuple: (Statement compilado com `RETURNING key`, lista de parâmetros)
+        """
+        if not self.conditions:
+            raise ValueError("DeleteQuery exige ao menos uma condição.")
+
+        conditions, params, condition_shape = where(self.conditions)
+
+        def build():
+            return sql.SQL(
+                "DELETE FROM {table} WHERE {key} = ANY(ARRAY("
+                "SELECT {key} FROM {table} WHERE {conditions} LIMIT %s FOR UPDATE SKIP LOCKED"
+                ")) RETURNING {key}"
+            ).format(table=sql.Identifier(self.table_name), key=sql.Identifier(key), conditions=conditions)
+
+        statement = compiled(("delete_batch", self.table_name, key, condition_shape), build)
+        return statement, params + [batch_size]
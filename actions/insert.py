@@ -1,11 +1,162 @@
+import csv
+import io
+
+from psycopg2 import sql
+
+from actions.statements import column_list, compiled
+
+
+# Regras de mesclagem do upsert: valor final da coluna quando o registro já existe
+MERGE_RULES = {
+    "overwrite": "EXCLUDED.{0}",                # sempre o valor novo
+    "coalesce": "COALESCE(EXCLUDED.{0}, t.{0})",  # o novo, se não for NULL
+    "fill": "COALESCE(t.{0}, EXCLUDED.{0})",      # o atual, se não for NULL
+    "keep": None,                               # nunca altera
+}
+
+
 class InsertQuery:
     def __init__(self, table_name, data):
+        """
+        Args:
+            table_name (str): Nome da tabela.
+            data (dict | list[dict]): Um registro (para `build_query`) ou uma lista
+                de registros com as mesmas chaves (para as consultas em lote).
+        """
         self.table_name = table_name
         self.data = data
 
     def build_query(self):
-        columns = ', '.join(self.data.keys())
-        placeholders = ', '.join(['%s'] * len(self.data))
-        query = f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})"
-        values = tuple(self.data.values())
-        return query, values
\ No newline at end of file
+        """
+        Returns:
+            tuple: (Statement compilado, tupla de valores)
+        """
+        columns = tuple(self.data.keys())
+
+        def build():
+            return sql.SQL("INSERT INTO {} ({}) VALUES ({})").format(
+                sql.Identifier(self.table_name),
+                column_list(columns),
+                sql.SQL(', ').join(sql.Placeholder() * len(columns)),
+            )
+
+        statement = compiled(("insert", self.table_name, columns), build)
+        return statement, tuple(self.data.values())
+
+    def columns(self):
+        """Colunas do lote, na ordem das chaves do primeiro registro."""
+        columns = list(self.data[0].keys())
+        for row in self.data:
+            if len(row) != len(columns) or any(col not in row for col in columns):
+                raise ValueError("Todos os registros do lote devem ter as mesmas colunas.")
+        return columns
+
+    def build_values_query(self, returning=None):
+        """
+        Monta um INSERT multi-linha para `psycopg2.extras.execute_values`.
+
+        Args:
+            returning (str, optional): Coluna a ser retornada (ex.: a chave primária).
+
+        Returns:
+            tuple: (Statement compilado com um único `VALUES %s`, lista de tuplas de valores)
+        """
+        columns = tuple(self.columns())
+
+        def build():
+            query = sql.SQL("INSERT INTO {} ({}) VALUES %s").format(
+                sql.Identifier(self.table_name), column_list(columns)
+            )
+            if returning:
+                query += sql.SQL(" RETURNING {}").format(sql.Identifier(returning))
+            return query
+
+        # O execute_values expande o `VALUES %s`, então o comando não é preparável
+        statement = compiled(("insert_values", self.table_name, columns, returning), build, preparable=False)
+        values = [tuple(row[col] for col in columns) for row in self.data]
+        return statement, values
+
+    def build_upsert_query(self, conflict="cpf", merge=None, default="overwrite"):
+        """
+        Monta um `INSERT ... ON CONFLICT (conflict) DO UPDATE` multi-linha para
+        `psycopg2.extras.execute_values`.
+
+        Linhas cujo resultado da mesclagem é igual ao registro atual não são
+        reescritas (`WHERE ... IS DISTINCT FROM`), de modo que reimportar os
+        mesmos dados não gera escrita nem WAL.
+
+        Args:
+            conflict (str): Coluna com restrição UNIQUE usada como chave.
+            merge (dict, optional): Regra por coluna {coluna: regra} (ver MERGE_RULES).
+            default (str, optional): Regra das colunas não listadas em `merge`.
+
+        Returns:
+            tuple: (Statement compilado com `RETURNING (xmax = 0)` — True para
+            inseridos, False para atualizados —, lista de tuplas de valores)
+        """
+        columns = tuple(self.columns())
+        if conflict not in columns:
+            raise ValueError(f"Os registros devem conter a coluna de conflito '{conflict}'.")
+
+        merge = merge or {}
+        rules = tuple((col, merge.get(col, default)) for col in columns if col != conflict)
+        invalid = {rule for _, rule in rules} - set(MERGE_RULES)
+        if invalid:
+            raise ValueError(f"Regra(s) de mesclagem inválida(s): {invalid} (use {list(MERGE_RULES)}).")
+        updates = [(col, MERGE_RULES[rule]) for col, rule in rules if MERGE_RULES[rule]]
+
+        def build():
+            query = sql.SQL("INSERT INTO {} AS t ({}) VALUES %s ON CONFLICT ({}) ").format(
+                sql.Identifier(self.table_name), column_list(columns), sql.Identifier(conflict)
+            )
+            if not updates:
+                return query + sql.SQL("DO NOTHING RETURNING (xmax = 0)")
+
+            targets = [sql.Identifier(col) for col, _ in updates]
+            expressions = [sql.SQL(expr).format(sql.Identifier(col)) for col, expr in updates]
+            return query + sql.SQL(
+                "DO UPDATE SET ({targets}) = ROW({expressions}) "
+                "WHERE ({current}) IS DISTINCT FROM ({expressions}) "
+                "RETURNING (xmax = 0)"
+            ).format(
+                targets=sql.SQL(", ").join(targets),
+                expressions=sql.SQL(", ").join(expressions),
+                current=sql.SQL(", ").join(sql.SQL("t.{}").format(target) for target in targets),
+            )
+
+        statement = compiled(("upsert", self.table_name, columns, conflict, rules), build, preparable=False)
+        values = [tuple(row[col] for col in columns) for row in self.data]
+        return statement, values
+
+    def build_copy(self, extra_columns=None):
+        """
+        Monta um `COPY ... FROM STDIN` em CSV e o buffer em memória com os dados.
+
+        None é escrito sem aspas (lido como NULL pelo COPY) e os demais valores
+        entre aspas, preservando strings vazias.
+
+        Args:
+            extra_columns (dict, optional): Colunas adicionais {nome: lista de valores},
+                uma entrada por registro (ex.: ids pré-alocados da sequência).
+
+        Returns:
+            tuple: (Statement compilado do COPY, io.StringIO posicionado no início)
+        """
+        columns = self.columns()
+        extra_columns = extra_columns or {}
+        all_columns = list(extra_columns.keys()) + columns
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL, lineterminator='\n')
+        extras = list(zip(*extra_columns.values())) if extra_columns else [()] * len(self.data)
+        for extra, row in zip(extras, self.data):
+            writer.writerow(list(extra) + [row[col] for col in columns])
+        buffer.seek(0)
+
+        def build():
+            return sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                sql.Identifier(self.table_name), column_list(all_columns)
+            )
+
+        statement = compiled(("copy", self.table_name, tuple(all_columns)), build, preparable=False)
+        return statement, buffer
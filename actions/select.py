@@ -1,11 +1,47 @@
+from psycopg2 import sql
+
+from actions.statements import column_list, compiled, where
+
+
 class SelectQuery:
     def __init__(self, table_name, columns=None, where_clause=None):
+        """
+        Args:
+            table_name (str): Nome da tabela.
+            columns (list, optional): Colunas a retornar (padrão: todas).
+            where_clause (dict | str, optional): Condições {coluna: valor}, sempre
+                enviadas como parâmetros (ver `actions.statements.where`), ou um
+                trecho SQL fixo, sem valores do usuário.
+        """
         self.table_name = table_name
         self.columns = columns if columns is not None else ['*']
         self.where_clause = where_clause
 
     def build_query(self):
-        query = f"SELECT {', '.join(self.columns)} FROM {self.table_name}"
-        if self.where_clause:
-            query += f" WHERE {self.where_clause}"
-        return query
\ No newline at end of file
+        """
+        Returns:
+            tuple: (Statement compilado, lista de parâmetros)
+        """
+        all_columns = list(self.columns) == ['*']
+        conditions, params, condition_shape = sql.SQL(''), [], ()
+
+        if isinstance(self.where_clause, dict) and self.where_clause:
+            conditions, params, condition_shape = where(self.where_clause)
+        elif isinstance(self.where_clause, str) and self.where_clause:
+            conditions, condition_shape = sql.SQL(self.where_clause), self.where_clause
+
+        def build():
+            query = sql.SQL("SELECT {} FROM {}").format(
+                sql.SQL('*') if all_columns else column_list(self.columns),
+                sql.Identifier(self.table_name),
+            )
+            if condition_shape:
+                query += sql.SQL(" WHERE {}").format(conditions)
+            return query
+
+        shape = ("select", self.table_name, tuple(self.columns), condition_shape)
+        # SELECT * não é preparado: o tipo do resultado mudaria com a tabela.
+        # Um trecho SQL avulso não entra no cache nem é preparado: cada texto
+        # seria um formato novo
+        raw = isinstance(condition_shape, str)
+        return compiled(shape, build, preparable=not (all_columns or raw), cache=not raw), params
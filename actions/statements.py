@@ -0,0 +1,287 @@
+"""
+Comandos SQL compilados para as classes de `actions`.
+
+Cada comando é composto com `psycopg2.sql` (identificadores citados e valores
+sempre como parâmetros) e guardado em cache pelo seu formato — tabela,
+colunas e chaves das condições —, de modo que chamadas repetidas não montam
+o SQL de novo. Opcionalmente, formatos executados muitas vezes na mesma
+conexão viram um PREPARE no servidor, que deixa de replanejar o comando.
+"""
+import hashlib
+import itertools
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+from psycopg2 import sql
+
+
+# Execuções de um mesmo comando numa conexão antes de prepará-lo (0 = nunca)
+PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", 0))
+
+# Formatos distintos mantidos em cache; ao exceder, sai o usado há mais tempo
+MAX_STATEMENTS = 512
+
+# Placeholders no texto do comando; `%%` vem primeiro para que `%%s` seja
+# lido como `%` literal seguido de `s`
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+
+class Statement:
+    """
+    Um comando compilado.
+
+    Attributes:
+        name (str): Nome estável derivado do formato, usado no PREPARE.
+        composed (sql.Composed): Comando com placeholders `%s`.
+        preparable (bool): Se o comando pode virar PREPARE (ex.: `SELECT *`
+            não pode, pois o tipo do resultado mudaria com a tabela).
+    """
+
+    __slots__ = ("name", "composed", "preparable", "_text", "_prepare_text")
+
+    def __init__(self, shape, composed, preparable=True):
+        self.name = "st_" + hashlib.sha1(repr(shape).encode()).hexdigest()[:16]
+        self.composed = composed
+        self.preparable = preparable
+        self._text = None
+        self._prepare_text = None
+
+    def text(self, context):
+        """SQL final, renderizado uma única vez (`context`: conexão ou cursor)."""
+        if self._text is None:
+            self._text = self.composed.as_string(context)
+        return self._text
+
+    def prepare_text(self, context):
+        """
+        SQL com placeholders posicionais ($1, $2...) para o PREPARE. O `%%`
+        (um `%` literal no formato do psycopg2) vira `%` e não conta como
+        parâmetro, já que o PREPARE é executado sem parâmetros.
+        """
+        if self._prepare_text is None:
+            counter = itertools.count(1)
+            self._prepare_text = _PLACEHOLDER.sub(
+                lambda match: "%" if match.group() == "%%" else f"${next(counter)}",
+                self.text(context),
+            )
+        return self._prepare_text
+
+
+_statements = OrderedDict()
+_statements_lock = threading.Lock()
+
+
+def compiled(shape, build, preparable=True, cache=True):
+    """
+    Retorna o comando do formato `shape`, compilando-o com `build()` apenas
+    na primeira vez.
+
+    Args:
+        shape (tuple): Chave do formato (ex.: ("select", tabela, colunas, condições)).
+        build (callable): Função sem argumentos que retorna o `sql.Composed`.
+        preparable (bool, optional): Ver `Statement.preparable`.
+        cache (bool, optional): Se False, compila sem guardar (ex.: SQL
+            avulso, que ocuparia o lugar dos formatos usados com frequência).
+    """
+    if not cache:
+        return Statement(shape, build(), preparable)
+
+    with _statements_lock:
+        statement = _statements.get(shape)
+        if statement is not None:
+            _statements.move_to_end(shape)
+            return statement
+
+    statement = Statement(shape, build(), preparable)
+    with _statements_lock:
+        statement = _statements.setdefault(shape, statement)
+        _statements.move_to_end(shape)
+        while len(_statements) > MAX_STATEMENTS:
+            _statements.popitem(last=False)
+    return statement
+
+
+# Sufixo da chave nas condições -> operador de comparação
+OPERATORS = {
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+    "ne": "<>",
+}
+
+
+def where(conditions):
+    """
+    Compila condições {coluna: valor} ligadas por AND.
+
+    Um valor None vira `IS NULL` e uma lista/tupla/set vira `= ANY(%s)`; os
+    demais viram `= %s`. A chave pode ter um sufixo de comparação, como em
+    {"data_solicitacao__lt": data} (ver OPERATORS). O formato (que entra na
+    chave do cache) depende só das colunas, operadores e desses casos, nunca
+    dos valores.
+
+    Returns:
+        tuple: (sql.Composed, lista de parâmetros, formato)
+    """
+    parts, params, shape = [], [], []
+    for key, value in conditions.items():
+        column, _, suffix = key.partition("__")
+        if suffix:
+            if suffix not in OPERATORS:
+                raise ValueError(f"Operador de condição inválido: {suffix!r} (use um de {list(OPERATORS)}).")
+            parts.append(sql.SQL("{} " + OPERATORS[suffix] + " %s").format(sql.Identifier(column)))
+            params.append(value)
+            shape.append((column, suffix))
+        elif value is None:
+            parts.append(sql.SQL("{} IS NULL").format(sql.Identifier(column)))
+            shape.append((column, "null"))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            parts.append(sql.SQL("{} = ANY(%s)").format(sql.Identifier(column)))
+            params.append(list(value))
+            shape.append((column, "any"))
+        else:
+            parts.append(sql.SQL("{} = %s").format(sql.Identifier(column)))
+            params.append(value)
+            shape.append((column, "eq"))
+    return sql.SQL(" AND ").join(parts), params, tuple(shape)
+
+
+def column_list(columns):
+    """`a, b, c` com os nomes citados."""
+    return sql.SQL(", ").join(map(sql.Identifier, columns))
+
+
+# Consultas ao catálogo guardadas por processo (ver `reset_catalog`)
+_primary_keys = {}
+_column_types = {}
+_catalog_lock = threading.Lock()
+
+
+def reset_catalog():
+    """
+    Esquece as chaves primárias e tipos de colunas lidos do catálogo, e os
+    comandos compilados com esses tipos, após uma mudança de esquema (ex.:
+    `CreateTables.partition_suporte`).
+    """
+    with _catalog_lock:
+        _primary_keys.clear()
+        _column_types.clear()
+    with _statements_lock:
+        for shape in [shape for shape in _statements if shape[0] in ("update_batch", "update_batch_template")]:
+            del _statements[shape]
+
+
+def primary_key(cursor, table):
+    """
+    Nome da chave primária (de uma coluna) da tabela, consultado no catálogo
+    uma vez por processo.
+
+    Raises:
+        ValueError: Se a tabela não tiver chave primária de uma única coluna.
+    """
+    key = _primary_keys.get(table)
+    if key is None:
+        cursor.execute(
+            """
+            SELECT a.attname
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+            WHERE i.indrelid = to_regclass(%s) AND i.indisprimary;
+            """,
+            (table,)
+        )
+        columns = [row[0] for row in cursor.fetchall()]
+        if len(columns) != 1:
+            raise ValueError(f"A tabela '{table}' não tem chave primária de uma única coluna; informe `key`.")
+        key = columns[0]
+        with _catalog_lock:
+            _primary_keys[table] = key
+    return key
+
+
+def column_types(cursor, table):
+    """
+    Tipos SQL das colunas da tabela ({coluna: "numeric(10,2)", ...}),
+    consultados no catálogo uma vez por processo.
+    """
+    types = _column_types.get(table)
+    if types is None:
+        cursor.execute(
+            """
+            SELECT attname, format_type(atttypid, atttypmod)
+            FROM pg_attribute
+            WHERE attrelid = to_regclass(%s) AND attnum > 0 AND NOT attisdropped;
+            """,
+            (table,)
+        )
+        types = dict(cursor.fetchall())
+        if not types:
+            raise ValueError(f"Tabela '{table}' não encontrada.")
+        with _catalog_lock:
+            _column_types[table] = types
+    return types
+
+
+# Comandos já preparados e contagem de execuções por conexão
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+_PREPARED = object()
+
+
+def execute(cursor, statement, params=(), threshold=None):
+    """
+    Executa `statement` no cursor, usando PREPARE/EXECUTE quando o comando
+    já foi executado `threshold` vezes nesta conexão.
+
+    Prepared statements pertencem à sessão do servidor: sobrevivem a commits
+    e rollbacks e são reaproveitados enquanto a conexão (inclusive no pool)
+    permanecer aberta.
+
+    Args:
+        cursor: Cursor psycopg2 (não nomeado).
+        statement (Statement): Comando compilado por `compiled`.
+        params (sequence, optional): Parâmetros na ordem dos `%s`.
+        threshold (int, optional): Padrão: PREPARE_THRESHOLD (env DB_PREPARE_THRESHOLD).
+    """
+    threshold = PREPARE_THRESHOLD if threshold is None else threshold
+    # Sem parâmetros, o psycopg2 não interpreta `%` no texto (ex.: LIKE 'a%')
+    params = tuple(params) or None
+
+    if not threshold or not statement.preparable:
+        cursor.execute(statement.text(cursor), params)
+        return
+
+    with _prepared_lock:
+        state = _prepared.setdefault(cursor.connection, {})
+        count = state.get(statement.name, 0)
+        prepared = count is _PREPARED
+        if not prepared:
+            count += 1
+            state[statement.name] = count
+
+    if not prepared:
+        if count < threshold:
+            cursor.execute(statement.text(cursor), params)
+            return
+        cursor.execute(f"PREPARE {statement.name} AS {statement.prepare_text(cursor)}")
+        with _prepared_lock:
+            state[statement.name] = _PREPARED
+
+    if params:
+        cursor.execute(f"EXECUTE {statement.name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cursor.execute(f"EXECUTE {statement.name}")
+
+
+def forget_prepared(connection):
+    """
+    Descarta o registro de comandos preparados (ex.: após DISCARD ALL) e o
+    que foi lido do catálogo (ver `reset_catalog`).
+    """
+    with _prepared_lock:
+        _prepared.pop(connection, None)
+    reset_catalog()
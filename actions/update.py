@@ -1,3 +1,10 @@
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+
+from utils.batching import chunked
+from actions.statements import column_types, compiled, execute, where
+
+
 class UpdateQuery:
     def __init__(self, db_connection):
         self.db_connection = db_connection
@@ -12,4 +19,135 @@ class UpdateQuery:
             self.db_connection.rollback()
             raise e
         finally:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
+
+    @staticmethod
+    def build_query(table_name, values, conditions):
+        """
+        Monta `UPDATE tabela SET ... WHERE ...` com valores e condições como parâmetros.
+
+        Args:
+            table_name (str): Nome da tabela.
+            values (dict): Novos valores {coluna: valor}.
+            conditions (dict): Condições {coluna: valor} (ver `actions.statements.where`).
+
+        Returns:
+            tuple: (Statement compilado, lista de parâmetros)
+        """
+        if not values:
+            raise ValueError("UpdateQuery exige ao menos uma coluna a atualizar.")
+        if not conditions:
+            raise ValueError("UpdateQuery exige ao menos uma condição.")
+
+        columns = tuple(values)
+        where_sql, where_params, condition_shape = where(conditions)
+
+        def build():
+            assignments = sql.SQL(", ").join(
+                sql.SQL("{} = %s").format(sql.Identifier(column)) for column in columns
+            )
+            return sql.SQL("UPDATE {} SET {} WHERE {}").format(
+                sql.Identifier(table_name), assignments, where_sql
+            )
+
+        statement = compiled(("update", table_name, columns, condition_shape), build)
+        return statement, [values[column] for column in columns] + where_params
+
+    def update(self, table_name, values, conditions):
+        """
+        Atualiza as linhas que atendem `conditions` e faz o commit.
+
+        Returns:
+            int: Número de linhas afetadas.
+        """
+        statement, params = self.build_query(table_name, values, conditions)
+        cursor = self.db_connection.cursor()
+        try:
+            execute(cursor, statement, params)
+            self.db_connection.commit()
+            return cursor.rowcount
+        except Exception:
+            self.db_connection.rollback()
+            raise
+        finally:
+            cursor.close()
+
+    def execute_batch(self, table_name, key, rows, page_size=1000):
+        """
+        Aplica valores diferentes a cada linha com um único
+        `UPDATE ... FROM (VALUES ...)` por lote, com um commit por lote.
+
+        Args:
+            table_name (str): Nome da tabela.
+            key (str): Coluna que identifica cada linha (normalmente a chave primária).
+            rows (iterable[dict]): Registros {key: ..., coluna: novo valor, ...},
+                todos com as mesmas colunas. Pode ser um gerador.
+            page_size (int, optional): Registros por comando/transação.
+
+        Returns:
+            int: Número de linhas atualizadas.
+        """
+        total = 0
+        cursor = self.db_connection.cursor()
+        try:
+            for batch in chunked(rows, page_size):
+                statement, template, values = self.build_batch_query(cursor, table_name, key, batch)
+                try:
+                    execute_values(cursor, statement.text(cursor), values, template=template.text(cursor),
+                                   page_size=len(values))
+                    total += cursor.rowcount
+                    self.db_connection.commit()
+                except Exception:
+                    self.db_connection.rollback()
+                    raise
+        finally:
+            cursor.close()
+        return total
+
+    @staticmethod
+    def build_batch_query(cursor, table_name, key, rows):
+        """
+        Monta o `UPDATE ... FROM (VALUES %s)` de um lote para `execute_values`.
+
+        Cada valor é convertido para o tipo da coluna de destino no template
+        (ex.: `%s::date`), pois literais e NULLs em VALUES não têm tipo.
+
+        Returns:
+            tuple: (Statement do comando, Statement do template, lista de tuplas)
+        """
+        columns = [column for column in rows[0] if column != key]
+        if not columns:
+            raise ValueError("execute_batch exige ao menos uma coluna a atualizar além da chave.")
+        for row in rows:
+            if key not in row or len(row) != len(columns) + 1 or any(column not in row for column in columns):
+                raise ValueError("Todos os registros do lote devem ter a chave e as mesmas colunas.")
+
+        all_columns = (key, *columns)
+        types = column_types(cursor, table_name)
+        unknown = [column for column in all_columns if column not in types]
+        if unknown:
+            raise ValueError(f"Coluna(s) inexistente(s) em '{table_name}': {', '.join(unknown)}.")
+        shape = (table_name, all_columns)
+
+        def build():
+            return sql.SQL(
+                "UPDATE {table} AS t SET {assignments} "
+                "FROM (VALUES %s) AS v ({columns}) WHERE t.{key} = v.{key}"
+            ).format(
+                table=sql.Identifier(table_name),
+                assignments=sql.SQL(", ").join(
+                    sql.SQL("{0} = v.{0}").format(sql.Identifier(column)) for column in columns
+                ),
+                columns=sql.SQL(", ").join(map(sql.Identifier, all_columns)),
+                key=sql.Identifier(key),
+            )
+
+        def build_template():
+            return sql.SQL("({})").format(sql.SQL(", ").join(
+                sql.SQL("%s::" + types[column]) for column in all_columns
+            ))
+
+        statement = compiled(("update_batch",) + shape, build, preparable=False)
+        template = compiled(("update_batch_template",) + shape, build_template, preparable=False)
+        values = [tuple(row[column] for column in all_columns) for row in rows]
+        return statement, template, values
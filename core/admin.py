@@ -7,24 +7,25 @@ from .models import (
     Financeiro, Tarefa, ContaAPagar, ContaAReceber,
     ClienteContrato, UsuarioProjeto, UsuarioTarefa
 )
+from .search import BuscaAdminMixin
 
 
 @admin.register(Lead)
-class LeadAdmin(admin.ModelAdmin):
+class LeadAdmin(BuscaAdminMixin, admin.ModelAdmin):
     list_display = ('id_lead', 'nome', 'email', 'telefone', 'origem', 'status_funil')
     search_fields = ('nome', 'email', 'cpf')
     list_filter = ('origem', 'status_funil')
 
 
 @admin.register(Cliente)
-class ClienteAdmin(admin.ModelAdmin):
+class ClienteAdmin(BuscaAdminMixin, admin.ModelAdmin):
     list_display = ('id_cliente', 'nome', 'email', 'telefone', 'plano_ativo')
     search_fields = ('nome', 'email', 'cpf')
     list_filter = ('plano_ativo',)
 
 
 @admin.register(Suporte)
-class SuporteAdmin(admin.ModelAdmin):
+class SuporteAdmin(BuscaAdminMixin, admin.ModelAdmin):
     list_display = ('id_chamado', 'nome_pedido', 'id_cliente', 'responsavel_solicitacao', 'data_solicitacao')
     search_fields = ('nome_pedido', 'descricao')
     list_filter = ('data_solicitacao',)
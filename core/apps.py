@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Sistema Wevo Media'
+
+    def ready(self):
+        from .auth import preparar_hash_ficticio
+        from .signals import conectar_sinais
+        conectar_sinais()
+        preparar_hash_ficticio()
@@ -0,0 +1,211 @@
+"""
+Arquivo de chamados de suporte e lançamentos do financeiro antigos.
+
+Linhas mais antigas que o horizonte (ARQUIVO_HORIZONTE_MESES) saem das tabelas
+ativas e vão para `suporte_arquivo` / `financeiro_arquivo` (criadas em
+actions/create.py), em lotes com uma transação cada: um `DELETE ... RETURNING`
+encadeado por CTE ao `INSERT` no arquivo, de modo que cada linha está sempre
+em exatamente uma das duas tabelas. `FOR UPDATE SKIP LOCKED` deixa de fora as
+linhas sendo editadas no momento, que ficam para a próxima execução.
+
+Para o financeiro, o mesmo comando soma os lançamentos movidos em
+`financeiro_arquivo_resumo` (por projeto), que o relatório de resumo
+financeiro combina com as linhas ativas sem ler o arquivo inteiro.
+
+As listagens e relatórios leem as linhas arquivadas apenas quando pedido
+(`?arquivo=1`), pelas views `suporte_com_arquivo` / `financeiro_com_arquivo`.
+
+Bancos criados antes do arquivo só têm essas tabelas e views depois de
+`manage.py arquivar --criar`; até lá (`disponivel()` falso) as telas e
+relatórios leem apenas as tabelas ativas.
+"""
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from actions.create import add_months
+from . import db_async, replica, table_versions
+
+
+class Arquivo:
+    """
+    Uma tabela arquivável.
+
+    Attributes:
+        tabela (str): Tabela ativa.
+        arquivo (str): Tabela de arquivo, com as mesmas colunas.
+        pk (str): Chave primária (igual nas duas tabelas).
+        data (str): Coluna comparada com o horizonte.
+        colunas (tuple): Colunas copiadas (a `busca` gerada fica de fora).
+        extra (str): CTE adicional sobre `movidos` (ex.: resumo), ou ''.
+        tabelas_extra (tuple): Tabelas escritas pelo CTE adicional.
+    """
+
+    def __init__(self, tabela, pk, data, colunas, extra='', tabelas_extra=()):
+        self.tabela = tabela
+        self.arquivo = f'{tabela}_arquivo'
+        self.pk = pk
+        self.data = data
+        self.colunas = colunas
+        self.extra = extra
+        self.tabelas_extra = tabelas_extra
+
+    @property
+    def tabelas(self):
+        """Tabelas alteradas por um lote (para invalidar caches)."""
+        return (self.tabela, self.arquivo, *self.tabelas_extra)
+
+    @property
+    def sql(self):
+        colunas = ', '.join(self.colunas)
+        extra = f',\n{self.extra}' if self.extra else ''
+        return f"""
+            WITH movidos AS (
+                DELETE FROM {self.tabela}
+                WHERE {self.pk} = ANY(ARRAY(
+                    SELECT {self.pk} FROM {self.tabela}
+                    WHERE {self.data} < %s
+                    ORDER BY {self.data}, {self.pk}
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ))
+                RETURNING {colunas}
+            ),
+            copiados AS (
+                INSERT INTO {self.arquivo} ({colunas})
+                SELECT {colunas} FROM movidos
+                RETURNING 1
+            ){extra}
+            SELECT COUNT(*) FROM copiados;
+        """
+
+
+_RESUMO_FINANCEIRO = """
+            resumo AS (
+                INSERT INTO financeiro_arquivo_resumo AS r
+                    (id_projeto, total_registros, total_receitas, total_despesas, saldo, soma_valor)
+                SELECT id_projeto,
+                       COUNT(*),
+                       SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE 0 END),
+                       SUM(CASE WHEN tipo = 'Despesa' THEN valor ELSE 0 END),
+                       SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE -valor END),
+                       SUM(valor)
+                FROM movidos
+                WHERE id_projeto IS NOT NULL
+                GROUP BY id_projeto
+                ON CONFLICT (id_projeto) DO UPDATE SET
+                    total_registros = r.total_registros + EXCLUDED.total_registros,
+                    total_receitas = r.total_receitas + EXCLUDED.total_receitas,
+                    total_despesas = r.total_despesas + EXCLUDED.total_despesas,
+                    saldo = r.saldo + EXCLUDED.saldo,
+                    soma_valor = r.soma_valor + EXCLUDED.soma_valor
+            )"""
+
+
+ARQUIVOS = {
+    'suporte': Arquivo(
+        'suporte', 'id_chamado', 'data_solicitacao',
+        ('id_chamado', 'nome_pedido', 'responsavel_solicitacao', 'descricao', 'data_solicitacao', 'id_cliente'),
+    ),
+    'financeiro': Arquivo(
+        'financeiro', 'id_financeiro', 'data',
+        ('id_financeiro', 'descricao', 'valor', 'data', 'tipo', 'id_projeto'),
+        extra=_RESUMO_FINANCEIRO, tabelas_extra=('financeiro_arquivo_resumo',),
+    ),
+}
+
+
+# Objetos lidos pelas telas e relatórios, criados juntos (ARQUIVO_SQL)
+_OBJETOS = ('financeiro_arquivo_resumo', 'suporte_com_arquivo', 'financeiro_com_arquivo')
+_SQL_DISPONIVEL = 'SELECT ' + ' AND '.join(
+    f"to_regclass('{objeto}') IS NOT NULL" for objeto in _OBJETOS
+) + ' AS disponivel;'
+
+# Aliases em que o arquivo já foi encontrado (não deixa de existir)
+_disponivel = set()
+
+
+def disponivel(alias=None):
+    """
+    Se as tabelas e views de arquivo existem no banco `alias` (padrão: o de
+    leitura da requisição). Consultado até serem encontradas; depois, memorizado.
+    """
+    alias = alias or replica.alias_leitura()
+    if alias not in _disponivel:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(_SQL_DISPONIVEL)
+            if cursor.fetchone()[0]:
+                _disponivel.add(alias)
+    return alias in _disponivel
+
+
+async def disponivel_async():
+    """Equivalente assíncrono de `disponivel`, com o driver async do psycopg 3."""
+    alias = replica.alias_leitura()
+    if alias not in _disponivel:
+        row = await db_async.fetch_one(_SQL_DISPONIVEL)
+        if row['disponivel']:
+            _disponivel.add(alias)
+    return alias in _disponivel
+
+
+def limite(horizonte_meses=None, hoje=None):
+    """
+    Primeiro dia do mês a partir do qual as linhas continuam ativas.
+
+    Args:
+        horizonte_meses (int, optional): Padrão: ARQUIVO_HORIZONTE_MESES.
+        hoje (date, optional): Data de referência (padrão: hoje).
+    """
+    if horizonte_meses is None:
+        horizonte_meses = settings.ARQUIVO_HORIZONTE_MESES
+    return add_months(hoje or date.today(), -horizonte_meses)
+
+
+def pendentes(nome, horizonte_meses=None):
+    """Quantas linhas de `nome` seriam arquivadas com o horizonte informado."""
+    arquivo = ARQUIVOS[nome]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT COUNT(*) FROM {arquivo.tabela} WHERE {arquivo.data} < %s;',
+            [limite(horizonte_meses)],
+        )
+        return cursor.fetchone()[0]
+
+
+def arquivar(nome, horizonte_meses=None, lote=5000, pausa=0.0, progresso=None):
+    """
+    Move para o arquivo, em lotes, as linhas de `nome` mais antigas que o horizonte.
+
+    Args:
+        nome (str): Chave de ARQUIVOS ('suporte' ou 'financeiro').
+        horizonte_meses (int, optional): Padrão: ARQUIVO_HORIZONTE_MESES.
+        lote (int, optional): Linhas movidas por transação.
+        pausa (float, optional): Segundos entre lotes, para aliviar o banco.
+        progresso (callable, optional): Chamado com o total movido após cada lote.
+
+    Returns:
+        int: Linhas arquivadas.
+    """
+    arquivo = ARQUIVOS[nome]
+    data_limite = limite(horizonte_meses)
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(arquivo.sql, [data_limite, lote])
+                movidos = cursor.fetchone()[0]
+            # Escrita fora do ORM: os sinais de post_save/post_delete não são disparados
+            if movidos:
+                transaction.on_commit(lambda: table_versions.incrementar(*arquivo.tabelas))
+
+        total += movidos
+        if progresso:
+            progresso(total)
+        if movidos < lote:
+            return total
+        if pausa:
+            time.sleep(pausa)
@@ -1,8 +1,18 @@
 """
 Sistema de autenticação customizado usando a tabela Usuario.
 """
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.utils.crypto import get_random_string
 from .models import Usuario
 
 
@@ -15,13 +25,7 @@ class UsuarioAuthBackend(BaseBackend):
         """
         Autentica um usuário baseado no EMAIL e senha.
         """
-        try:
-            usuario = Usuario.objects.get(email=email)
-            if check_password(password, usuario.senha):
-                return usuario
-        except Usuario.DoesNotExist:
-            return None
-        return None
+        return autenticar(email, password)
 
     def get_user(self, cpf):
         """
@@ -41,8 +45,234 @@ def criar_usuario(cpf, nome, email, senha, perfil='normal'):
         cpf=cpf,
         nome=nome,
         email=email,
-        senha=make_password(senha),
+        senha=executar_hash(make_password, senha),
         perfil=perfil
     )
     usuario.save()
     return usuario
+
+
+async def criar_usuario_async(cpf, nome, email, senha, perfil='normal'):
+    """
+    Versão assíncrona de `criar_usuario`: o hash é calculado no pool de
+    threads de autenticação, sem ocupar o event loop.
+    """
+    usuario = Usuario(
+        cpf=cpf,
+        nome=nome,
+        email=email,
+        senha=await executar_hash_async(make_password, senha),
+        perfil=perfil
+    )
+    await usuario.asave(force_insert=True)
+    return usuario
+
+
+# =============================================================================
+# HASH DE SENHAS EM POOL DE THREADS LIMITADO
+# =============================================================================
+#
+# O PBKDF2 é CPU-bound: num pico de logins, cada worker fica ocupado
+# calculando hashes e as demais páginas esperam na fila. Todos os hashes
+# (login e cadastro, síncronos ou assíncronos) passam por um pool com
+# AUTH_HASH_THREADS threads; acima de AUTH_HASH_FILA hashes pendentes, novos
+# pedidos são recusados imediatamente com `AutenticacaoSobrecarregada`.
+#
+# O pool limita quantos hashes rodam ao mesmo tempo, mas só as views
+# assíncronas (login_async e registro_async, em /async/) liberam o worker
+# enquanto o hash é calculado: as síncronas (login_view e registro_view)
+# esperam o resultado e continuam ocupando o worker durante todo o hash.
+
+class AutenticacaoSobrecarregada(Exception):
+    """Há hashes de senha demais aguardando no pool de autenticação."""
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'AUTH_HASH_THREADS', 2),
+    thread_name_prefix='auth-hash',
+)
+_pendentes = 0
+_pendentes_lock = threading.Lock()
+
+
+def _reservar():
+    global _pendentes
+    with _pendentes_lock:
+        if _pendentes >= getattr(settings, 'AUTH_HASH_FILA', 64):
+            raise AutenticacaoSobrecarregada()
+        _pendentes += 1
+
+
+def _liberar(_future=None):
+    global _pendentes
+    with _pendentes_lock:
+        _pendentes -= 1
+
+
+def _submeter(funcao, *args):
+    _reservar()
+    try:
+        future = _executor.submit(funcao, *args)
+    except BaseException:
+        _liberar()
+        raise
+    future.add_done_callback(_liberar)
+    return future
+
+
+def executar_hash(funcao, *args):
+    """
+    Executa `funcao(*args)` (ex.: check_password) no pool e espera o resultado.
+    A thread que chama fica bloqueada durante o hash; para liberá-la, use
+    `executar_hash_async` (views assíncronas).
+    """
+    return _submeter(funcao, *args).result()
+
+
+async def executar_hash_async(funcao, *args):
+    """Como `executar_hash`, mas aguarda sem bloquear o event loop."""
+    return await asyncio.wrap_future(_submeter(funcao, *args))
+
+
+_hash_ficticio = None
+
+
+def preparar_hash_ficticio():
+    """
+    Calcula o hash descartável de `_verificar_ficticio`. Chamado uma vez, na
+    inicialização (CoreConfig.ready), para que nem o primeiro login com e-mail
+    inexistente pague um PBKDF2 a mais que uma senha errada.
+    """
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = make_password(get_random_string(32))
+
+
+def _verificar_ficticio(senha):
+    """
+    Verifica a senha contra um hash descartável, com o mesmo custo de uma
+    verificação real: a resposta para um e-mail inexistente leva o mesmo
+    tempo que uma senha errada, sem revelar quais e-mails estão cadastrados.
+    """
+    preparar_hash_ficticio()
+    check_password(senha, _hash_ficticio)
+    return False
+
+
+def _buscar_por_email(email):
+    return Usuario.objects.filter(email=email).first() if email else None
+
+
+def autenticar(email, senha):
+    """
+    Retorna o usuário com este e-mail e senha, ou None.
+
+    Raises:
+        AutenticacaoSobrecarregada: Se o pool de hashes estiver cheio.
+    """
+    usuario = _buscar_por_email(email)
+    if usuario is None:
+        executar_hash(_verificar_ficticio, senha)
+        return None
+    return usuario if executar_hash(check_password, senha, usuario.senha) else None
+
+
+async def autenticar_async(email, senha):
+    """Versão assíncrona de `autenticar`."""
+    usuario = await sync_to_async(_buscar_por_email)(email)
+    if usuario is None:
+        await executar_hash_async(_verificar_ficticio, senha)
+        return None
+    return usuario if await executar_hash_async(check_password, senha, usuario.senha) else None
+
+
+# =============================================================================
+# CACHE DE VALIDAÇÃO DE USUÁRIOS LOGADOS
+# =============================================================================
+
+class UsuarioValidationCache:
+    """
+    Cache LRU local ao processo com o perfil atual de cada usuário logado.
+
+    Cada entrada expira após `ttl` segundos e guarda a versão do usuário
+    vista no momento da consulta. A versão fica no cache do Django (visível
+    a todos os processos, se o backend for compartilhado) e é incrementada
+    por `invalidar_usuario`, o que força uma nova consulta ao banco.
+    """
+
+    def __init__(self, max_size=1024, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, cpf, version):
+        with self._lock:
+            entry = self._entries.get(cpf)
+            if entry is None:
+                return None
+            expires_at, cached_version, perfil = entry
+            if expires_at < time.monotonic() or cached_version != version:
+                del self._entries[cpf]
+                return None
+            self._entries.move_to_end(cpf)
+            return perfil
+
+    def set(self, cpf, version, perfil):
+        with self._lock:
+            self._entries[cpf] = (time.monotonic() + self.ttl, version, perfil)
+            self._entries.move_to_end(cpf)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, cpf):
+        with self._lock:
+            self._entries.pop(cpf, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_usuarios_validos = UsuarioValidationCache(
+    max_size=getattr(settings, 'USUARIO_CACHE_MAX_SIZE', 1024),
+    ttl=getattr(settings, 'USUARIO_CACHE_TTL', 30),
+)
+
+
+def _versao_key(cpf):
+    return f'usuario_versao:{cpf}'
+
+
+def validar_usuario(cpf):
+    """
+    Retorna o perfil atual do usuário, ou None se ele não existe mais.
+
+    Consulta o banco apenas quando a entrada local expirou ou quando a
+    versão do usuário mudou desde a última consulta.
+    """
+    version = cache.get(_versao_key(cpf), 0)
+    perfil = _usuarios_validos.get(cpf, version)
+    if perfil is not None:
+        return perfil
+
+    perfil = Usuario.objects.filter(cpf=cpf).values_list('perfil', flat=True).first()
+    if perfil is None:
+        _usuarios_validos.discard(cpf)
+        return None
+
+    _usuarios_validos.set(cpf, version, perfil)
+    return perfil
+
+
+def invalidar_usuario(cpf):
+    """
+    Incrementa a versão do usuário para que todas as validações em cache
+    sejam descartadas (usar após alterar, excluir ou mudar o perfil).
+    """
+    key = _versao_key(cpf)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+    _usuarios_validos.discard(cpf)
@@ -0,0 +1,93 @@
+"""
+Conversão de leads em clientes em massa.
+
+Todos os leads selecionados viram clientes em um único comando: um
+`INSERT ... SELECT` em `clientes` (com `id_lead` preenchido e os dados
+copiados do lead), encadeado por CTE a um `UPDATE` do status do funil dos
+leads convertidos. Sendo um só comando, ou tudo é gravado ou nada é.
+
+Leads que já têm cliente (mesmo `id_lead`) são ignorados, assim como os de
+CPF já cadastrado em `clientes` (ON CONFLICT (cpf) DO NOTHING); repetir a
+conversão com o mesmo filtro não duplica registros.
+"""
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from . import table_versions
+from .models import Cliente, Lead
+
+
+STATUS_CONVERTIDO = 'Fechado'
+
+_CONVERTER_SQL = """
+    WITH convertidos AS (
+        INSERT INTO clientes (nome, telefone, email, cpf, plano_ativo, id_lead)
+        SELECT l.nome, l.telefone, l.email, l.cpf, %s, l.id_lead
+        FROM leads l
+        WHERE l.id_lead IN ({selecao})
+          AND NOT EXISTS (SELECT 1 FROM clientes c WHERE c.id_lead = l.id_lead)
+        ORDER BY l.id_lead
+        ON CONFLICT (cpf) DO NOTHING
+        RETURNING id_lead
+    ),
+    atualizados AS (
+        UPDATE leads
+        SET status_funil = %s
+        FROM convertidos
+        WHERE leads.id_lead = convertidos.id_lead
+        RETURNING leads.id_lead
+    )
+    SELECT COUNT(*) FROM atualizados;
+"""
+
+
+def filtrar_leads(status_funil=None, origem=None):
+    """
+    Leads com algum dos status e alguma das origens informados.
+
+    Args:
+        status_funil (list, optional): Status do funil; vazio = todos.
+        origem (list, optional): Origens; vazio = todas.
+    """
+    leads = Lead.objects.all()
+    if status_funil:
+        leads = leads.filter(status_funil__in=status_funil)
+    if origem:
+        leads = leads.filter(origem__in=origem)
+    return leads
+
+
+def contar_conversiveis(leads):
+    """
+    Quantos leads de `leads` seriam convertidos: sem cliente vinculado e sem
+    cliente com o mesmo CPF (os mesmos critérios de `converter_leads`).
+    """
+    return leads.filter(cliente__isnull=True).exclude(
+        Exists(Cliente.objects.filter(cpf=OuterRef('cpf')))
+    ).count()
+
+
+def converter_leads(leads, novo_status=STATUS_CONVERTIDO, plano_ativo=False):
+    """
+    Cria um cliente para cada lead de `leads` e muda o status do funil deles.
+
+    Args:
+        leads (QuerySet): Leads a converter (ex.: `filtrar_leads(...)`).
+        novo_status (str, optional): Status do funil dos leads convertidos.
+        plano_ativo (bool, optional): `plano_ativo` dos clientes criados.
+
+    Returns:
+        int: Quantidade de leads convertidos.
+    """
+    selecao, params = leads.order_by().values('id_lead').query.sql_with_params()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _CONVERTER_SQL.format(selecao=selecao),
+                [plano_ativo, *params, novo_status],
+            )
+            convertidos = cursor.fetchone()[0]
+        # Escrita fora do ORM: os sinais de post_save não são disparados
+        if convertidos:
+            transaction.on_commit(lambda: table_versions.incrementar('leads', 'clientes'))
+    return convertidos
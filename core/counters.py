@@ -0,0 +1,263 @@
+"""
+Contadores do dashboard (totais de leads, clientes, projetos e tarefas).
+
+Todos os totais são obtidos em uma única consulta, em um dos modos:
+
+- 'exato': COUNT(*) de cada tabela (varredura completa de cada uma);
+- 'estimado': pg_class.reltuples, atualizado pelo ANALYZE/autovacuum;
+- 'mantido': totais consolidados em `contadores` mais as variações ainda
+  não consolidadas em `contadores_delta`, gravadas por triggers (ver
+  `instalar_contadores` e `consolidar_contadores`).
+
+O resultado fica alguns segundos no cache do Django.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+
+from . import db_async, replica
+
+
+# Chave no contexto do dashboard -> tabela
+CONTADORES = {
+    'total_leads': 'leads',
+    'total_clientes': 'clientes',
+    'total_projetos': 'projeto',
+    'total_tarefas': 'tarefas',
+}
+
+MODOS = ('exato', 'estimado', 'mantido')
+
+CACHE_KEY = 'dashboard_contadores'
+
+
+def _query_exato():
+    colunas = ',\n'.join(
+        f'(SELECT COUNT(*) FROM {tabela}) AS {chave}'
+        for chave, tabela in CONTADORES.items()
+    )
+    return f'SELECT {colunas};', []
+
+
+def _query_estimado():
+    # reltuples é -1 em tabelas nunca analisadas (PostgreSQL 14+)
+    colunas = ',\n'.join(
+        f"(SELECT GREATEST(reltuples, 0)::bigint FROM pg_class "
+        f"WHERE oid = to_regclass(%s)) AS {chave}"
+        for chave in CONTADORES
+    )
+    return f'SELECT {colunas};', list(CONTADORES.values())
+
+
+def _query_mantido():
+    colunas = ',\n'.join(
+        f'((SELECT total FROM contadores WHERE tabela = %s)'
+        f' + (SELECT COALESCE(SUM(delta), 0) FROM contadores_delta WHERE tabela = %s)) AS {chave}'
+        for chave in CONTADORES
+    )
+    return f'SELECT {colunas};', [tabela for tabela in CONTADORES.values() for _ in range(2)]
+
+
+_QUERIES = {
+    'exato': _query_exato,
+    'estimado': _query_estimado,
+    'mantido': _query_mantido,
+}
+
+
+def calcular_contadores(modo=None):
+    """
+    Calcula os contadores no banco, sem passar pelo cache.
+
+    Args:
+        modo (str, optional): 'exato', 'estimado' ou 'mantido'
+            (padrão: settings.DASHBOARD_COUNTERS_MODE).
+
+    Returns:
+        dict: {chave do contexto: total}
+    """
+    modo = modo or getattr(settings, 'DASHBOARD_COUNTERS_MODE', 'exato')
+    if modo not in _QUERIES:
+        raise ValueError(f"Modo de contadores inválido: {modo!r} (use um de {MODOS}).")
+
+    query, params = _QUERIES[modo]()
+    with connections[replica.alias_leitura()].cursor() as cursor:
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+
+    return {chave: valor or 0 for chave, valor in zip(CONTADORES, row)}
+
+
+def obter_contadores():
+    """Contadores do dashboard, servidos do cache quando disponíveis."""
+    contadores = cache.get(CACHE_KEY)
+    if contadores is None:
+        contadores = calcular_contadores()
+        cache.set(CACHE_KEY, contadores, getattr(settings, 'DASHBOARD_COUNTERS_TTL', 10))
+    return contadores
+
+
+async def calcular_contadores_async(modo=None):
+    """
+    Equivalente assíncrono de `calcular_contadores`.
+
+    No modo 'exato' cada COUNT(*) roda em sua própria conexão, em paralelo,
+    de modo que o tempo total é o da maior tabela e não a soma de todas.
+    """
+    modo = modo or getattr(settings, 'DASHBOARD_COUNTERS_MODE', 'exato')
+    if modo not in _QUERIES:
+        raise ValueError(f"Modo de contadores inválido: {modo!r} (use um de {MODOS}).")
+
+    if modo == 'exato':
+        resultados = await db_async.executar_concorrente(*(
+            (f'SELECT COUNT(*) AS total FROM {tabela};', None)
+            for tabela in CONTADORES.values()
+        ))
+        return {chave: rows[0]['total'] for chave, rows in zip(CONTADORES, resultados)}
+
+    query, params = _QUERIES[modo]()
+    row = await db_async.fetch_one(query, params)
+    return {chave: row[chave] or 0 for chave in CONTADORES}
+
+
+async def obter_contadores_async():
+    """Equivalente assíncrono de `obter_contadores` (mesmo cache)."""
+    contadores = await cache.aget(CACHE_KEY)
+    if contadores is None:
+        contadores = await calcular_contadores_async()
+        await cache.aset(CACHE_KEY, contadores, getattr(settings, 'DASHBOARD_COUNTERS_TTL', 10))
+    return contadores
+
+
+# =============================================================================
+# CONTADORES MANTIDOS POR TRIGGERS
+# =============================================================================
+
+# Os triggers só inserem linhas em `contadores_delta` (sem disputar a linha
+# de uma tabela em `contadores`, o que serializaria as escritas concorrentes);
+# `consolidar_contadores` soma periodicamente as variações ao total.
+INSTALAR_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS contadores (
+        tabela VARCHAR(63) PRIMARY KEY,
+        total BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contadores_delta (
+        tabela VARCHAR(63) NOT NULL,
+        delta BIGINT NOT NULL
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_contadores_delta_tabela ON contadores_delta (tabela);",
+    """
+    CREATE OR REPLACE FUNCTION contadores_inserir() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO contadores_delta (tabela, delta)
+        SELECT TG_TABLE_NAME, COUNT(*) FROM linhas_novas;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION contadores_excluir() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO contadores_delta (tabela, delta)
+        SELECT TG_TABLE_NAME, -COUNT(*) FROM linhas_antigas;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE OR REPLACE FUNCTION contadores_zerar() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM contadores_delta WHERE tabela = TG_TABLE_NAME;
+        UPDATE contadores SET total = 0 WHERE tabela = TG_TABLE_NAME;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """,
+]
+
+# Move as variações já gravadas para os totais, em um único comando
+CONSOLIDAR_SQL = """
+    WITH movidas AS (
+        DELETE FROM contadores_delta RETURNING tabela, delta
+    ),
+    somas AS (
+        SELECT tabela, SUM(delta) AS delta FROM movidas GROUP BY tabela
+    ),
+    atualizados AS (
+        UPDATE contadores c SET total = c.total + somas.delta
+        FROM somas
+        WHERE c.tabela = somas.tabela
+    )
+    SELECT COUNT(*) FROM movidas;
+"""
+
+# Triggers por comando (FOR EACH STATEMENT) com tabelas de transição, para
+# que inserções e exclusões em lote atualizem o contador uma única vez
+TRIGGERS_SQL = [
+    """
+    DROP TRIGGER IF EXISTS trg_contador_inserir ON {tabela};
+    CREATE TRIGGER trg_contador_inserir AFTER INSERT ON {tabela}
+        REFERENCING NEW TABLE AS linhas_novas
+        FOR EACH STATEMENT EXECUTE FUNCTION contadores_inserir();
+    """,
+    """
+    DROP TRIGGER IF EXISTS trg_contador_excluir ON {tabela};
+    CREATE TRIGGER trg_contador_excluir AFTER DELETE ON {tabela}
+        REFERENCING OLD TABLE AS linhas_antigas
+        FOR EACH STATEMENT EXECUTE FUNCTION contadores_excluir();
+    """,
+    """
+    DROP TRIGGER IF EXISTS trg_contador_zerar ON {tabela};
+    CREATE TRIGGER trg_contador_zerar AFTER TRUNCATE ON {tabela}
+        FOR EACH STATEMENT EXECUTE FUNCTION contadores_zerar();
+    """,
+]
+
+
+def instalar_contadores():
+    """
+    Cria as tabelas `contadores` e `contadores_delta`, as funções e triggers e
+    recalcula os totais.
+
+    As tabelas contadas ficam bloqueadas para escrita (SHARE) durante o
+    recálculo, para que nenhuma alteração escape entre o COUNT e os triggers.
+    """
+    tabelas = list(CONTADORES.values())
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for sql in INSTALAR_SQL:
+            cursor.execute(sql)
+
+        cursor.execute(f"LOCK TABLE {', '.join(tabelas)} IN SHARE MODE;")
+
+        for tabela in tabelas:
+            for sql in TRIGGERS_SQL:
+                cursor.execute(sql.format(tabela=tabela))
+            cursor.execute(
+                f"""
+                INSERT INTO contadores (tabela, total)
+                SELECT %s, COUNT(*) FROM {tabela}
+                ON CONFLICT (tabela) DO UPDATE SET total = EXCLUDED.total;
+                """,
+                [tabela]
+            )
+            cursor.execute('DELETE FROM contadores_delta WHERE tabela = %s;', [tabela])
+
+    cache.delete(CACHE_KEY)
+
+
+def consolidar_contadores():
+    """
+    Soma as variações de `contadores_delta` aos totais e as remove. Leituras
+    concorrentes veem o estado anterior ou o posterior, com o mesmo resultado.
+
+    Returns:
+        int: Variações consolidadas.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CONSOLIDAR_SQL)
+        return cursor.fetchone()[0]
@@ -0,0 +1,181 @@
+"""
+Acesso assíncrono ao PostgreSQL com o driver async do psycopg 3.
+
+Usado pelas views assíncronas (core/views_async.py) para que um worker ASGI
+não fique bloqueado durante consultas lentas. Como uma conexão executa um
+comando por vez, consultas independentes de uma mesma página rodam em
+conexões diferentes do pool, em paralelo (ver `executar_concorrente`).
+Nas views que leem da réplica (core/replica.py), as consultas usam um pool
+de conexões com o alias `replica`.
+
+Essas conexões não passam pelos `execute_wrapper` do Django: a instrumentação
+de SQL (core/middleware.py) recebe as consultas daqui por `coletar`.
+"""
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from django.conf import settings
+
+from . import replica
+
+
+def _conninfo(alias='default'):
+    db = settings.DATABASES[alias]
+    params = {
+        'dbname': db.get('NAME'),
+        'user': db.get('USER'),
+        'password': db.get('PASSWORD'),
+        'host': db.get('HOST'),
+        'port': db.get('PORT'),
+        **db.get('OPTIONS', {}),
+    }
+    return make_conninfo(**{key: value for key, value in params.items() if value})
+
+
+class AsyncConnectionPool:
+    """
+    Pool simples de `psycopg.AsyncConnection` em modo autocommit.
+
+    Conexões e semáforo são mantidos por event loop, pois uma conexão
+    assíncrona não pode ser usada fora do loop em que foi criada (ex.: views
+    assíncronas servidas pelo runserver WSGI rodam cada uma em um loop próprio).
+
+    Como no pool síncrono (utils/connection_db.py), conexões ociosas há mais
+    de `max_idle` segundos são fechadas em vez de reutilizadas, e as ociosas
+    há mais de `ping_after` segundos são validadas com um `SELECT 1` antes de
+    serem entregues, para que uma conexão derrubada pelo servidor (reinício,
+    failover, timeout de ociosidade) não falhe a requisição que a recebe.
+    """
+
+    def __init__(self, conninfo_factory=_conninfo, max_size=None, max_idle=None, ping_after=None):
+        self._conninfo_factory = conninfo_factory
+        self.max_size = max_size or getattr(settings, 'ASYNC_DB_POOL_MAX', 10)
+        self.max_idle = max_idle if max_idle is not None else getattr(settings, 'ASYNC_DB_POOL_MAX_IDLE', 300)
+        self.ping_after = ping_after if ping_after is not None else getattr(settings, 'ASYNC_DB_POOL_PING_AFTER', 5)
+        self._states = weakref.WeakKeyDictionary()
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = {'idle': [], 'semaphore': asyncio.Semaphore(self.max_size)}
+            self._states[loop] = state
+        return state
+
+    @asynccontextmanager
+    async def connection(self):
+        state = self._state()
+        async with state['semaphore']:
+            conn = await self._reutilizar(state['idle'])
+            if conn is None:
+                conn = await psycopg.AsyncConnection.connect(
+                    self._conninfo_factory(), autocommit=True, row_factory=dict_row
+                )
+
+            try:
+                yield conn
+            except psycopg.Error:
+                # Erros de SQL não invalidam uma conexão em autocommit
+                if conn.broken:
+                    await conn.close()
+                else:
+                    state['idle'].append((conn, time.monotonic()))
+                raise
+            except BaseException:
+                # Ex.: cancelamento no meio de uma consulta
+                await conn.close()
+                raise
+            else:
+                state['idle'].append((conn, time.monotonic()))
+
+    async def _reutilizar(self, idle):
+        """A conexão ociosa mais recente ainda utilizável, ou None."""
+        while idle:
+            conn, devolvida_em = idle.pop()
+            if conn.closed or conn.broken:
+                continue
+            ociosa = time.monotonic() - devolvida_em
+            if ociosa >= self.max_idle:
+                await conn.close()
+                continue
+            if ociosa >= self.ping_after:
+                try:
+                    await conn.execute('SELECT 1')
+                except psycopg.Error:
+                    await conn.close()
+                    continue
+            return conn
+        return None
+
+
+# Coletor de estatísticas da requisição atual (ver `coletar`)
+_coletor = ContextVar('coletor_sql', default=None)
+
+
+@contextmanager
+def coletar(coletor):
+    """
+    Registra em `coletor` (um `ColetorSQL`) as consultas feitas por este módulo
+    no contexto atual, inclusive nas tarefas de `executar_concorrente`.
+    """
+    token = _coletor.set(coletor)
+    try:
+        yield coletor
+    finally:
+        _coletor.reset(token)
+
+
+async def _executar(cursor, query, params):
+    coletor = _coletor.get()
+    if coletor is None:
+        await cursor.execute(query, params)
+        return
+    inicio = time.perf_counter()
+    try:
+        await cursor.execute(query, params)
+    finally:
+        coletor.registrar(query, time.perf_counter() - inicio)
+
+
+pool = AsyncConnectionPool()
+pool_replica = AsyncConnectionPool(lambda: _conninfo(replica.REPLICA))
+
+
+def _pool():
+    """Pool do alias de leitura da requisição atual."""
+    return pool_replica if replica.alias_leitura() == replica.REPLICA else pool
+
+
+async def fetch_all(query, params=None):
+    """Executa a consulta em uma conexão do pool e retorna as linhas como dicts."""
+    async with _pool().connection() as conn:
+        async with conn.cursor() as cursor:
+            await _executar(cursor, query, params)
+            return await cursor.fetchall()
+
+
+async def fetch_one(query, params=None):
+    """Executa a consulta e retorna a primeira linha (dict) ou None."""
+    async with _pool().connection() as conn:
+        async with conn.cursor() as cursor:
+            await _executar(cursor, query, params)
+            return await cursor.fetchone()
+
+
+async def executar_concorrente(*consultas):
+    """
+    Executa consultas independentes em paralelo, cada uma em sua conexão.
+
+    Args:
+        *consultas: Tuplas (query, params).
+
+    Returns:
+        list: Resultado de `fetch_all` de cada consulta, na mesma ordem.
+    """
+    return await asyncio.gather(*(fetch_all(query, params) for query, params in consultas))
@@ -0,0 +1,262 @@
+"""
+Exportação das listagens e das consultas especiais em CSV ou XLSX.
+
+As linhas são lidas do banco em lotes por um cursor no servidor
+(`QuerySet.iterator(chunk_size=...)` / `connection.chunked_cursor()`) e o
+arquivo é gerado aos poucos, dentro de um `StreamingHttpResponse`: nem o
+resultado da consulta nem o arquivo final ficam inteiros na memória.
+
+O XLSX é escrito diretamente (um zip com o XML mínimo de uma planilha, com
+strings inline), pois bibliotecas como openpyxl/xlsxwriter precisam montar o
+arquivo em memória ou em disco antes de enviá-lo.
+
+Como as linhas são lidas depois que a view retorna, o banco de leitura
+(default ou réplica, ver core/replica.py) é escolhido ao montar a resposta.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import connections
+from django.http import StreamingHttpResponse
+
+from .models import (
+    Lead, Cliente, Suporte, Projeto, Contrato, Financeiro, Tarefa,
+    ContaAPagar, ContaAReceber, SuporteComArquivo, FinanceiroComArquivo
+)
+from . import archive
+from .replica import alias_leitura
+from .reports import RELATORIOS
+
+
+# Entidade na URL -> (model, ordenação); a tabela de usuários não é exportada
+ENTIDADES = {
+    'leads': (Lead, ['-id_lead']),
+    'clientes': (Cliente, ['-id_cliente']),
+    'suporte': (Suporte, ['-id_chamado']),
+    'projetos': (Projeto, ['-id_projeto']),
+    'contratos': (Contrato, ['-id_contrato']),
+    'financeiro': (Financeiro, ['-data', '-id_financeiro']),
+    'tarefas': (Tarefa, ['-id_tarefas']),
+    'contas-pagar': (ContaAPagar, ['-data_vencimento', '-id_conta_pagar']),
+    'contas-receber': (ContaAReceber, ['-data_recebimento', '-id_conta_receber']),
+}
+
+# Entidades com arquivo -> model com as linhas ativas e arquivadas (`?arquivo=1`)
+ENTIDADES_COM_ARQUIVO = {
+    'suporte': SuporteComArquivo,
+    'financeiro': FinanceiroComArquivo,
+}
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+# =============================================================================
+# CSV
+# =============================================================================
+
+class _Eco:
+    """Pseudo-arquivo cujo write() apenas devolve o texto (para o csv.writer)."""
+
+    def write(self, valor):
+        return valor
+
+
+def linhas_csv(cabecalho, linhas):
+    """Gera o CSV em blocos de texto, um bloco a cada EXPORT_CHUNK_SIZE linhas."""
+    writer = csv.writer(_Eco())
+    # BOM para o Excel reconhecer o UTF-8 (acentos)
+    yield '\ufeff' + writer.writerow(cabecalho)
+
+    bloco = []
+    for linha in linhas:
+        bloco.append(writer.writerow(linha))
+        if len(bloco) >= _chunk_size():
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
+
+
+# =============================================================================
+# XLSX
+# =============================================================================
+
+_XLSX_ESTRUTURA = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Dados" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+_XLSX_INICIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+).encode()
+
+_XLSX_FIM = '</sheetData></worksheet>'.encode()
+
+# Caracteres de controle não são permitidos em XML
+_CARACTERES_INVALIDOS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _Buffer:
+    """
+    Destino do ZipFile: acumula os bytes escritos até serem drenados.
+
+    Não implementa tell()/seek(), então o zipfile grava em modo sequencial
+    (com data descriptors), sem voltar no arquivo.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self.tamanho = 0
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        self.tamanho += len(dados)
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def drenar(self):
+        dados = b''.join(self._partes)
+        self._partes = []
+        self.tamanho = 0
+        return dados
+
+
+def _celula(valor):
+    if valor is None:
+        return '<c/>'
+    if isinstance(valor, bool):
+        return f'<c t="b"><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float, Decimal)):
+        return f'<c><v>{valor}</v></c>'
+    if isinstance(valor, datetime):
+        valor = valor.isoformat(sep=' ', timespec='seconds')
+    elif isinstance(valor, date):
+        valor = valor.isoformat()
+    texto = escape(_CARACTERES_INVALIDOS.sub('', str(valor)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def linhas_xlsx(cabecalho, linhas):
+    """Gera o XLSX em blocos de bytes de aproximadamente 64 KB."""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as arquivo:
+        for nome, conteudo in _XLSX_ESTRUTURA.items():
+            arquivo.writestr(nome, conteudo)
+
+        with arquivo.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as planilha:
+            planilha.write(_XLSX_INICIO)
+            planilha.write(('<row>' + ''.join(_celula(c) for c in cabecalho) + '</row>').encode())
+            for linha in linhas:
+                planilha.write(('<row>' + ''.join(_celula(c) for c in linha) + '</row>').encode())
+                if buffer.tamanho >= 65536:
+                    yield buffer.drenar()
+            planilha.write(_XLSX_FIM)
+    yield buffer.drenar()
+
+
+_GERADORES = {
+    'csv': linhas_csv,
+    'xlsx': linhas_xlsx,
+}
+
+
+# =============================================================================
+# RESPOSTAS
+# =============================================================================
+
+def resposta_exportacao(cabecalho, linhas, formato, nome_arquivo):
+    """StreamingHttpResponse com o arquivo gerado a partir de `linhas`."""
+    response = StreamingHttpResponse(
+        _GERADORES[formato](cabecalho, linhas),
+        content_type=FORMATOS[formato],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.{formato}"'
+    return response
+
+
+def exportar_queryset(queryset, formato, nome_arquivo):
+    """
+    Exporta todas as colunas de `queryset`, lidas por cursor no servidor.
+
+    As chaves estrangeiras saem como o id (coluna do banco), sem JOIN.
+    """
+    campos = queryset.model._meta.concrete_fields
+    linhas = queryset.using(alias_leitura()).values_list(*(campo.attname for campo in campos)).iterator(
+        chunk_size=_chunk_size()
+    )
+    return resposta_exportacao([campo.column for campo in campos], linhas, formato, nome_arquivo)
+
+
+def _linhas_cursor(query, alias):
+    # Cursor nomeado no PostgreSQL (WITH HOLD fora de transação)
+    with connections[alias].chunked_cursor() as cursor:
+        cursor.execute(query)
+        yield [coluna[0] for coluna in cursor.description]
+        while True:
+            linhas = cursor.fetchmany(_chunk_size())
+            if not linhas:
+                break
+            yield from linhas
+
+
+def exportar_relatorio(nome, formato, com_arquivo=False):
+    """
+    Exporta uma consulta especial completa.
+
+    Sempre executa a consulta direta: os dados exportados não dependem da
+    última atualização das materialized views. Com `com_arquivo`, inclui as
+    linhas arquivadas (ver `Relatorio.arquivaveis`).
+    """
+    relatorio = RELATORIOS[nome]
+    disponivel = archive.disponivel() if relatorio.usa_arquivo else True
+    linhas = _linhas_cursor(relatorio.query_direta(com_arquivo, disponivel), alias_leitura())
+    cabecalho = next(linhas)
+    return resposta_exportacao(cabecalho, linhas, formato, nome)
@@ -0,0 +1,92 @@
+"""
+Move para as tabelas de arquivo os chamados de suporte e lançamentos do
+financeiro mais antigos que o horizonte (ver core/archive.py).
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from actions.create import CreateTables
+from core import table_versions
+from core.archive import ARQUIVOS, arquivar, limite, pendentes
+from core.reports import RELATORIOS, criar_views_materializadas
+from utils.connection_db import ConnectionDB
+
+
+class Command(BaseCommand):
+    help = (
+        'Move, em lotes com uma transação cada, as linhas de suporte e financeiro '
+        'mais antigas que o horizonte para suporte_arquivo / financeiro_arquivo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tabelas', nargs='*',
+            help=f"Tabelas a arquivar (padrão: {', '.join(ARQUIVOS)}).",
+        )
+        parser.add_argument(
+            '--horizonte-meses', type=int, default=None,
+            help=f'Idade mínima, em meses, das linhas arquivadas (padrão: {settings.ARQUIVO_HORIZONTE_MESES}).',
+        )
+        parser.add_argument('--lote', type=int, default=5000, help='Linhas movidas por transação.')
+        parser.add_argument('--pausa', type=float, default=0.0, help='Segundos de espera entre lotes.')
+        parser.add_argument(
+            '--criar', action='store_true',
+            help='Cria antes as tabelas e views de arquivo (bancos criados sem elas).',
+        )
+        parser.add_argument('--simular', action='store_true', help='Apenas conta as linhas que seriam arquivadas.')
+
+    def handle(self, *args, **options):
+        invalidas = set(options['tabelas']) - set(ARQUIVOS)
+        if invalidas:
+            raise CommandError(f"Tabela(s) sem arquivo: {', '.join(sorted(invalidas))}.")
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser pelo menos 1.')
+        if options['horizonte_meses'] is not None and options['horizonte_meses'] < 0:
+            raise CommandError('--horizonte-meses não pode ser negativo.')
+
+        if options['criar']:
+            with ConnectionDB().connection() as conn:
+                CreateTables(conn).create_archive()
+            self._recriar_views_materializadas()
+
+        tabelas = options['tabelas'] or list(ARQUIVOS)
+        data_limite = limite(options['horizonte_meses'])
+        self.stdout.write(f'Arquivando linhas anteriores a {data_limite:%d/%m/%Y}.')
+
+        for nome in tabelas:
+            if options['simular']:
+                self.stdout.write(f"  {nome}: {pendentes(nome, options['horizonte_meses'])} linha(s) a arquivar.")
+                continue
+
+            inicio = time.monotonic()
+            total = arquivar(
+                nome, options['horizonte_meses'], options['lote'], options['pausa'],
+                progresso=lambda feitos, nome=nome: self._progresso(nome, feitos),
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'\r  {nome}: {total} linha(s) arquivada(s) em {time.monotonic() - inicio:.1f}s.'
+            ))
+
+    def _recriar_views_materializadas(self):
+        """As views dos relatórios que somam o arquivo foram criadas sem ele: recria as existentes."""
+        nomes = []
+        with connection.cursor() as cursor:
+            for nome, relatorio in RELATORIOS.items():
+                if not relatorio.sql_sem_arquivo:
+                    continue
+                cursor.execute('SELECT to_regclass(%s) IS NOT NULL;', [relatorio.view_materializada])
+                if cursor.fetchone()[0]:
+                    cursor.execute(f'DROP MATERIALIZED VIEW {relatorio.view_materializada};')
+                    nomes.append(nome)
+        if nomes:
+            criar_views_materializadas(nomes)
+            self.stdout.write(f"Materialized views recriadas: {', '.join(nomes)}.")
+        # Resultados em cache calculados sem o arquivo
+        table_versions.incrementar(*{tabela for relatorio in RELATORIOS.values() for tabela in relatorio.tabelas})
+
+    def _progresso(self, nome, feitos):
+        self.stdout.write(f'\r  {nome}: {feitos}', ending='')
+        self.stdout.flush()
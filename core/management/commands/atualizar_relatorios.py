@@ -0,0 +1,51 @@
+"""
+Cria e atualiza as materialized views das consultas especiais.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.reports import RELATORIOS, criar_views_materializadas, atualizar_views_materializadas
+
+
+class Command(BaseCommand):
+    help = (
+        'Atualiza (REFRESH MATERIALIZED VIEW CONCURRENTLY) as materialized views '
+        'dos relatórios. Use --criar na primeira execução.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'relatorios', nargs='*',
+            help=f"Relatórios a atualizar (padrão: todos). Opções: {', '.join(RELATORIOS)}.",
+        )
+        parser.add_argument(
+            '--criar', action='store_true',
+            help='Cria as materialized views e índices que ainda não existem.',
+        )
+        parser.add_argument(
+            '--intervalo', type=int, default=0,
+            help='Repete a atualização a cada N segundos (0 = executa uma vez).',
+        )
+
+    def handle(self, *args, **options):
+        nomes = options['relatorios'] or list(RELATORIOS)
+        invalidos = [nome for nome in nomes if nome not in RELATORIOS]
+        if invalidos:
+            raise CommandError(f"Relatório(s) desconhecido(s): {', '.join(invalidos)}.")
+
+        if options['criar']:
+            criar_views_materializadas(nomes)
+            self.stdout.write(self.style.SUCCESS('Materialized views criadas.'))
+
+        while True:
+            inicio = time.monotonic()
+            atualizados = atualizar_views_materializadas(nomes)
+            duracao = time.monotonic() - inicio
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(atualizados)} relatório(s) atualizado(s) em {duracao:.2f}s."
+            ))
+
+            if not options['intervalo']:
+                break
+            time.sleep(max(0, options['intervalo'] - duracao))
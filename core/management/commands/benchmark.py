@@ -0,0 +1,208 @@
+"""
+Mede o tempo de resposta de todas as páginas de core/urls.py.
+
+Cada URL é requisitada uma vez com os caches vazios ("frio") e depois
+--repeticoes vezes com os caches preenchidos ("quente"), registrando tempo,
+número de consultas e tempo no banco. O resultado é gravado em JSON, para
+comparar versões (ex.: antes e depois de gerar_dados --escala 100).
+"""
+import json
+import platform
+import statistics
+import time
+from contextlib import ExitStack
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+from core import auth, db_async, table_versions, urls
+from core.archive import ARQUIVOS
+from core.counters import CACHE_KEY as CONTADORES_CACHE_KEY, CONTADORES
+from core.exports import ENTIDADES
+from core.middleware import ColetorSQL
+from core.models import (
+    Lead, Cliente, Suporte, Projeto, Contrato, Financeiro, Tarefa,
+    ContaAPagar, ContaAReceber, Usuario
+)
+from core.reports import RELATORIOS
+
+
+# Rotas que alteram dados em um GET ou encerram a sessão
+IGNORADAS = ('logout', 'usuario_toggle_admin')
+
+# Rota de edição -> model do registro usado como exemplo
+MODELS_EDICAO = {
+    'lead_update': Lead,
+    'cliente_update': Cliente,
+    'suporte_update': Suporte,
+    'projeto_update': Projeto,
+    'contrato_update': Contrato,
+    'financeiro_update': Financeiro,
+    'tarefa_update': Tarefa,
+    'conta_pagar_update': ContaAPagar,
+    'conta_receber_update': ContaAReceber,
+    'usuario_update': Usuario,
+}
+
+
+def _exemplos(padrao):
+    """Argumentos (kwargs) com que cada rota é requisitada; vazio = ignorar."""
+    nome = padrao.name
+    parametros = padrao.pattern.converters
+
+    if nome in IGNORADAS or nome.endswith('_delete'):
+        return []
+    if not parametros:
+        return [{}]
+    if nome == 'relatorio_async':
+        return [{'nome': relatorio} for relatorio in RELATORIOS]
+    if nome == 'exportar_consulta':
+        return [{'nome': relatorio, 'formato': 'csv'} for relatorio in RELATORIOS]
+    if nome == 'exportar_entidade':
+        return [{'entidade': entidade, 'formato': 'csv'} for entidade in ENTIDADES]
+    if nome in MODELS_EDICAO:
+        pk = MODELS_EDICAO[nome].objects.values_list('pk', flat=True).first()
+        return [{'pk': pk}] if pk is not None else []
+    return []
+
+
+def _tabelas():
+    """Tabelas cujas versões compõem as chaves de cache das páginas."""
+    tabelas = {model._meta.db_table for model in apps.get_app_config('core').get_models()}
+    for relatorio in RELATORIOS.values():
+        tabelas.update(relatorio.tabelas)
+    for arquivo in ARQUIVOS.values():
+        tabelas.update(arquivo.tabelas)
+    return tabelas
+
+
+def _limpar_caches():
+    """
+    Esvazia apenas o que as páginas medidas guardam em cache. Um `cache.clear()`
+    apagaria todo o cache default (em Redis, o banco inteiro, com sessões e
+    dados de outros processos): em vez disso, muda a versão das tabelas
+    (relatórios e fragmentos das listagens) e descarta os contadores.
+    """
+    table_versions.incrementar(*_tabelas())
+    cache.delete(CONTADORES_CACHE_KEY)
+    auth._usuarios_validos.clear()
+
+
+class Command(BaseCommand):
+    help = 'Mede o tempo de resposta (cache frio e quente) de todas as páginas e grava um relatório JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', help='CPF do usuário usado nas requisições (padrão: um admin).')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Requisições com cache quente por URL.')
+        parser.add_argument('--saida', default='benchmark.json', help='Arquivo JSON de saída.')
+        parser.add_argument('--filtro', default='', help='Mede apenas as rotas cujo nome contém este texto.')
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser pelo menos 1.')
+
+        usuarios = Usuario.objects.order_by('perfil', 'cpf')  # 'admin' < 'normal'
+        if options['usuario']:
+            usuarios = usuarios.filter(cpf=options['usuario'])
+        usuario = usuarios.first()
+        if usuario is None:
+            raise CommandError('Nenhum usuário encontrado para autenticar as requisições.')
+
+        # Erros nas views viram respostas 500 no relatório, sem interromper a medição
+        client = Client(raise_request_exception=False)
+        session = client.session
+        session.update({
+            'usuario_cpf': usuario.cpf,
+            'usuario_nome': usuario.nome,
+            'usuario_email': usuario.email,
+            'usuario_perfil': usuario.perfil,
+        })
+        session.save()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        resultados = []
+        for padrao in urls.urlpatterns:
+            if not isinstance(padrao, URLPattern) or options['filtro'] not in (padrao.name or ''):
+                continue
+            for kwargs in _exemplos(padrao):
+                url = reverse(padrao.name, kwargs=kwargs)
+                resultado = self._medir(client, url, options['repeticoes'])
+                resultado['nome'] = padrao.name
+                resultados.append(resultado)
+                self.stdout.write(
+                    f"{url:55} {resultado['status']}  frio {resultado['frio']['ms']:8.1f} ms  "
+                    f"quente {resultado['quente']['mediana_ms']:8.1f} ms  "
+                    f"{resultado['quente']['consultas']:3d} consulta(s)"
+                )
+
+        relatorio = {
+            'gerado_em': timezone.now().isoformat(),
+            'ambiente': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'banco': connection.vendor,
+                'repeticoes': options['repeticoes'],
+            },
+            'volumes': self._volumes(),
+            'resultados': resultados,
+        }
+        with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(resultados)} URL(s) medida(s); relatório em {options['saida']}."))
+
+    def _requisitar(self, client, url):
+        coletor = ColetorSQL()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(coletor))
+            stack.enter_context(db_async.coletar(coletor))
+            inicio = time.perf_counter()
+            response = client.get(url, secure=True)
+            if response.streaming:
+                tamanho = sum(len(parte) for parte in response.streaming_content)
+            else:
+                tamanho = len(response.content)
+            duracao = (time.perf_counter() - inicio) * 1000
+
+        return response.status_code, tamanho, duracao, coletor
+
+    def _medir(self, client, url, repeticoes):
+        _limpar_caches()
+        status, tamanho, frio_ms, frio = self._requisitar(client, url)
+
+        tempos = []
+        consultas = tempo_db = 0
+        for _ in range(repeticoes):
+            _, _, duracao, coletor = self._requisitar(client, url)
+            tempos.append(duracao)
+            consultas, tempo_db = coletor.total, coletor.tempo * 1000
+
+        return {
+            'url': url,
+            'status': status,
+            'bytes': tamanho,
+            'frio': {'ms': round(frio_ms, 2), 'consultas': frio.total, 'db_ms': round(frio.tempo * 1000, 2)},
+            'quente': {
+                'min_ms': round(min(tempos), 2),
+                'mediana_ms': round(statistics.median(tempos), 2),
+                'max_ms': round(max(tempos), 2),
+                'consultas': consultas,
+                'db_ms': round(tempo_db, 2),
+            },
+        }
+
+    def _volumes(self):
+        with connection.cursor() as cursor:
+            volumes = {}
+            for tabela in CONTADORES.values():
+                cursor.execute(f'SELECT COUNT(*) FROM {tabela};')
+                volumes[tabela] = cursor.fetchone()[0]
+        return volumes
@@ -0,0 +1,35 @@
+"""
+Soma aos totais dos contadores do dashboard as variações gravadas pelos
+triggers (ver core/counters.py).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.counters import consolidar_contadores
+
+
+class Command(BaseCommand):
+    help = (
+        'Move as variações de contadores_delta para os totais em contadores, '
+        'mantendo rápida a leitura do modo mantido.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=int, default=0,
+            help='Repete a consolidação a cada N segundos (0 = executa uma vez).',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            inicio = time.monotonic()
+            consolidadas = consolidar_contadores()
+            duracao = time.monotonic() - inicio
+            self.stdout.write(self.style.SUCCESS(
+                f'{consolidadas} variação(ões) consolidada(s) em {duracao:.2f}s.'
+            ))
+
+            if not options['intervalo']:
+                break
+            time.sleep(max(0, options['intervalo'] - duracao))
@@ -0,0 +1,45 @@
+"""
+Converte em clientes, em massa, os leads que atendem a um filtro.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.conversions import STATUS_CONVERTIDO, contar_conversiveis, converter_leads, filtrar_leads
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria clientes a partir dos leads filtrados por status do funil e/ou origem '
+        '(um único INSERT ... SELECT) e atualiza o status desses leads.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status', action='append', default=[], dest='status_funil',
+            help='Status do funil dos leads a converter (pode repetir; padrão: todos).',
+        )
+        parser.add_argument(
+            '--origem', action='append', default=[],
+            help='Origem dos leads a converter (pode repetir; padrão: todas).',
+        )
+        parser.add_argument(
+            '--novo-status', default=STATUS_CONVERTIDO,
+            help=f'Status do funil dos leads convertidos (padrão: {STATUS_CONVERTIDO}).',
+        )
+        parser.add_argument('--plano-ativo', action='store_true', help='Cria os clientes com plano ativo.')
+        parser.add_argument('--simular', action='store_true', help='Apenas conta os leads que seriam convertidos.')
+
+    def handle(self, *args, **options):
+        leads = filtrar_leads(options['status_funil'], options['origem'])
+
+        if options['simular']:
+            total = contar_conversiveis(leads)
+            self.stdout.write(f'{total} lead(s) sem cliente atendem ao filtro.')
+            return
+
+        inicio = time.monotonic()
+        convertidos = converter_leads(leads, options['novo_status'], options['plano_ativo'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{convertidos} lead(s) convertido(s) em {time.monotonic() - inicio:.2f}s.'
+        ))
@@ -0,0 +1,254 @@
+"""
+Gera dados sintéticos, referencialmente consistentes, em todas as tabelas.
+
+Os registros são enviados com COPY FROM STDIN (`InsertQuery.build_copy`), em
+lotes com um commit cada. As chaves primárias de cada lote são pré-alocadas
+da sequência da tabela, para que as tabelas filhas possam referenciá-las sem
+consultar o banco de novo.
+"""
+import random
+import time
+from array import array
+from datetime import date, datetime, timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from actions.create import CreateTables
+from actions.insert import InsertQuery
+from core import table_versions
+from utils.connection_db import ConnectionDB
+
+
+# Volumes com --escala 1; --escala 100 gera 1M leads, 500 mil clientes e 5M chamados
+VOLUMES = {
+    'leads': 10_000,
+    'clientes': 5_000,
+    'suporte': 50_000,
+    'projetos': 1_000,
+    'contratos': 2_000,
+    'contas_pagar': 10_000,
+    'contas_receber': 20_000,
+}
+
+# Fração dos clientes que vieram de um lead (mesmo CPF, id_lead preenchido)
+FRACAO_CONVERTIDOS = 0.6
+
+NOMES = ['Ana', 'Bruno', 'Carla', 'Diego', 'Elaine', 'Felipe', 'Gabriela', 'Heitor',
+         'Isabela', 'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael']
+SOBRENOMES = ['Silva', 'Souza', 'Oliveira', 'Santos', 'Lima', 'Pereira', 'Costa',
+              'Almeida', 'Ferreira', 'Rodrigues', 'Gomes', 'Martins']
+ORIGENS = ['Instagram', 'Facebook', 'LinkedIn', 'Google Ads', 'Indicação', 'Outro']
+STATUS_FUNIL = ['Novo', 'Contato Realizado', 'Proposta Enviada', 'Negociação', 'Fechado', 'Perdido']
+PEDIDOS = ['Alteração de layout', 'Erro no site', 'Relatório mensal', 'Nova campanha',
+           'Ajuste de orçamento', 'Troca de senha', 'Dúvida sobre fatura']
+STATUS_PROJETO = ['Em andamento', 'Concluído', 'Pausado', 'Planejamento']
+STATUS_CONTRATO = ['Ativo', 'Inativo', 'Cancelado', 'Concluído']
+STATUS_TAREFA = ['Pendente', 'Em Andamento', 'Concluída']
+PRIORIDADES = ['Baixa', 'Média', 'Alta']
+STATUS_PAGAR = ['Pendente', 'Pago', 'Atrasado']
+STATUS_RECEBER = ['Pendente', 'Recebido', 'Atrasado']
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera dados sintéticos em todas as tabelas com COPY. '
+        'Use --escala para multiplicar os volumes padrão.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala', type=float, default=1.0,
+            help='Multiplicador dos volumes padrão '
+                 f"({', '.join(f'{t}={n}' for t, n in VOLUMES.items())}).",
+        )
+        for tabela in VOLUMES:
+            parser.add_argument(
+                f"--{tabela.replace('_', '-')}", type=int, dest=tabela,
+                help=f'Quantidade de registros em {tabela} (sobrepõe a escala).',
+            )
+        parser.add_argument('--financeiro-por-projeto', type=int, default=20)
+        parser.add_argument('--tarefas-por-projeto', type=int, default=10)
+        parser.add_argument('--lote', type=int, default=50_000, help='Registros por COPY/commit.')
+        parser.add_argument('--semente', type=int, default=None, help='Semente do gerador aleatório.')
+
+    def handle(self, *args, **options):
+        volumes = {
+            tabela: options[tabela] if options[tabela] is not None else int(padrao * options['escala'])
+            for tabela, padrao in VOLUMES.items()
+        }
+        self.rng = random.Random(options['semente'])
+        self.lote = options['lote']
+        self.hoje = date.today()
+        self.agora = datetime.now().replace(microsecond=0)
+
+        inicio = time.monotonic()
+        with ConnectionDB().connection() as conn:
+            self.conn = conn
+            self._gerar(volumes, options['financeiro_por_projeto'], options['tarefas_por_projeto'])
+
+        # COPY não dispara os sinais dos models: invalida listagens e relatórios
+        table_versions.incrementar(*(model._meta.db_table for model in apps.get_app_config('core').get_models()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Dados gerados em {time.monotonic() - inicio:.1f}s. '
+            'Execute ANALYZE para atualizar as estatísticas do planejador.'
+        ))
+
+    def _gerar(self, volumes, financeiro_por_projeto, tarefas_por_projeto):
+        rng = self.rng
+
+        with self.conn.cursor() as cur:
+            cur.execute('SELECT cpf FROM usuario;')
+            usuarios = [row[0] for row in cur.fetchall()]
+
+        leads = self._copiar('leads', 'id_lead', volumes['leads'], lambda id_lead: {
+            'nome': self._nome(),
+            'telefone': self._telefone(),
+            'email': f'lead{id_lead}@exemplo.com',
+            'origem': rng.choice(ORIGENS),
+            'status_funil': rng.choice(STATUS_FUNIL),
+            'cpf': f'1{id_lead:010d}',
+        })
+
+        # Os primeiros clientes são leads convertidos, sem repetir o lead
+        convertidos = rng.sample(range(len(leads)), min(len(leads), int(volumes['clientes'] * FRACAO_CONVERTIDOS)))
+        convertidos = iter([leads[i] for i in convertidos])
+
+        def cliente(id_cliente):
+            id_lead = next(convertidos, None)
+            return {
+                'nome': self._nome(),
+                'telefone': self._telefone(),
+                'email': f'cliente{id_cliente}@exemplo.com',
+                'cpf': f'1{id_lead:010d}' if id_lead is not None else f'2{id_cliente:010d}',
+                'plano_ativo': rng.random() < 0.7,
+                'id_lead': id_lead,
+            }
+
+        clientes = self._copiar('clientes', 'id_cliente', volumes['clientes'], cliente)
+
+        # Com `suporte` particionada, cada mês gerado precisa da sua partição
+        criador = CreateTables(self.conn)
+        if criador.is_partitioned('suporte'):
+            criador.create_suporte_partitions(start=self.agora - timedelta(days=3 * 365))
+
+        if clientes:
+            self._copiar('suporte', 'id_chamado', volumes['suporte'], lambda _: {
+                'nome_pedido': rng.choice(PEDIDOS),
+                'responsavel_solicitacao': self._nome(),
+                'descricao': f'{rng.choice(PEDIDOS)} solicitado pelo cliente.',
+                'data_solicitacao': self.agora - timedelta(seconds=rng.randrange(3 * 365 * 86400)),
+                'id_cliente': rng.choice(clientes),
+            })
+
+        projetos = self._copiar('projeto', 'id_projeto', volumes['projetos'], lambda id_projeto: {
+            'nome_projeto': f'Projeto {id_projeto}',
+            'descricao': f'Campanha de marketing para {self._nome()}.',
+            'status': rng.choice(STATUS_PROJETO),
+        })
+
+        self._copiar('financeiro', 'id_financeiro', len(projetos) * financeiro_por_projeto, lambda _: {
+            'descricao': 'Lançamento sintético',
+            'valor': self._valor(),
+            'data': self._data(-730, 0),
+            'tipo': rng.choice(['Receita', 'Despesa']),
+            'id_projeto': rng.choice(projetos),
+        })
+
+        self._copiar('tarefas', 'id_tarefas', len(projetos) * tarefas_por_projeto, lambda _: {
+            'responsavel': self._nome(),
+            'status': rng.choice(STATUS_TAREFA),
+            'prioridade': rng.choice(PRIORIDADES),
+            'descricao': 'Tarefa sintética',
+            'id_projeto': rng.choice(projetos),
+        })
+
+        def contrato(_):
+            inicio = self._data(-1095, 0)
+            return {
+                'data_inicio': inicio,
+                'data_termino': inicio + timedelta(days=rng.choice([180, 365, 730])),
+                'valor': self._valor(),
+                'status': rng.choice(STATUS_CONTRATO),
+                'cpf_responsavel': rng.choice(usuarios) if usuarios else None,
+            }
+
+        contratos = self._copiar('contrato', 'id_contrato', volumes['contratos'], contrato)
+        if clientes:
+            vinculos = iter(contratos)
+            self._copiar('cliente_contrato', None, len(contratos), lambda _: {
+                'id_cliente': rng.choice(clientes),
+                'id_contrato': next(vinculos),
+            })
+
+        self._copiar('conta_a_pagar', 'id_conta_pagar', volumes['contas_pagar'], lambda _: {
+            'home_beneficiada': self._nome(),
+            'data_vencimento': self._data(-365, 180),
+            'valor': self._valor(),
+            'descricao': 'Conta sintética',
+            'status': rng.choice(STATUS_PAGAR),
+        })
+
+        self._copiar('conta_a_receber', 'id_conta_receber', volumes['contas_receber'], lambda _: {
+            'data_recebimento': self._data(-365, 180) if rng.random() < 0.9 else None,
+            'valor': self._valor(),
+            'descricao': 'Recebimento sintético',
+            'id_cliente': rng.choice(clientes) if clientes and rng.random() < 0.95 else None,
+            'status': rng.choice(STATUS_RECEBER),
+        })
+
+    def _copiar(self, tabela, pk, total, gerar):
+        """
+        Insere `total` registros gerados por `gerar(id)` com COPY, em lotes.
+
+        Returns:
+            array: Ids pré-alocados (vazio se a tabela não tem `pk` SERIAL).
+        """
+        ids = array('q')
+        inicio = time.monotonic()
+        feitos = 0
+
+        while feitos < total:
+            n = min(self.lote, total - feitos)
+            try:
+                with self.conn.cursor() as cur:
+                    if pk:
+                        cur.execute(
+                            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s);",
+                            (tabela, pk, n)
+                        )
+                        lote_ids = [row[0] for row in cur.fetchall()]
+                        linhas = [{pk: id_, **gerar(id_)} for id_ in lote_ids]
+                    else:
+                        lote_ids = []
+                        linhas = [gerar(None) for _ in range(n)]
+
+                    statement, buffer = InsertQuery(tabela, linhas).build_copy()
+                    cur.copy_expert(statement.text(cur), buffer)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+            ids.extend(lote_ids)
+            feitos += n
+            self.stdout.write(f'\r  {tabela}: {feitos}/{total}', ending='')
+            self.stdout.flush()
+
+        if total:
+            self.stdout.write(f'\r  {tabela}: {total} registro(s) em {time.monotonic() - inicio:.1f}s')
+        return ids
+
+    def _nome(self):
+        return f'{self.rng.choice(NOMES)} {self.rng.choice(SOBRENOMES)}'
+
+    def _telefone(self):
+        return f'(11) 9{self.rng.randrange(10**8):08d}'
+
+    def _valor(self):
+        return round(self.rng.uniform(50, 20_000), 2)
+
+    def _data(self, de, ate):
+        """Data entre `de` e `ate` dias a partir de hoje."""
+        return self.hoje + timedelta(days=self.rng.randint(de, ate))
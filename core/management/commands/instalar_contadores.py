@@ -0,0 +1,18 @@
+"""
+Instala os contadores mantidos por triggers usados pelo dashboard.
+"""
+from django.core.management.base import BaseCommand
+
+from core.counters import CONTADORES, instalar_contadores
+
+
+class Command(BaseCommand):
+    help = 'Cria a tabela contadores e os triggers que a mantêm, e recalcula os totais.'
+
+    def handle(self, *args, **options):
+        instalar_contadores()
+        tabelas = ', '.join(CONTADORES.values())
+        self.stdout.write(self.style.SUCCESS(f'Contadores instalados para: {tabelas}.'))
+        self.stdout.write(
+            "Use DASHBOARD_COUNTERS_MODE='mantido' para que o dashboard leia desses contadores."
+        )
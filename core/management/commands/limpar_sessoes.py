@@ -0,0 +1,53 @@
+"""
+Remove do banco as sessões expiradas, em lotes.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Remove as sessões expiradas da tabela django_session em lotes pequenos, '
+        'sem bloquear a tabela por muito tempo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=5000, help='Sessões removidas por comando.')
+        parser.add_argument(
+            '--intervalo', type=int, default=0,
+            help='Repete a limpeza a cada N segundos (0 = executa uma vez).',
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies'):
+            self.stdout.write('Sessões em cookies assinados: não há sessões no banco para remover.')
+            return
+
+        while True:
+            inicio = time.monotonic()
+            removidas = self._limpar(options['lote'])
+            duracao = time.monotonic() - inicio
+            self.stdout.write(self.style.SUCCESS(
+                f'{removidas} sessão(ões) expirada(s) removida(s) em {duracao:.2f}s.'
+            ))
+
+            if not options['intervalo']:
+                break
+            time.sleep(max(0, options['intervalo'] - duracao))
+
+    def _limpar(self, lote):
+        agora = timezone.now()
+        total = 0
+        while True:
+            chaves = list(
+                Session.objects.filter(expire_date__lt=agora).values_list('session_key', flat=True)[:lote]
+            )
+            if not chaves:
+                return total
+            total += Session.objects.filter(session_key__in=chaves).delete()[0]
+            if len(chaves) < lote:
+                return total
@@ -0,0 +1,68 @@
+"""
+Mantém as partições mensais da tabela `suporte`.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from actions.create import MESES_FUTUROS, CreateTables
+from core.reports import RELATORIOS, criar_views_materializadas
+from utils.connection_db import ConnectionDB
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria de antemão as partições mensais de suporte e desanexa as antigas. '
+        'Use --converter uma vez para particionar uma tabela suporte existente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--converter', action='store_true',
+            help='Converte a tabela suporte atual em particionada (a atual vira a partição suporte_historico).',
+        )
+        parser.add_argument(
+            '--meses-futuros', type=int, default=MESES_FUTUROS,
+            help=f'Meses à frente com partição criada (padrão: {MESES_FUTUROS}).',
+        )
+        parser.add_argument(
+            '--reter-meses', type=int, default=None,
+            help='Desanexa as partições terminadas há mais de N meses (padrão: não desanexa).',
+        )
+        parser.add_argument('--listar', action='store_true', help='Lista as partições ao final.')
+
+    def handle(self, *args, **options):
+        with ConnectionDB().connection() as conn:
+            criador = CreateTables(conn)
+
+            if options['converter']:
+                if criador.partition_suporte(options['meses_futuros']):
+                    self._recriar_views_materializadas()
+            elif not criador.is_partitioned('suporte'):
+                raise CommandError('A tabela suporte não é particionada; use --converter.')
+
+            criadas = criador.create_suporte_partitions(options['meses_futuros'])
+            self.stdout.write(self.style.SUCCESS(f'{len(criadas)} partição(ões) criada(s).'))
+
+            if options['reter_meses'] is not None:
+                desanexadas = criador.detach_suporte_partitions(options['reter_meses'])
+                self.stdout.write(self.style.SUCCESS(f'{len(desanexadas)} partição(ões) desanexada(s).'))
+
+            if options['listar']:
+                for particao in criador.suporte_partitions():
+                    periodo = 'DEFAULT' if particao['default'] else f"{particao['inicio'] or '-∞'} a {particao['fim'] or '+∞'}"
+                    self.stdout.write(f"  {particao['nome']:25} {periodo}")
+
+    def _recriar_views_materializadas(self):
+        """As views que liam `suporte` passaram a ler `suporte_historico`: recria as existentes."""
+        nomes = []
+        with connection.cursor() as cursor:
+            for nome, relatorio in RELATORIOS.items():
+                if 'suporte' not in relatorio.tabelas:
+                    continue
+                cursor.execute('SELECT to_regclass(%s) IS NOT NULL;', [relatorio.view_materializada])
+                if cursor.fetchone()[0]:
+                    cursor.execute(f'DROP MATERIALIZED VIEW {relatorio.view_materializada};')
+                    nomes.append(nome)
+        if nomes:
+            criar_views_materializadas(nomes)
+            self.stdout.write(f"Materialized views recriadas: {', '.join(nomes)}.")
@@ -0,0 +1,184 @@
+"""
+Instrumentação de SQL por requisição.
+
+Registra, via `connection.execute_wrapper` (e, para o pool assíncrono de
+core/db_async.py, via `db_async.coletar`), quantas consultas cada
+requisição executou, o tempo total gasto no banco e quantas vezes o mesmo
+comando (a menos dos valores) se repetiu — o sintoma típico de N+1, como
+acessar uma FK sem `select_related` dentro de um loop do template.
+
+Requisições acima dos limites configurados são registradas no logger
+`core.sql` e toda resposta recebe o cabeçalho `Server-Timing` (visível na
+aba Network/Timing do navegador).
+
+Ativada por settings.SQL_INSTRUMENTACAO. Consultas executadas durante o
+envio de um StreamingHttpResponse (exportações) não são contadas.
+
+Também define o `ReplicaMiddleware`, que direciona as leituras das views
+somente leitura para a réplica (ver core/replica.py).
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import db_async, replica
+
+
+logger = logging.getLogger('core.sql')
+
+_LITERAIS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    """Forma normalizada do comando: literais e parâmetros viram `?`."""
+    for padrao, substituto in _LITERAIS:
+        sql = padrao.sub(substituto, sql)
+    return sql.strip()
+
+
+class ColetorSQL:
+    """Execute wrapper que acumula as estatísticas das consultas."""
+
+    def __init__(self):
+        self.total = 0
+        self.tempo = 0.0
+        self.comandos = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.registrar(sql, time.perf_counter() - inicio)
+
+    def registrar(self, sql, duracao):
+        """Conta uma consulta executada em `duracao` segundos."""
+        self.tempo += duracao
+        self.total += 1
+        self.comandos[fingerprint(sql)] += 1
+
+    def repetidos(self, minimo):
+        """Comandos executados pelo menos `minimo` vezes, do mais repetido ao menos."""
+        return [(sql, n) for sql, n in self.comandos.most_common() if n >= minimo]
+
+
+class InstrumentacaoSQLMiddleware:
+    """
+    Mede as consultas de cada requisição e registra as que passam do orçamento.
+    Síncrono e assíncrono: não força as views assíncronas para uma thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_consultas = getattr(settings, 'SQL_ORCAMENTO_CONSULTAS', 30)
+        self.max_tempo_ms = getattr(settings, 'SQL_ORCAMENTO_TEMPO_MS', 300)
+        self.max_repeticoes = getattr(settings, 'SQL_ORCAMENTO_REPETICOES', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        coletor = ColetorSQL()
+        inicio = time.perf_counter()
+        with self._instrumentar(coletor):
+            response = self.get_response(request)
+        return self._finalizar(request, response, coletor, inicio)
+
+    async def __acall__(self, request):
+        coletor = ColetorSQL()
+        inicio = time.perf_counter()
+        with self._instrumentar(coletor):
+            response = await self.get_response(request)
+        return self._finalizar(request, response, coletor, inicio)
+
+    def _instrumentar(self, coletor):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(coletor))
+        stack.enter_context(db_async.coletar(coletor))
+        return stack
+
+    def _finalizar(self, request, response, coletor, inicio):
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        db_ms = coletor.tempo * 1000
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.1f};desc="{coletor.total} consultas", '
+            f'total;dur={total_ms:.1f}'
+        )
+        self._verificar_orcamento(request, coletor, db_ms)
+        return response
+
+    def _verificar_orcamento(self, request, coletor, db_ms):
+        repetidos = coletor.repetidos(self.max_repeticoes)
+        if coletor.total <= self.max_consultas and db_ms <= self.max_tempo_ms and not repetidos:
+            return
+
+        logger.warning(
+            '%s %s: %d consultas, %.1f ms no banco',
+            request.method, request.path, coletor.total, db_ms,
+        )
+        for sql, vezes in repetidos:
+            logger.warning('  %dx (possível N+1): %s', vezes, sql[:300])
+
+
+class ReplicaMiddleware:
+    """
+    Ativa a réplica durante as views marcadas com `@usa_replica` e fixa no
+    default, por REPLICA_JANELA_SEGUNDOS, as sessões que acabaram de escrever.
+    Deve vir depois do SessionMiddleware. Síncrono e assíncrono.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tokens = replica.iniciar()
+        try:
+            response = self.get_response(request)
+            if replica.deve_fixar(request):
+                replica.fixar_primario(request)
+        finally:
+            replica.encerrar(tokens)
+        return response
+
+    async def __acall__(self, request):
+        tokens = replica.iniciar()
+        try:
+            response = await self.get_response(request)
+            if replica.deve_fixar(request):
+                # Pode carregar a sessão do banco
+                await sync_to_async(replica.fixar_primario)(request)
+        finally:
+            replica.encerrar(tokens)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Lê a sessão (talvez do banco): no modo assíncrono o Django a chama
+        # por sync_to_async, que devolve a ContextVar alterada à requisição
+        replica.ativar(request, view_func)
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinanceiroComArquivo',
+            fields=[
+                ('id_financeiro', models.IntegerField(primary_key=True, serialize=False)),
+                ('descricao', models.CharField(blank=True, max_length=200, null=True)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.DateField(null=True)),
+                ('tipo', models.CharField(choices=[('Receita', 'Receita'), ('Despesa', 'Despesa')], max_length=50)),
+                ('arquivado', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'financeiro_com_arquivo',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SuporteComArquivo',
+            fields=[
+                ('id_chamado', models.IntegerField(primary_key=True, serialize=False)),
+                ('nome_pedido', models.CharField(max_length=100)),
+                ('responsavel_solicitacao', models.CharField(blank=True, max_length=100, null=True)),
+                ('descricao', models.TextField(blank=True, null=True)),
+                ('data_solicitacao', models.DateTimeField()),
+                ('arquivado', models.BooleanField()),
+            ],
+            options={
+                'db_table': 'suporte_com_arquivo',
+                'managed': False,
+            },
+        ),
+    ]
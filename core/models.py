@@ -43,7 +43,14 @@ class Cliente(models.Model):
 
 
 class Suporte(models.Model):
-    """Model para tabela de Suporte"""
+    """
+    Model para tabela de Suporte.
+
+    A tabela pode ser particionada por mês de `data_solicitacao` (ver
+    `manage.py particionar_suporte`); nesse caso a chave primária no banco é
+    (id_chamado, data_solicitacao), mas id_chamado continua único (vem da
+    sequência) e segue como a chave do model.
+    """
     id_chamado = models.AutoField(primary_key=True)
     nome_pedido = models.CharField(max_length=100)
     responsavel_solicitacao = models.CharField(max_length=100, null=True, blank=True)
@@ -233,3 +240,49 @@ class UsuarioTarefa(models.Model):
 
     def __str__(self):
         return f"Usuario {self.cpf_usuario} - Tarefa {self.id_tarefa}"
+
+
+class SuporteComArquivo(models.Model):
+    """
+    Chamados de suporte ativos e arquivados (view suporte_com_arquivo; ver
+    core/archive.py). Somente leitura.
+    """
+    id_chamado = models.IntegerField(primary_key=True)
+    nome_pedido = models.CharField(max_length=100)
+    responsavel_solicitacao = models.CharField(max_length=100, null=True, blank=True)
+    descricao = models.TextField(null=True, blank=True)
+    data_solicitacao = models.DateTimeField()
+    id_cliente = models.ForeignKey(
+        Cliente, on_delete=models.DO_NOTHING, db_column='id_cliente', related_name='+'
+    )
+    arquivado = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'suporte_com_arquivo'
+
+    def __str__(self):
+        return self.nome_pedido
+
+
+class FinanceiroComArquivo(models.Model):
+    """
+    Lançamentos do financeiro ativos e arquivados (view financeiro_com_arquivo;
+    ver core/archive.py). Somente leitura.
+    """
+    id_financeiro = models.IntegerField(primary_key=True)
+    descricao = models.CharField(max_length=200, null=True, blank=True)
+    valor = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.DateField(null=True)
+    tipo = models.CharField(max_length=50, choices=Financeiro.TIPO_CHOICES)
+    id_projeto = models.ForeignKey(
+        Projeto, on_delete=models.DO_NOTHING, null=True, blank=True, db_column='id_projeto', related_name='+'
+    )
+    arquivado = models.BooleanField()
+
+    class Meta:
+        managed = False
+        db_table = 'financeiro_com_arquivo'
+
+    def __str__(self):
+        return f"{self.tipo} - R$ {self.valor}"
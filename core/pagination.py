@@ -0,0 +1,205 @@
+"""
+Paginação por cursor (keyset) para as listagens do sistema.
+
+Em vez de OFFSET, cada página busca as linhas "depois" (ou "antes") da
+última linha exibida, comparando pelas mesmas colunas do `order_by`, com a
+chave primária como desempate. O custo de cada página não depende da
+posição na tabela.
+"""
+import base64
+import datetime
+import decimal
+import json
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class KeysetPage:
+    """Uma página de resultados e os parâmetros de navegação."""
+
+    def __init__(self, object_list, query_params, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._query_params = query_params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_query(self):
+        """Query string da próxima página, preservando os demais parâmetros GET."""
+        return self._build_query('after', self.next_cursor)
+
+    @property
+    def previous_query(self):
+        """Query string da página anterior, preservando os demais parâmetros GET."""
+        return self._build_query('before', self.previous_cursor)
+
+    def _build_query(self, key, cursor):
+        params = self._query_params.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[key] = cursor
+        return params.urlencode()
+
+
+def keyset_paginate(request, queryset, ordering, page_size=None):
+    """
+    Pagina `queryset` por cursor a partir dos parâmetros `after`/`before` da URL.
+
+    Args:
+        request: HttpRequest atual.
+        queryset: QuerySet sem ordenação (a ordenação é aplicada aqui).
+        ordering (list[str]): Campos no formato do `order_by` (ex.: ['-data_solicitacao']).
+            A chave primária é acrescentada como desempate se não estiver presente.
+        page_size (int, optional): Linhas por página (padrão: settings.LIST_PAGE_SIZE).
+
+    Returns:
+        KeysetPage
+    """
+    page_size = page_size or getattr(settings, 'LIST_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    model = queryset.model
+    keys = _keys(model, ordering)
+
+    after = _decode_cursor(keys, request.GET.get('after'))
+    before = _decode_cursor(keys, request.GET.get('before')) if after is None else None
+    backwards = before is not None
+    cursor = before if backwards else after
+
+    qs = queryset.order_by(*_order_by(keys, backwards))
+    if cursor is not None:
+        qs = qs.filter(_seek(keys, cursor, backwards))
+
+    rows = list(qs[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    next_cursor = previous_cursor = None
+    if rows:
+        first, last = _encode_cursor(keys, rows[0]), _encode_cursor(keys, rows[-1])
+        if backwards:
+            next_cursor = last
+            previous_cursor = first if has_more else None
+        else:
+            next_cursor = last if has_more else None
+            previous_cursor = first if cursor is not None else None
+
+    return KeysetPage(rows, request.GET, next_cursor, previous_cursor)
+
+
+def _keys(model, ordering):
+    """Converte a ordenação em (attname, descendente, aceita_nulo, campo), com a PK no final."""
+    pk_name = model._meta.pk.name
+    keys = []
+    for item in ordering:
+        desc = item.startswith('-')
+        name = item.lstrip('-')
+        field = model._meta.get_field(name)
+        keys.append((field.attname, desc, field.null, field))
+    if not keys or keys[-1][0] != model._meta.pk.attname:
+        desc = keys[-1][1] if keys else True
+        keys.append((model._meta.pk.attname, desc, False, model._meta.get_field(pk_name)))
+    return keys
+
+
+def _order_by(keys, backwards):
+    # Colunas que aceitam NULL: NULLs sempre ao final da ordem "para frente"
+    expressions = []
+    for attname, desc, nullable, _ in keys:
+        expression = F(attname).desc if desc != backwards else F(attname).asc
+        if nullable:
+            expressions.append(expression(**({'nulls_first': True} if backwards else {'nulls_last': True})))
+        else:
+            expressions.append(expression())
+    return expressions
+
+
+def _strictly_after(attname, desc, nullable, value, backwards):
+    lookup = 'lt' if desc != backwards else 'gt'
+    if value is None:
+        # Dentro do bloco de NULLs não há "maior/menor"; voltando, vêm os não nulos
+        return Q(**{f'{attname}__isnull': False}) if backwards else None
+    condition = Q(**{f'{attname}__{lookup}': value})
+    if nullable and not backwards:
+        condition |= Q(**{f'{attname}__isnull': True})
+    return condition
+
+
+def _seek(keys, values, backwards):
+    condition = None
+    equal = Q()
+    for (attname, desc, nullable, _), value in zip(keys, values):
+        after = _strictly_after(attname, desc, nullable, value, backwards)
+        if after is not None:
+            condition = equal & after if condition is None else condition | (equal & after)
+        equal &= Q(**{f'{attname}__isnull': True}) if value is None else Q(**{attname: value})
+
+    # Limite redundante na primeira coluna para permitir varredura por faixa no índice
+    attname, desc, nullable, _ = keys[0]
+    if not nullable and values[0] is not None:
+        bound = 'lte' if desc != backwards else 'gte'
+        condition &= Q(**{f'{attname}__{bound}': values[0]})
+    return condition
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """
+    Valores do cursor sem perda de precisão: o DjangoJSONEncoder corta
+    datetimes e horas em milissegundos, o que faria a próxima página pular ou
+    repetir linhas cujos microssegundos caem nesse intervalo.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        if isinstance(o, (decimal.Decimal, uuid.UUID)):
+            return str(o)
+        return super().default(o)
+
+
+def _encode_cursor(keys, obj):
+    values = [getattr(obj, attname) for attname, _, _, _ in keys]
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(keys, token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            return None
+        return [
+            None if value is None else field.to_python(value)
+            for (_, _, _, field), value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, ValidationError):
+        # Cursor inválido ou adulterado: volta para a primeira página
+        return None
@@ -0,0 +1,121 @@
+"""
+Leituras em uma réplica do banco (alias `replica` em settings.DATABASES).
+
+Apenas as views marcadas com `@usa_replica` (listagens, relatórios,
+dashboard e exportações) leem da réplica, e só em requisições GET/HEAD: o
+`ReplicaMiddleware` (core/middleware.py) ativa a réplica durante a view e o
+`ReplicaRouter` direciona para ela as leituras dos models do app core.
+Escritas vão sempre para o `default`.
+
+Como a réplica pode estar atrasada, uma sessão que acabou de escrever (POST
+ou qualquer escrita do ORM em um model do core) lê do `default` por
+REPLICA_JANELA_SEGUNDOS, para ver as próprias alterações. Consultas SQL
+diretas escolhem a conexão com `alias_leitura()`.
+
+Sem o alias `replica` configurado (DB_REPLICA_HOST), tudo segue no `default`.
+"""
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+REPLICA = 'replica'
+
+# Chave da sessão com o instante (time.time()) até o qual ela lê do default
+SESSAO_PRIMARIO_ATE = 'primario_ate'
+
+# Alias das leituras na requisição atual (None = default)
+_alias_leitura = ContextVar('alias_leitura', default=None)
+
+# Se a requisição atual escreveu em algum model do core
+_escreveu = ContextVar('escreveu', default=False)
+
+
+def replica_configurada():
+    return REPLICA in settings.DATABASES
+
+
+def alias_leitura():
+    """Alias das leituras na requisição atual: 'replica' ou 'default'."""
+    return _alias_leitura.get() or 'default'
+
+
+def usa_replica(view_func):
+    """
+    Marca uma view somente leitura, cujas consultas podem ir para a réplica.
+    Deve ser o decorator mais externo (acima de `@require_login`).
+    """
+    view_func.usa_replica = True
+    return view_func
+
+
+def ttl_cache(ttl):
+    """
+    TTL para um resultado lido agora: vindo da réplica, no máximo
+    REPLICA_JANELA_SEGUNDOS, para que um resultado atrasado não fique em
+    cache até a próxima escrita.
+    """
+    if alias_leitura() == 'default':
+        return ttl
+    return min(ttl, getattr(settings, 'REPLICA_JANELA_SEGUNDOS', 10))
+
+
+def ativar(request, view_func):
+    """Ativa a réplica para a view, se ela for elegível. Chamado em process_view."""
+    if not replica_configurada() or not getattr(view_func, 'usa_replica', False):
+        return
+    if request.method not in ('GET', 'HEAD'):
+        return
+    if request.session.get(SESSAO_PRIMARIO_ATE, 0) > time.time():
+        return
+    _alias_leitura.set(REPLICA)
+
+
+def iniciar():
+    """Estado limpo para uma requisição; retorna os tokens para `encerrar`."""
+    return _alias_leitura.set(None), _escreveu.set(False)
+
+
+def deve_fixar(request):
+    """Se a requisição escreveu e a sessão deve passar a ler do default."""
+    escreveu = _escreveu.get() or request.method not in ('GET', 'HEAD', 'OPTIONS')
+    return escreveu and replica_configurada() and hasattr(request, 'session')
+
+
+def fixar_primario(request):
+    """Faz a sessão ler do default pelos próximos REPLICA_JANELA_SEGUNDOS."""
+    request.session[SESSAO_PRIMARIO_ATE] = time.time() + getattr(settings, 'REPLICA_JANELA_SEGUNDOS', 10)
+
+
+def encerrar(tokens):
+    """Restaura o estado anterior a `iniciar`."""
+    token_alias, token_escrita = tokens
+    _alias_leitura.reset(token_alias)
+    _escreveu.reset(token_escrita)
+
+
+class ReplicaRouter:
+    """
+    Leituras dos models do core vão para o alias ativo na requisição
+    (`alias_leitura()`); escritas e os demais apps (sessões, auth,
+    contenttypes), sempre para o default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'core':
+            return alias_leitura()
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label == 'core':
+            _escreveu.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A réplica tem os mesmos dados do default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # O esquema chega à réplica pela replicação
+        return db == 'default'
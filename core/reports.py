@@ -0,0 +1,446 @@
+"""
+Registro das consultas especiais (relatórios) e sua versão materializada.
+
+Cada relatório pode ser executado diretamente nas tabelas ou lido de uma
+MATERIALIZED VIEW (`mv_<nome>`) atualizada periodicamente com
+`REFRESH MATERIALIZED VIEW CONCURRENTLY` pelo comando
+`manage.py atualizar_relatorios`.
+"""
+import psycopg
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections, transaction
+from django.utils import timezone
+
+from . import archive, db_async, replica, table_versions
+
+
+# Pseudo-tabela cuja versão muda a cada REFRESH das materialized views
+MATERIALIZADAS = 'relatorios_materializados'
+
+
+# Resumo financeiro: agregados das linhas ativas por projeto, somados (se
+# existir) aos do financeiro arquivado
+_RESUMO_FINANCEIRO = """
+            SELECT
+                p.id_projeto,
+                p.nome_projeto,
+                SUM(t.total_registros) as total_registros,
+                SUM(t.total_receitas) as total_receitas,
+                SUM(t.total_despesas) as total_despesas,
+                SUM(t.saldo) as saldo,
+                SUM(t.soma_valor) / SUM(t.total_registros) as media_valor
+            FROM projeto p
+            JOIN (
+                SELECT
+                    id_projeto,
+                    COUNT(*) as total_registros,
+                    SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE 0 END) as total_receitas,
+                    SUM(CASE WHEN tipo = 'Despesa' THEN valor ELSE 0 END) as total_despesas,
+                    SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE -valor END) as saldo,
+                    SUM(valor) as soma_valor
+                FROM financeiro
+                WHERE id_projeto IS NOT NULL
+                GROUP BY id_projeto{arquivado}
+            ) t ON t.id_projeto = p.id_projeto
+            GROUP BY p.id_projeto, p.nome_projeto
+            HAVING SUM(t.total_registros) > 0
+        """
+
+_RESUMO_FINANCEIRO_ARQUIVADO = """
+
+                UNION ALL
+
+                SELECT id_projeto, total_registros, total_receitas, total_despesas, saldo, soma_valor
+                FROM financeiro_arquivo_resumo"""
+
+
+class Relatorio:
+    """
+    Definição de um relatório.
+
+    Args:
+        nome (str): Identificador (usado no nome da materialized view).
+        titulo (str): Título exibido.
+        descricao (str): Descrição exibida.
+        sql (str): Consulta sem ORDER BY/LIMIT.
+        ordem (str): Cláusula ORDER BY (e LIMIT), aplicada tanto à consulta
+            direta quanto à leitura da materialized view.
+        chave (tuple): Colunas que identificam uma linha (índice único exigido
+            pelo REFRESH ... CONCURRENTLY).
+        tabelas (tuple): Tabelas lidas pela consulta; escritas nelas invalidam
+            o resultado em cache.
+        arquivaveis (tuple, optional): Tabelas com arquivo (core/archive.py),
+            escritas no `sql` como `{tabela}`; com o arquivo incluído, são
+            lidas das views `<tabela>_com_arquivo`.
+        sql_sem_arquivo (str, optional): Consulta usada enquanto as tabelas de
+            arquivo não existem (ver `archive.disponivel`), para um `sql` que
+            as lê sempre.
+    """
+
+    def __init__(self, nome, titulo, descricao, sql, ordem, chave, tabelas, arquivaveis=(),
+                 sql_sem_arquivo=None):
+        self.nome = nome
+        self.titulo = titulo
+        self.descricao = descricao
+        self.sql_modelo = sql
+        self.ordem = ordem
+        self.chave = chave
+        self.tabelas = tabelas
+        self.arquivaveis = arquivaveis
+        self.sql_sem_arquivo = sql_sem_arquivo
+        self.sql = self.sql_para(com_arquivo=False)
+
+    @property
+    def usa_arquivo(self):
+        """Se a consulta depende das tabelas de arquivo existirem."""
+        return bool(self.arquivaveis or self.sql_sem_arquivo)
+
+    def sql_para(self, com_arquivo, arquivo_disponivel=True):
+        """
+        Consulta lendo (ou não) também as linhas arquivadas; sem as tabelas de
+        arquivo no banco, apenas as tabelas ativas.
+        """
+        if not arquivo_disponivel:
+            com_arquivo = False
+            if self.sql_sem_arquivo:
+                return self.sql_sem_arquivo
+        if not self.arquivaveis:
+            return self.sql_modelo
+        return self.sql_modelo.format(**{
+            tabela: f'{tabela}_com_arquivo' if com_arquivo else tabela
+            for tabela in self.arquivaveis
+        })
+
+    def tabelas_para(self, com_arquivo):
+        """Tabelas lidas pela consulta (invalidação do cache)."""
+        if not com_arquivo:
+            return self.tabelas
+        return self.tabelas + tuple(f'{tabela}_arquivo' for tabela in self.arquivaveis)
+
+    @property
+    def view_materializada(self):
+        return f'mv_{self.nome}'
+
+    def query_direta(self, com_arquivo=False, arquivo_disponivel=True):
+        return f'{self.sql_para(com_arquivo, arquivo_disponivel)}\n{self.ordem};'
+
+    def query_materializada(self):
+        return f'SELECT * FROM {self.view_materializada}\n{self.ordem};'
+
+
+RELATORIOS = {r.nome: r for r in [
+    Relatorio(
+        nome='clientes_chamados',
+        titulo='Clientes com Chamados Acima da Média',
+        descricao='Clientes que possuem mais chamados de suporte do que a média',
+        sql="""
+            SELECT c.id_cliente, c.nome, c.email, COUNT(s.id_chamado) as total_chamados
+            FROM clientes c
+            LEFT JOIN {suporte} s ON c.id_cliente = s.id_cliente
+            GROUP BY c.id_cliente, c.nome, c.email
+            HAVING COUNT(s.id_chamado) > (
+                SELECT AVG(chamados_por_cliente)
+                FROM (
+                    SELECT COUNT(*) as chamados_por_cliente
+                    FROM {suporte}
+                    GROUP BY id_cliente
+                ) AS subconsulta
+            )
+        """,
+        ordem='ORDER BY total_chamados DESC',
+        chave=('id_cliente',),
+        tabelas=('clientes', 'suporte'),
+        arquivaveis=('suporte',),
+    ),
+    Relatorio(
+        nome='projetos_alta_prioridade',
+        titulo='Projetos com Tarefas de Alta Prioridade',
+        descricao='Projetos que possuem tarefas marcadas com prioridade alta',
+        sql="""
+            SELECT p.id_projeto, p.nome_projeto, p.status,
+                   (SELECT COUNT(*)
+                    FROM tarefas t
+                    WHERE t.id_projeto = p.id_projeto
+                      AND t.prioridade = 'Alta') as tarefas_alta_prioridade
+            FROM projeto p
+            WHERE EXISTS (
+                SELECT 1
+                FROM tarefas t
+                WHERE t.id_projeto = p.id_projeto
+                  AND t.prioridade = 'Alta'
+            )
+        """,
+        ordem='ORDER BY tarefas_alta_prioridade DESC',
+        chave=('id_projeto',),
+        tabelas=('projeto', 'tarefas'),
+    ),
+    Relatorio(
+        nome='resumo_financeiro',
+        titulo='Resumo Financeiro por Projeto',
+        descricao='Análise completa das receitas, despesas e saldo de cada projeto',
+        sql=_RESUMO_FINANCEIRO.format(arquivado=_RESUMO_FINANCEIRO_ARQUIVADO),
+        sql_sem_arquivo=_RESUMO_FINANCEIRO.format(arquivado=''),
+        ordem='ORDER BY saldo DESC',
+        chave=('id_projeto',),
+        tabelas=('projeto', 'financeiro', 'financeiro_arquivo_resumo'),
+    ),
+    Relatorio(
+        nome='estatisticas_suporte',
+        titulo='Estatísticas de Suporte por Cliente',
+        descricao='Top 10 clientes com mais chamados de suporte e suas estatísticas',
+        sql="""
+            SELECT
+                c.id_cliente,
+                c.nome,
+                c.email,
+                COUNT(s.id_chamado) as total_chamados,
+                MAX(s.data_solicitacao) as ultimo_chamado,
+                MIN(s.data_solicitacao) as primeiro_chamado
+            FROM clientes c
+            LEFT JOIN {suporte} s ON c.id_cliente = s.id_cliente
+            GROUP BY c.id_cliente, c.nome, c.email
+        """,
+        ordem='ORDER BY total_chamados DESC\nLIMIT 10',
+        chave=('id_cliente',),
+        tabelas=('clientes', 'suporte'),
+        arquivaveis=('suporte',),
+    ),
+    Relatorio(
+        nome='contas_pendentes',
+        titulo='Contas Pendentes - União',
+        descricao='Todas as contas a pagar e receber com status pendente (UNION)',
+        sql="""
+            SELECT
+                'A Pagar' as tipo_conta,
+                id_conta_pagar as id_conta,
+                descricao,
+                valor,
+                data_vencimento as data,
+                status
+            FROM conta_a_pagar
+            WHERE status = 'Pendente'
+
+            UNION ALL
+
+            SELECT
+                'A Receber' as tipo_conta,
+                id_conta_receber as id_conta,
+                descricao,
+                valor,
+                data_recebimento as data,
+                status
+            FROM conta_a_receber
+            WHERE status = 'Pendente'
+        """,
+        ordem='ORDER BY data',
+        chave=('tipo_conta', 'id_conta'),
+        tabelas=('conta_a_pagar', 'conta_a_receber'),
+    ),
+    Relatorio(
+        nome='cpfs_comum',
+        titulo='CPFs em Comum - Intersecção',
+        descricao='CPFs que aparecem tanto na tabela de leads quanto de clientes (INTERSECT)',
+        sql="""
+            SELECT cpf, 'Lead e Cliente' as tipo
+            FROM leads
+            WHERE cpf IS NOT NULL
+
+            INTERSECT
+
+            SELECT cpf, 'Lead e Cliente' as tipo
+            FROM clientes
+            WHERE cpf IS NOT NULL
+        """,
+        ordem='ORDER BY cpf',
+        chave=('cpf',),
+        tabelas=('leads', 'clientes'),
+    ),
+]}
+
+
+def _fetch_dicts(cursor, query, params=None):
+    cursor.execute(query, params or [])
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _modo(relatorio, materializado, com_arquivo):
+    """(materializado, com_arquivo) efetivos: o arquivo só é lido na consulta direta."""
+    com_arquivo = bool(com_arquivo and relatorio.arquivaveis)
+    if com_arquivo:
+        return False, True
+    if materializado is None:
+        materializado = getattr(settings, 'RELATORIOS_MATERIALIZADOS', False)
+    return materializado, False
+
+
+def executar_relatorio(nome, materializado=None, com_arquivo=False):
+    """
+    Executa um relatório.
+
+    Args:
+        nome (str): Chave em RELATORIOS.
+        materializado (bool, optional): Ler da materialized view
+            (padrão: settings.RELATORIOS_MATERIALIZADOS). Se a view ainda não
+            existir, a consulta direta é usada.
+        com_arquivo (bool, optional): Incluir as linhas arquivadas
+            (ver `Relatorio.arquivaveis`); sempre pela consulta direta.
+            Ignorado enquanto as tabelas de arquivo não existem.
+
+    Returns:
+        tuple: (lista de dicts, datetime da última atualização ou None se direto)
+    """
+    relatorio = RELATORIOS[nome]
+    alias = replica.alias_leitura()
+    disponivel = archive.disponivel(alias) if relatorio.usa_arquivo else True
+    materializado, com_arquivo = _modo(relatorio, materializado, com_arquivo and disponivel)
+
+    if materializado:
+        try:
+            with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                cursor.execute(
+                    'SELECT atualizado_em FROM relatorios_atualizacao WHERE nome = %s;',
+                    [relatorio.nome]
+                )
+                row = cursor.fetchone()
+                if row is not None:
+                    return _fetch_dicts(cursor, relatorio.query_materializada()), row[0]
+        except DatabaseError:
+            # Materialized views ainda não criadas: usa a consulta direta
+            pass
+
+    with connections[alias].cursor() as cursor:
+        return _fetch_dicts(cursor, relatorio.query_direta(com_arquivo, disponivel)), None
+
+
+def _chave_cache(nome, materializado, com_arquivo=False):
+    tabelas = RELATORIOS[nome].tabelas_para(com_arquivo) + ((MATERIALIZADAS,) if materializado else ())
+    return (
+        f'relatorio:{nome}:{int(materializado)}:{int(com_arquivo)}:'
+        f'{table_versions.assinatura(tabelas)}'
+    )
+
+
+def obter_relatorio(nome, materializado=None, com_arquivo=False):
+    """
+    Versão em cache de `executar_relatorio`.
+
+    A chave inclui as versões das tabelas lidas pelo relatório, de modo que
+    qualquer escrita nelas (sinais post_save/post_delete) torna o resultado
+    anterior inacessível. No modo materializado, a versão muda também a cada
+    REFRESH das views.
+    """
+    materializado, com_arquivo = _modo(RELATORIOS[nome], materializado, com_arquivo)
+
+    key = _chave_cache(nome, materializado, com_arquivo)
+    resultado = cache.get(key)
+    if resultado is None:
+        resultado = executar_relatorio(nome, materializado, com_arquivo)
+        cache.set(key, resultado, replica.ttl_cache(getattr(settings, 'RELATORIOS_CACHE_TTL', 300)))
+    return resultado
+
+
+async def executar_relatorio_async(nome, materializado=None, com_arquivo=False):
+    """Equivalente assíncrono de `executar_relatorio`, com o driver async do psycopg 3."""
+    relatorio = RELATORIOS[nome]
+    disponivel = await archive.disponivel_async() if relatorio.usa_arquivo else True
+    materializado, com_arquivo = _modo(relatorio, materializado, com_arquivo and disponivel)
+
+    if materializado:
+        try:
+            row = await db_async.fetch_one(
+                'SELECT atualizado_em FROM relatorios_atualizacao WHERE nome = %s;',
+                [relatorio.nome]
+            )
+            if row is not None:
+                return await db_async.fetch_all(relatorio.query_materializada()), row['atualizado_em']
+        except psycopg.Error:
+            # Materialized views ainda não criadas: usa a consulta direta
+            pass
+
+    return await db_async.fetch_all(relatorio.query_direta(com_arquivo, disponivel)), None
+
+
+async def obter_relatorio_async(nome, materializado=None, com_arquivo=False):
+    """Equivalente assíncrono de `obter_relatorio` (mesmo cache e invalidação)."""
+    materializado, com_arquivo = _modo(RELATORIOS[nome], materializado, com_arquivo)
+
+    key = await sync_to_async(_chave_cache)(nome, materializado, com_arquivo)
+    resultado = await cache.aget(key)
+    if resultado is None:
+        resultado = await executar_relatorio_async(nome, materializado, com_arquivo)
+        await cache.aset(key, resultado, replica.ttl_cache(getattr(settings, 'RELATORIOS_CACHE_TTL', 300)))
+    return resultado
+
+
+def esta_desatualizado(atualizado_em):
+    """Indica se os dados materializados passaram da idade máxima configurada."""
+    if atualizado_em is None:
+        return False
+    idade_maxima = getattr(settings, 'RELATORIOS_IDADE_MAXIMA', 3600)
+    return (timezone.now() - atualizado_em).total_seconds() > idade_maxima
+
+
+# =============================================================================
+# CRIAÇÃO E ATUALIZAÇÃO DAS MATERIALIZED VIEWS
+# =============================================================================
+
+def criar_views_materializadas(nomes=None):
+    """
+    Cria (se necessário) as materialized views, seus índices únicos e a tabela
+    de controle. Sem as tabelas de arquivo, as views leem apenas as tabelas
+    ativas (recriadas por `manage.py arquivar --criar`).
+    """
+    disponivel = archive.disponivel('default')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS relatorios_atualizacao (
+                nome VARCHAR(100) PRIMARY KEY,
+                atualizado_em TIMESTAMPTZ NOT NULL
+            );
+            """
+        )
+        for nome in nomes or RELATORIOS:
+            relatorio = RELATORIOS[nome]
+            mv = relatorio.view_materializada
+            cursor.execute(
+                f'CREATE MATERIALIZED VIEW IF NOT EXISTS {mv} AS {relatorio.sql_para(False, disponivel)} WITH DATA;'
+            )
+            cursor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {mv}_chave ON {mv} ({', '.join(relatorio.chave)});"
+            )
+            _marcar_atualizacao(cursor, nome)
+    table_versions.incrementar(MATERIALIZADAS)
+
+
+def atualizar_views_materializadas(nomes=None):
+    """
+    Atualiza as materialized views com REFRESH ... CONCURRENTLY, sem
+    bloquear as leituras em andamento.
+
+    Returns:
+        list: Nomes dos relatórios atualizados.
+    """
+    atualizados = []
+    for nome in nomes or RELATORIOS:
+        relatorio = RELATORIOS[nome]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {relatorio.view_materializada};')
+            _marcar_atualizacao(cursor, nome)
+        atualizados.append(nome)
+    table_versions.incrementar(MATERIALIZADAS)
+    return atualizados
+
+
+def _marcar_atualizacao(cursor, nome):
+    cursor.execute(
+        """
+        INSERT INTO relatorios_atualizacao (nome, atualizado_em)
+        VALUES (%s, now())
+        ON CONFLICT (nome) DO UPDATE SET atualizado_em = EXCLUDED.atualizado_em;
+        """,
+        [nome]
+    )
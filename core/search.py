@@ -0,0 +1,92 @@
+"""
+Busca textual em leads, clientes e suporte.
+
+Combina a coluna `busca` (tsvector em português, gerada no banco) com
+similaridade por trigramas (pg_trgm) nos campos curtos, ambos servidos por
+índices GIN (ver `CreateTables.create_search` em actions/create.py).
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+from .pagination import KeysetPage, keyset_paginate
+
+
+# Tabela -> campos comparados por trigramas (o CPF é buscado pelos dígitos)
+CAMPOS_TRIGRAMA = {
+    'leads': ('nome', 'email'),
+    'clientes': ('nome', 'email'),
+    'suporte': ('nome_pedido',),
+}
+
+TABELAS_COM_CPF = ('leads', 'clientes')
+
+
+def filtrar_busca(queryset, termo):
+    """
+    Filtra `queryset` pelo termo de busca e ordena pela relevância.
+
+    Uma linha corresponde se o texto casa com a coluna `busca`
+    (websearch_to_tsquery), se algum campo curto é parecido com o termo
+    (operador de trigramas `%>`) ou, para leads e clientes, se o CPF contém
+    os dígitos informados. A relevância (`relevancia`) soma o ts_rank com a
+    maior similaridade por trigramas.
+    """
+    termo = (termo or '').strip()
+    if not termo:
+        return queryset
+
+    tabela = queryset.model._meta.db_table
+    campos = CAMPOS_TRIGRAMA[tabela]
+    tsquery = "websearch_to_tsquery('portuguese', %s)"
+
+    condicao = Q(_busca_texto=True)
+    for campo in campos:
+        condicao |= Q(**{f'{campo}__trigram_word_similar': termo})
+
+    digitos = re.sub(r'\D', '', termo)
+    if tabela in TABELAS_COM_CPF and len(digitos) >= 3 and not re.search(r'[^\d\s.\-/]', termo):
+        condicao |= Q(cpf__contains=digitos)
+
+    similaridades = [TrigramWordSimilarity(termo, campo) for campo in campos]
+    similaridade = Greatest(*similaridades) if len(similaridades) > 1 else similaridades[0]
+
+    return queryset.alias(
+        _busca_texto=RawSQL(f'"{tabela}".busca @@ {tsquery}', [termo], output_field=BooleanField()),
+    ).filter(condicao).annotate(
+        relevancia=RawSQL(f'ts_rank("{tabela}".busca, {tsquery})', [termo], output_field=FloatField())
+        + similaridade,
+    ).order_by('-relevancia', '-pk')
+
+
+def buscar(queryset, termo, limite=50):
+    """Os `limite` resultados mais relevantes para o termo."""
+    return list(filtrar_busca(queryset, termo)[:limite])
+
+
+def listar_ou_buscar(request, queryset, ordering):
+    """
+    Página de uma listagem: os resultados mais relevantes se houver `?q=`,
+    senão a paginação por cursor normal.
+    """
+    termo = request.GET.get('q', '').strip()
+    if termo:
+        limite = getattr(settings, 'LIST_PAGE_SIZE', 50)
+        return KeysetPage(buscar(queryset, termo, limite), request.GET)
+    return keyset_paginate(request, queryset, ordering)
+
+
+class BuscaAdminMixin:
+    """
+    Substitui a busca padrão do admin (ILIKE '%termo%' em cada campo, sem
+    índice) pela busca indexada de `filtrar_busca`.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filtrar_busca(queryset, search_term), False
@@ -0,0 +1,44 @@
+"""
+Sinais dos models: incrementam a versão da tabela alterada (core/table_versions.py),
+invalidando os caches que dependem dela.
+
+Observação: QuerySet.update(), bulk_create() e escritas feitas fora do ORM
+não disparam post_save/post_delete.
+"""
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from . import table_versions
+
+
+def _tabelas_relacionadas(model):
+    # Exclusões podem apagar em cascata ou anular FKs de outras tabelas
+    return [rel.related_model._meta.db_table for rel in model._meta.related_objects]
+
+
+def tabelas_alteradas(tabela, exclusao=False):
+    """
+    Tabelas cujas versões mudam com uma escrita em `tabela` feita fora do ORM
+    (ex.: pelo `Main`); exclusões incluem as tabelas que a referenciam.
+    """
+    if not exclusao:
+        return [tabela]
+    for model in apps.get_app_config('core').get_models():
+        if model._meta.db_table == tabela:
+            return [tabela, *_tabelas_relacionadas(model)]
+    return [tabela]
+
+
+def _ao_salvar(sender, **kwargs):
+    table_versions.incrementar(sender._meta.db_table)
+
+
+def _ao_excluir(sender, **kwargs):
+    table_versions.incrementar(sender._meta.db_table, *_tabelas_relacionadas(sender))
+
+
+def conectar_sinais():
+    """Conecta os sinais a todos os models do app core."""
+    for model in apps.get_app_config('core').get_models():
+        post_save.connect(_ao_salvar, sender=model, dispatch_uid=f'versao_save_{model.__name__}')
+        post_delete.connect(_ao_excluir, sender=model, dispatch_uid=f'versao_delete_{model.__name__}')
@@ -0,0 +1,51 @@
+"""
+Versões por tabela, guardadas no cache do Django.
+
+Cada tabela tem um contador incrementado a cada escrita (ver core/signals.py).
+Resultados derivados de uma tabela podem ser cacheados com uma chave que
+inclui as versões das tabelas lidas: qualquer escrita muda a chave, e o
+resultado antigo simplesmente deixa de ser encontrado.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _key(tabela):
+    return f'versao_tabela:{tabela}'
+
+
+def versoes(tabelas):
+    """
+    Retorna {tabela: versão} para as tabelas informadas.
+
+    Tabelas sem versão no cache (nunca escritas ou removidas do cache) são
+    iniciadas com um valor baseado no relógio, para nunca repetir uma versão
+    já usada antes da remoção.
+    """
+    keys = {_key(tabela): tabela for tabela in tabelas}
+    encontrados = cache.get_many(keys)
+
+    resultado = {}
+    for key, tabela in keys.items():
+        if key not in encontrados:
+            cache.add(key, time.time_ns(), None)
+            encontrados[key] = cache.get(key, 0)
+        resultado[tabela] = encontrados[key]
+    return resultado
+
+
+def assinatura(tabelas):
+    """String com as versões das tabelas, para compor chaves de cache."""
+    atuais = versoes(tabelas)
+    return '.'.join(str(atuais[tabela]) for tabela in sorted(tabelas))
+
+
+def incrementar(*tabelas):
+    """Marca as tabelas como alteradas, invalidando o que depende delas."""
+    for tabela in tabelas:
+        key = _key(tabela)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), None)
@@ -0,0 +1,64 @@
+"""
+Cache do HTML das linhas das listagens.
+
+    {% load listas %}
+    {% cache_tabelas 'suporte' 'clientes' %}
+        ... linhas da tabela ...
+    {% endcache_tabelas %}
+
+O fragmento é guardado no cache com uma chave que inclui as versões das
+tabelas informadas (core/table_versions.py), a URL completa (página, cursor
+e busca) e o perfil do usuário (botões de admin). Qualquer escrita em uma
+das tabelas muda a chave e o HTML volta a ser renderizado. HTML lido da
+réplica fica em cache por no máximo REPLICA_JANELA_SEGUNDOS.
+
+Apenas a renderização é poupada: a view já executou a consulta paginada
+(core/pagination.py) antes do template, pois a página e os cursores de
+navegação dependem das linhas. Acessos feitos dentro do bloco (ex.: uma FK
+sem `select_related`) deixam de ser executados num acerto.
+"""
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from core import replica, table_versions
+
+
+register = template.Library()
+
+
+class CacheTabelasNode(template.Node):
+
+    def __init__(self, nodelist, tabelas):
+        self.nodelist = nodelist
+        self.tabelas = tabelas
+
+    def render(self, context):
+        timeout = getattr(settings, 'LIST_CACHE_TTL', 600)
+        request = context.get('request')
+        if not timeout or request is None:
+            return self.nodelist.render(context)
+
+        tabelas = [tabela.resolve(context) for tabela in self.tabelas]
+        key = make_template_fragment_key('listas.' + '.'.join(tabelas), [
+            table_versions.assinatura(tabelas),
+            request.get_full_path(),
+            request.session.get('usuario_perfil'),
+        ])
+        conteudo = cache.get(key)
+        if conteudo is None:
+            conteudo = self.nodelist.render(context)
+            cache.set(key, conteudo, replica.ttl_cache(timeout))
+        return conteudo
+
+
+@register.tag
+def cache_tabelas(parser, token):
+    """Guarda em cache o conteúdo do bloco até a próxima escrita nas tabelas informadas."""
+    tabelas = token.split_contents()[1:]
+    if not tabelas:
+        raise template.TemplateSyntaxError("'cache_tabelas' requer ao menos uma tabela.")
+    nodelist = parser.parse(('endcache_tabelas',))
+    parser.delete_first_token()
+    return CacheTabelasNode(nodelist, [parser.compile_filter(tabela) for tabela in tabelas])
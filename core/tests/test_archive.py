@@ -0,0 +1,70 @@
+"""
+Testes do comando de arquivamento em lote (core/archive.py), sem banco de dados.
+"""
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from core.archive import ARQUIVOS, limite
+
+
+def _normalizar(texto):
+    return ' '.join(texto.split())
+
+
+class ArquivoSqlTests(SimpleTestCase):
+
+    def test_suporte_move_e_copia_em_um_comando(self):
+        texto = _normalizar(ARQUIVOS['suporte'].sql)
+        colunas = 'id_chamado, nome_pedido, responsavel_solicitacao, descricao, data_solicitacao, id_cliente'
+        self.assertEqual(
+            texto,
+            'WITH movidos AS ( DELETE FROM suporte WHERE id_chamado = ANY(ARRAY( '
+            'SELECT id_chamado FROM suporte WHERE data_solicitacao < %s '
+            'ORDER BY data_solicitacao, id_chamado LIMIT %s FOR UPDATE SKIP LOCKED )) '
+            f'RETURNING {colunas} ), '
+            f'copiados AS ( INSERT INTO suporte_arquivo ({colunas}) SELECT {colunas} FROM movidos RETURNING 1 ) '
+            'SELECT COUNT(*) FROM copiados;',
+        )
+
+    def test_parametros_sao_data_limite_e_lote(self):
+        for arquivo in ARQUIVOS.values():
+            with self.subTest(arquivo.tabela):
+                self.assertEqual(arquivo.sql.count('%s'), 2)
+                self.assertLess(arquivo.sql.index('< %s'), arquivo.sql.index('LIMIT %s'))
+
+    def test_colunas_nao_incluem_busca(self):
+        for arquivo in ARQUIVOS.values():
+            with self.subTest(arquivo.tabela):
+                self.assertNotIn('busca', arquivo.colunas)
+                self.assertIn(arquivo.pk, arquivo.colunas)
+
+    def test_financeiro_soma_o_resumo_no_mesmo_comando(self):
+        texto = _normalizar(ARQUIVOS['financeiro'].sql)
+        self.assertIn('INSERT INTO financeiro_arquivo (id_financeiro, descricao, valor, data, tipo, id_projeto)', texto)
+        self.assertIn('), resumo AS ( INSERT INTO financeiro_arquivo_resumo AS r', texto)
+        self.assertIn('FROM movidos WHERE id_projeto IS NOT NULL GROUP BY id_projeto', texto)
+        self.assertIn('ON CONFLICT (id_projeto) DO UPDATE SET', texto)
+        self.assertTrue(texto.endswith('SELECT COUNT(*) FROM copiados;'))
+
+    def test_suporte_sem_cte_adicional(self):
+        texto = ARQUIVOS['suporte'].sql
+        self.assertNotIn('resumo', texto)
+        self.assertNotIn('ON CONFLICT', texto)
+
+    def test_tabelas_alteradas(self):
+        self.assertEqual(ARQUIVOS['suporte'].tabelas, ('suporte', 'suporte_arquivo'))
+        self.assertEqual(
+            ARQUIVOS['financeiro'].tabelas,
+            ('financeiro', 'financeiro_arquivo', 'financeiro_arquivo_resumo'),
+        )
+
+
+class LimiteTests(SimpleTestCase):
+
+    def test_primeiro_dia_do_mes_do_horizonte(self):
+        self.assertEqual(limite(12, hoje=date(2025, 3, 15)), date(2024, 3, 1))
+
+    def test_horizonte_padrao_das_configuracoes(self):
+        with self.settings(ARQUIVO_HORIZONTE_MESES=6):
+            self.assertEqual(limite(hoje=date(2025, 3, 15)), date(2024, 9, 1))
@@ -0,0 +1,32 @@
+"""
+Testes das consultas dos contadores do dashboard (core/counters.py).
+"""
+from django.test import SimpleTestCase
+
+from core.counters import CONSOLIDAR_SQL, CONTADORES, _query_estimado, _query_mantido, calcular_contadores
+
+
+class QueryContadoresTests(SimpleTestCase):
+
+    def test_mantido_soma_total_e_variacoes_de_cada_tabela(self):
+        query, params = _query_mantido()
+        self.assertEqual(query.count('%s'), len(params))
+        self.assertEqual(params, [tabela for tabela in CONTADORES.values() for _ in range(2)])
+        for chave in CONTADORES:
+            self.assertIn(f') AS {chave}', query)
+        self.assertIn('COALESCE(SUM(delta), 0) FROM contadores_delta', query)
+
+    def test_estimado_um_parametro_por_tabela(self):
+        query, params = _query_estimado()
+        self.assertEqual(query.count('%s'), len(params))
+        self.assertEqual(params, list(CONTADORES.values()))
+
+    def test_consolidar_move_as_variacoes_em_um_comando(self):
+        texto = ' '.join(CONSOLIDAR_SQL.split())
+        self.assertTrue(texto.startswith('WITH movidas AS ( DELETE FROM contadores_delta RETURNING tabela, delta )'))
+        self.assertIn('SELECT tabela, SUM(delta) AS delta FROM movidas GROUP BY tabela', texto)
+        self.assertIn('UPDATE contadores c SET total = c.total + somas.delta', texto)
+
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            calcular_contadores('aproximado')
@@ -0,0 +1,85 @@
+"""
+Testes do pool de conexões assíncronas (core/db_async.py), com conexões falsas.
+"""
+import asyncio
+from unittest import mock
+
+import psycopg
+from django.test import SimpleTestCase
+
+from core.db_async import AsyncConnectionPool
+
+
+class _Conexao:
+    """AsyncConnection falsa; `falhar` faz o próximo SELECT 1 falhar."""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.falhar = False
+        self.pings = 0
+
+    async def execute(self, query):
+        self.pings += 1
+        if self.falhar:
+            self.broken = True
+            raise psycopg.OperationalError('server closed the connection unexpectedly')
+
+    async def close(self):
+        self.closed = True
+
+
+class AsyncConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.abertas = []
+        self.relogio = 1000.0
+
+        async def connect(*args, **kwargs):
+            conn = _Conexao()
+            self.abertas.append(conn)
+            return conn
+
+        self.enterContext(mock.patch('psycopg.AsyncConnection.connect', connect))
+        self.enterContext(mock.patch('core.db_async.time.monotonic', lambda: self.relogio))
+        self.pool = AsyncConnectionPool(lambda: '', max_size=2, max_idle=60, ping_after=5)
+
+    def _usar(self):
+        async def usar():
+            async with self.pool.connection() as conn:
+                return conn
+        return usar
+
+    def _rodar(self, *passos):
+        async def rodar():
+            resultados = []
+            for espera, passo in passos:
+                self.relogio += espera
+                resultados.append(await passo())
+            return resultados
+        return asyncio.run(rodar())
+
+    def test_reutiliza_conexao_recente_sem_ping(self):
+        primeira, segunda = self._rodar((0, self._usar()), (1, self._usar()))
+        self.assertIs(primeira, segunda)
+        self.assertEqual(primeira.pings, 0)
+
+    def test_valida_conexao_ociosa_antes_de_entregar(self):
+        primeira, segunda = self._rodar((0, self._usar()), (10, self._usar()))
+        self.assertIs(primeira, segunda)
+        self.assertEqual(primeira.pings, 1)
+
+    def test_descarta_conexao_que_falha_no_ping(self):
+        async def derrubar():
+            self.abertas[0].falhar = True
+
+        primeira, _, segunda = self._rodar((0, self._usar()), (0, derrubar), (10, self._usar()))
+        self.assertIsNot(primeira, segunda)
+        self.assertTrue(primeira.closed)
+        self.assertFalse(segunda.closed)
+
+    def test_fecha_conexao_ociosa_alem_de_max_idle(self):
+        primeira, segunda = self._rodar((0, self._usar()), (61, self._usar()))
+        self.assertIsNot(primeira, segunda)
+        self.assertTrue(primeira.closed)
+        self.assertEqual(primeira.pings, 0)
@@ -0,0 +1,42 @@
+"""
+Testes da instrumentação de SQL (core/middleware.py) com o pool assíncrono.
+"""
+import asyncio
+
+from django.test import SimpleTestCase
+
+from core import db_async
+from core.middleware import ColetorSQL
+
+
+class _Cursor:
+    """Cursor assíncrono que apenas guarda os comandos executados."""
+
+    def __init__(self):
+        self.executados = []
+
+    async def execute(self, query, params=None):
+        self.executados.append((query, params))
+
+
+class ColetorAsyncTests(SimpleTestCase):
+
+    def test_consultas_do_pool_assincrono_sao_contadas(self):
+        coletor = ColetorSQL()
+        cursor = _Cursor()
+
+        async def consultas():
+            with db_async.coletar(coletor):
+                await db_async._executar(cursor, 'SELECT COUNT(*) FROM leads WHERE id_lead = %s;', [1])
+                # Tarefas paralelas herdam o coletor do contexto
+                await asyncio.gather(*(
+                    db_async._executar(cursor, 'SELECT COUNT(*) FROM leads WHERE id_lead = %s;', [n])
+                    for n in (2, 3)
+                ))
+            await db_async._executar(cursor, 'SELECT 1;', None)
+
+        asyncio.run(consultas())
+        self.assertEqual(len(cursor.executados), 4)
+        self.assertEqual(coletor.total, 3)
+        self.assertEqual(coletor.repetidos(3), [('SELECT COUNT(*) FROM leads WHERE id_lead = ?;', 3)])
+        self.assertGreaterEqual(coletor.tempo, 0)
@@ -0,0 +1,59 @@
+"""
+Testes do cursor da paginação keyset (core/pagination.py).
+"""
+import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from core.models import ContaAReceber, Financeiro, Suporte
+from core.pagination import _decode_cursor, _encode_cursor, _keys
+
+
+class CursorTests(SimpleTestCase):
+
+    def _ida_e_volta(self, model, ordering, **valores):
+        keys = _keys(model, ordering)
+        token = _encode_cursor(keys, SimpleNamespace(**valores))
+        return _decode_cursor(keys, token)
+
+    def test_datetime_mantem_microssegundos(self):
+        data = datetime.datetime(2025, 3, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc)
+        valores = self._ida_e_volta(
+            Suporte, ['-data_solicitacao', '-id_chamado'], data_solicitacao=data, id_chamado=42,
+        )
+        self.assertEqual(valores, [data, 42])
+        self.assertEqual(valores[0].microsecond, 123456)
+
+    def test_datetime_com_fuso_local(self):
+        data = timezone.make_aware(datetime.datetime(2025, 3, 1, 23, 59, 59, 999999))
+        valores = self._ida_e_volta(
+            Suporte, ['-data_solicitacao', '-id_chamado'], data_solicitacao=data, id_chamado=1,
+        )
+        self.assertEqual(valores[0], data)
+
+    def test_data_e_decimal(self):
+        valores = self._ida_e_volta(
+            Financeiro, ['-data', '-valor'],
+            data=datetime.date(2024, 2, 29), valor=Decimal('1234.56'), id_financeiro=7,
+        )
+        self.assertEqual(valores, [datetime.date(2024, 2, 29), Decimal('1234.56'), 7])
+
+    def test_nulo(self):
+        valores = self._ida_e_volta(
+            ContaAReceber, ['-data_recebimento'], data_recebimento=None, id_conta_receber=3,
+        )
+        self.assertEqual(valores, [None, 3])
+
+    def test_pk_adicionada_como_desempate(self):
+        keys = _keys(Suporte, ['-data_solicitacao'])
+        self.assertEqual([(attname, desc) for attname, desc, _, _ in keys],
+                         [('data_solicitacao', True), ('id_chamado', True)])
+
+    def test_cursor_invalido_volta_para_o_inicio(self):
+        keys = _keys(Suporte, ['-data_solicitacao', '-id_chamado'])
+        self.assertIsNone(_decode_cursor(keys, ''))
+        self.assertIsNone(_decode_cursor(keys, 'nao-e-base64!'))
+        self.assertIsNone(_decode_cursor(keys, _encode_cursor(keys[:1], SimpleNamespace(data_solicitacao=None))))
@@ -0,0 +1,54 @@
+"""
+Testes das consultas dos relatórios, diretas, materializadas e com e sem as
+tabelas de arquivo (core/reports.py).
+"""
+from django.test import SimpleTestCase
+
+from core.reports import RELATORIOS, _modo
+
+
+class ArquivoRelatorioTests(SimpleTestCase):
+
+    def test_resumo_financeiro_sem_arquivo_nao_le_o_resumo(self):
+        relatorio = RELATORIOS['resumo_financeiro']
+        self.assertIn('financeiro_arquivo_resumo', relatorio.query_direta())
+        self.assertNotIn('financeiro_arquivo_resumo', relatorio.query_direta(arquivo_disponivel=False))
+
+    def test_sem_arquivo_ignora_com_arquivo(self):
+        relatorio = next(r for r in RELATORIOS.values() if r.arquivaveis)
+        self.assertIn('_com_arquivo', relatorio.query_direta(com_arquivo=True))
+        self.assertNotIn('_com_arquivo', relatorio.query_direta(com_arquivo=True, arquivo_disponivel=False))
+
+    def test_relatorio_sem_arquivo_nao_depende_dele(self):
+        relatorio = next(r for r in RELATORIOS.values() if 'suporte' not in r.tabelas and 'financeiro' not in r.tabelas)
+        self.assertFalse(relatorio.usa_arquivo)
+        self.assertEqual(relatorio.query_direta(arquivo_disponivel=False), relatorio.query_direta())
+
+
+class MaterializadaTests(SimpleTestCase):
+
+    def test_le_a_view_com_a_mesma_ordem(self):
+        relatorio = RELATORIOS['estatisticas_suporte']
+        self.assertEqual(
+            relatorio.query_materializada(),
+            'SELECT * FROM mv_estatisticas_suporte\nORDER BY total_chamados DESC\nLIMIT 10;',
+        )
+        self.assertTrue(relatorio.query_direta().endswith('\nORDER BY total_chamados DESC\nLIMIT 10;'))
+
+    def test_todo_relatorio_tem_chave_para_o_refresh_concorrente(self):
+        for relatorio in RELATORIOS.values():
+            with self.subTest(relatorio.nome):
+                self.assertTrue(relatorio.chave)
+                self.assertNotIn('ORDER BY', relatorio.sql)
+
+    def test_modo_segue_a_configuracao(self):
+        relatorio = RELATORIOS['contas_pendentes']
+        with self.settings(RELATORIOS_MATERIALIZADOS=True):
+            self.assertEqual(_modo(relatorio, None, False), (True, False))
+        with self.settings(RELATORIOS_MATERIALIZADOS=False):
+            self.assertEqual(_modo(relatorio, None, False), (False, False))
+        self.assertEqual(_modo(relatorio, True, False), (True, False))
+
+    def test_com_arquivo_usa_a_consulta_direta(self):
+        self.assertEqual(_modo(RELATORIOS['clientes_chamados'], True, True), (False, True))
+        self.assertEqual(_modo(RELATORIOS['contas_pendentes'], True, True), (True, False))
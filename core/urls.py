@@ -2,7 +2,7 @@
 URLs para o sistema Wevo Media.
 """
 from django.urls import path
-from . import views, views_crud, views_queries
+from . import views, views_async, views_crud, views_export, views_queries
 
 urlpatterns = [
     # Autenticação
@@ -19,6 +19,7 @@ urlpatterns = [
     path('leads/novo/', views.lead_create, name='lead_create'),
     path('leads/<int:pk>/editar/', views.lead_update, name='lead_update'),
     path('leads/<int:pk>/deletar/', views.lead_delete, name='lead_delete'),
+    path('leads/converter/', views.lead_converter, name='lead_converter'),
 
     # CRUD - Clientes
     path('clientes/', views.cliente_list, name='cliente_list'),
@@ -83,4 +84,14 @@ urlpatterns = [
     path('consultas/estatisticas-suporte/', views_queries.query_estatisticas_suporte_cliente, name='query_estatisticas_suporte'),
     path('consultas/contas-pendentes/', views_queries.query_uniao_contas_pendentes, name='query_contas_pendentes'),
     path('consultas/cpfs-comum/', views_queries.query_clientes_leads_comum, name='query_cpfs_comum'),
+
+    # Exportação (CSV/XLSX)
+    path('exportar/<str:entidade>/<str:formato>/', views_export.exportar_entidade, name='exportar_entidade'),
+    path('consultas/exportar/<str:nome>/<str:formato>/', views_export.exportar_consulta, name='exportar_consulta'),
+
+    # Versões assíncronas (servidor ASGI)
+    path('async/login/', views_async.login_async, name='login_async'),
+    path('async/registro/', views_async.registro_async, name='registro_async'),
+    path('async/dashboard/', views_async.dashboard_async, name='dashboard_async'),
+    path('async/consultas/<str:nome>/', views_async.relatorio_async, name='relatorio_async'),
 ]
@@ -2,43 +2,56 @@
 Views para o sistema Wevo Media.
 Incluindo autenticação, CRUD e consultas especiais.
 """
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.hashers import check_password
-from django.db import connection
+from django.db import IntegrityError, connection, transaction
 from django.db.models import Count, Sum, Avg, Q
 from .models import (
     Lead, Cliente, Suporte, Usuario, Projeto, Contrato,
     Financeiro, Tarefa, ContaAPagar, ContaAReceber,
-    ClienteContrato, UsuarioProjeto, UsuarioTarefa
+    ClienteContrato, UsuarioProjeto, UsuarioTarefa, SuporteComArquivo
 )
-from .auth import criar_usuario
+from .auth import AutenticacaoSobrecarregada, autenticar, criar_usuario, validar_usuario
+from . import archive
+from .search import listar_ou_buscar
+from .counters import obter_contadores
+from .conversions import STATUS_CONVERTIDO, converter_leads, filtrar_leads
+from .replica import usa_replica
 
 
 # =============================================================================
 # VIEWS DE AUTENTICAÇÃO
 # =============================================================================
 
+MENSAGEM_SOBRECARGA = 'Muitos acessos simultâneos no momento. Tente novamente em alguns segundos.'
+
+
+def iniciar_sessao(request, usuario):
+    """Grava o usuário autenticado na sessão e redireciona ao dashboard"""
+    # Nova chave a cada login (evita fixação de sessão e renova o cookie)
+    request.session.cycle_key()
+    request.session['usuario_cpf'] = usuario.cpf
+    request.session['usuario_nome'] = usuario.nome
+    request.session['usuario_perfil'] = usuario.perfil
+    request.session['usuario_email'] = usuario.email
+    messages.success(request, f'Bem-vindo, {usuario.nome}!')
+    return redirect('dashboard')
+
+
 def login_view(request):
     """View de login"""
     if request.method == 'POST':
-        email = request.POST.get('email')
-        senha = request.POST.get('senha')
-
         try:
-            usuario = Usuario.objects.get(email=email)
-            if check_password(senha, usuario.senha):
-                request.session['usuario_cpf'] = usuario.cpf
-                request.session['usuario_nome'] = usuario.nome
-                request.session['usuario_perfil'] = usuario.perfil
-                request.session['usuario_email'] = usuario.email
-                messages.success(request, f'Bem-vindo, {usuario.nome}!')
-                return redirect('dashboard')
-            else:
-                messages.error(request, 'E-mail ou senha incorretos.')
-        except Usuario.DoesNotExist:
-            messages.error(request, 'E-mail ou senha incorretos.')
+            usuario = autenticar(request.POST.get('email'), request.POST.get('senha'))
+        except AutenticacaoSobrecarregada:
+            messages.error(request, MENSAGEM_SOBRECARGA)
+            return render(request, 'auth/login.html', status=503)
+
+        if usuario is not None:
+            return iniciar_sessao(request, usuario)
+        messages.error(request, 'E-mail ou senha incorretos.')
 
     return render(request, 'auth/login.html')
 
@@ -66,31 +79,60 @@ def registro_view(request):
         elif Usuario.objects.filter(email=email).exists():
             messages.error(request, 'E-mail já cadastrado.')
         else:
-            criar_usuario(cpf, nome, email, senha, perfil='normal')
+            try:
+                criar_usuario(cpf, nome, email, senha, perfil='normal')
+            except AutenticacaoSobrecarregada:
+                messages.error(request, MENSAGEM_SOBRECARGA)
+                return render(request, 'auth/registro.html', status=503)
             messages.success(request, 'Usuário cadastrado com sucesso! Faça login.')
             return redirect('login')
 
     return render(request, 'auth/registro.html')
 
 
-def require_login(view_func):
-    """Decorator customizado para exigir login - PROTEÇÃO FORTE"""
-    def wrapper(request, *args, **kwargs):
-        # Verifica se o usuário está logado na sessão
-        if 'usuario_cpf' not in request.session or 'usuario_email' not in request.session:
-            messages.warning(request, 'Sua sessão expirou. Por favor, faça login novamente.')
-            # Limpa qualquer resíduo de sessão
-            request.session.flush()
-            return redirect('login')
+def _verificar_login(request):
+    """
+    Valida a sessão do usuário logado.
+
+    Returns:
+        HttpResponse de redirecionamento se o acesso for negado, ou None.
+    """
+    # Verifica se o usuário está logado na sessão
+    if 'usuario_cpf' not in request.session or 'usuario_email' not in request.session:
+        messages.warning(request, 'Sua sessão expirou. Por favor, faça login novamente.')
+        # Limpa qualquer resíduo de sessão
+        request.session.flush()
+        return redirect('login')
+
+    # Verifica se o usuário ainda existe no banco (validação em cache)
+    perfil = validar_usuario(request.session['usuario_cpf'])
+    if perfil is None:
+        messages.error(request, 'Usuário não encontrado. Por favor, faça login novamente.')
+        request.session.flush()
+        return redirect('login')
+
+    # Mantém o perfil da sessão sincronizado (ex.: admin rebaixado)
+    if request.session.get('usuario_perfil') != perfil:
+        request.session['usuario_perfil'] = perfil
+
+    return None
 
-        # Verifica se o usuário ainda existe no banco
-        try:
-            Usuario.objects.get(cpf=request.session['usuario_cpf'])
-        except Usuario.DoesNotExist:
-            messages.error(request, 'Usuário não encontrado. Por favor, faça login novamente.')
-            request.session.flush()
-            return redirect('login')
 
+def require_login(view_func):
+    """Decorator customizado para exigir login - PROTEÇÃO FORTE (views síncronas e assíncronas)"""
+    if iscoroutinefunction(view_func):
+        async def async_wrapper(request, *args, **kwargs):
+            # Sessão e validação usam o ORM síncrono
+            negado = await sync_to_async(_verificar_login)(request)
+            if negado is not None:
+                return negado
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    def wrapper(request, *args, **kwargs):
+        negado = _verificar_login(request)
+        if negado is not None:
+            return negado
         return view_func(request, *args, **kwargs)
     return wrapper
 
@@ -101,7 +143,16 @@ def require_admin(view_func):
         if 'usuario_cpf' not in request.session:
             messages.error(request, 'Você precisa estar logado para acessar esta página.')
             return redirect('login')
-        if request.session.get('usuario_perfil') != 'admin':
+
+        perfil = validar_usuario(request.session['usuario_cpf'])
+        if perfil is None:
+            messages.error(request, 'Usuário não encontrado. Por favor, faça login novamente.')
+            request.session.flush()
+            return redirect('login')
+        if request.session.get('usuario_perfil') != perfil:
+            request.session['usuario_perfil'] = perfil
+
+        if perfil != 'admin':
             messages.error(request, 'Você não tem permissão para acessar esta página.')
             return redirect('dashboard')
         return view_func(request, *args, **kwargs)
@@ -112,14 +163,12 @@ def require_admin(view_func):
 # DASHBOARD
 # =============================================================================
 
+@usa_replica
 @require_login
 def dashboard_view(request):
     """Dashboard principal"""
     context = {
-        'total_leads': Lead.objects.count(),
-        'total_clientes': Cliente.objects.count(),
-        'total_projetos': Projeto.objects.count(),
-        'total_tarefas': Tarefa.objects.count(),
+        **obter_contadores(),
         'usuario_nome': request.session.get('usuario_nome'),
         'usuario_perfil': request.session.get('usuario_perfil'),
     }
@@ -130,25 +179,31 @@ def dashboard_view(request):
 # CRUD GENÉRICO - LEADS
 # =============================================================================
 
+@usa_replica
 @require_login
 def lead_list(request):
     """Lista todos os leads"""
-    leads = Lead.objects.all().order_by('-id_lead')
-    return render(request, 'leads/list.html', {'leads': leads})
+    page = listar_ou_buscar(request, Lead.objects.all(), ['-id_lead'])
+    return render(request, 'leads/list.html', {'leads': page.object_list, 'page': page})
 
 
 @require_login
 def lead_create(request):
     """Cria um novo lead"""
     if request.method == 'POST':
-        Lead.objects.create(
-            nome=request.POST.get('nome'),
-            telefone=request.POST.get('telefone'),
-            email=request.POST.get('email'),
-            origem=request.POST.get('origem'),
-            status_funil=request.POST.get('status_funil'),
-            cpf=request.POST.get('cpf')
-        )
+        try:
+            with transaction.atomic():
+                Lead.objects.create(
+                    nome=request.POST.get('nome'),
+                    telefone=request.POST.get('telefone'),
+                    email=request.POST.get('email'),
+                    origem=request.POST.get('origem'),
+                    status_funil=request.POST.get('status_funil'),
+                    cpf=request.POST.get('cpf') or None
+                )
+        except IntegrityError:
+            messages.error(request, 'Já existe um lead com o CPF informado.')
+            return render(request, 'leads/form.html')
         messages.success(request, 'Lead cadastrado com sucesso!')
         return redirect('lead_list')
     return render(request, 'leads/form.html')
@@ -164,8 +219,13 @@ def lead_update(request, pk):
         lead.email = request.POST.get('email')
         lead.origem = request.POST.get('origem')
         lead.status_funil = request.POST.get('status_funil')
-        lead.cpf = request.POST.get('cpf')
-        lead.save()
+        lead.cpf = request.POST.get('cpf') or None
+        try:
+            with transaction.atomic():
+                lead.save()
+        except IntegrityError:
+            messages.error(request, 'Já existe um lead com o CPF informado.')
+            return redirect('lead_update', pk=pk)
         messages.success(request, 'Lead atualizado com sucesso!')
         return redirect('lead_list')
     return render(request, 'leads/form.html', {'lead': lead})
@@ -180,15 +240,35 @@ def lead_delete(request, pk):
     return redirect('lead_list')
 
 
+@require_admin
+def lead_converter(request):
+    """Converte em clientes, em massa, os leads filtrados (apenas admin)"""
+    if request.method != 'POST':
+        return redirect('lead_list')
+
+    leads = filtrar_leads(request.POST.getlist('status_funil'), request.POST.getlist('origem'))
+    convertidos = converter_leads(
+        leads,
+        novo_status=request.POST.get('novo_status') or STATUS_CONVERTIDO,
+        plano_ativo=request.POST.get('plano_ativo') == 'on',
+    )
+    if convertidos:
+        messages.success(request, f'{convertidos} lead(s) convertido(s) em cliente(s)!')
+    else:
+        messages.info(request, 'Nenhum lead sem cliente atende ao filtro.')
+    return redirect('cliente_list')
+
+
 # =============================================================================
 # CRUD GENÉRICO - CLIENTES
 # =============================================================================
 
+@usa_replica
 @require_login
 def cliente_list(request):
     """Lista todos os clientes"""
-    clientes = Cliente.objects.all().select_related('id_lead').order_by('-id_cliente')
-    return render(request, 'clientes/list.html', {'clientes': clientes})
+    page = listar_ou_buscar(request, Cliente.objects.all().select_related('id_lead'), ['-id_cliente'])
+    return render(request, 'clientes/list.html', {'clientes': page.object_list, 'page': page})
 
 
 @require_login
@@ -196,14 +276,19 @@ def cliente_create(request):
     """Cria um novo cliente"""
     if request.method == 'POST':
         id_lead = request.POST.get('id_lead')
-        Cliente.objects.create(
-            nome=request.POST.get('nome'),
-            telefone=request.POST.get('telefone'),
-            email=request.POST.get('email'),
-            cpf=request.POST.get('cpf'),
-            plano_ativo=request.POST.get('plano_ativo') == 'on',
-            id_lead_id=id_lead if id_lead else None
-        )
+        try:
+            with transaction.atomic():
+                Cliente.objects.create(
+                    nome=request.POST.get('nome'),
+                    telefone=request.POST.get('telefone'),
+                    email=request.POST.get('email'),
+                    cpf=request.POST.get('cpf') or None,
+                    plano_ativo=request.POST.get('plano_ativo') == 'on',
+                    id_lead_id=id_lead if id_lead else None
+                )
+        except IntegrityError:
+            messages.error(request, 'Já existe um cliente com o CPF informado.')
+            return redirect('cliente_create')
         messages.success(request, 'Cliente cadastrado com sucesso!')
         return redirect('cliente_list')
     leads = Lead.objects.all()
@@ -219,10 +304,15 @@ def cliente_update(request, pk):
         cliente.nome = request.POST.get('nome')
         cliente.telefone = request.POST.get('telefone')
         cliente.email = request.POST.get('email')
-        cliente.cpf = request.POST.get('cpf')
+        cliente.cpf = request.POST.get('cpf') or None
         cliente.plano_ativo = request.POST.get('plano_ativo') == 'on'
         cliente.id_lead_id = id_lead if id_lead else None
-        cliente.save()
+        try:
+            with transaction.atomic():
+                cliente.save()
+        except IntegrityError:
+            messages.error(request, 'Já existe um cliente com o CPF informado.')
+            return redirect('cliente_update', pk=pk)
         messages.success(request, 'Cliente atualizado com sucesso!')
         return redirect('cliente_list')
     leads = Lead.objects.all()
@@ -242,11 +332,20 @@ def cliente_delete(request, pk):
 # CRUD GENÉRICO - SUPORTE
 # =============================================================================
 
+@usa_replica
 @require_login
 def suporte_list(request):
-    """Lista todos os chamados de suporte"""
-    chamados = Suporte.objects.all().select_related('id_cliente').order_by('-data_solicitacao')
-    return render(request, 'suporte/list.html', {'chamados': chamados})
+    """
+    Lista todos os chamados de suporte; com `?arquivo=1`, inclui os arquivados
+    (a busca considera apenas os ativos).
+    """
+    arquivavel = archive.disponivel()
+    com_arquivo = arquivavel and request.GET.get('arquivo') == '1' and not request.GET.get('q', '').strip()
+    model = SuporteComArquivo if com_arquivo else Suporte
+    page = listar_ou_buscar(request, model.objects.all().select_related('id_cliente'), ['-data_solicitacao', '-id_chamado'])
+    return render(request, 'suporte/list.html', {
+        'chamados': page.object_list, 'page': page, 'arquivavel': arquivavel, 'com_arquivo': com_arquivo,
+    })
 
 
 @require_login
@@ -0,0 +1,101 @@
+"""
+Views assíncronas do login, do cadastro, do dashboard e das consultas especiais.
+
+Servidas por um servidor ASGI (wevo_media_project/asgi.py), não ocupam o
+worker enquanto esperam o banco ou o hash da senha (calculado no pool de
+threads limitado de core/auth.py), e as consultas independentes de uma
+página rodam em paralelo (ver core/db_async.py).
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from . import archive
+from .auth import AutenticacaoSobrecarregada, autenticar_async, criar_usuario_async
+from .counters import obter_contadores_async
+from .models import Usuario
+from .replica import usa_replica
+from .reports import RELATORIOS, esta_desatualizado, obter_relatorio_async
+from .views import MENSAGEM_SOBRECARGA, iniciar_sessao, require_login
+
+
+async def login_async(request):
+    """View de login (versão assíncrona)"""
+    if request.method == 'POST':
+        try:
+            usuario = await autenticar_async(request.POST.get('email'), request.POST.get('senha'))
+        except AutenticacaoSobrecarregada:
+            messages.error(request, MENSAGEM_SOBRECARGA)
+            return await sync_to_async(render)(request, 'auth/login.html', status=503)
+
+        if usuario is not None:
+            # A sessão pode ser gravada no banco
+            return await sync_to_async(iniciar_sessao)(request, usuario)
+        messages.error(request, 'E-mail ou senha incorretos.')
+
+    return await sync_to_async(render)(request, 'auth/login.html')
+
+
+async def registro_async(request):
+    """View de registro de novo usuário (versão assíncrona)"""
+    if request.method == 'POST':
+        cpf = request.POST.get('cpf')
+        nome = request.POST.get('nome')
+        email = request.POST.get('email')
+        senha = request.POST.get('senha')
+        confirma_senha = request.POST.get('confirma_senha')
+
+        if senha != confirma_senha:
+            messages.error(request, 'As senhas não conferem.')
+        elif await Usuario.objects.filter(cpf=cpf).aexists():
+            messages.error(request, 'CPF já cadastrado.')
+        elif await Usuario.objects.filter(email=email).aexists():
+            messages.error(request, 'E-mail já cadastrado.')
+        else:
+            try:
+                await criar_usuario_async(cpf, nome, email, senha, perfil='normal')
+            except AutenticacaoSobrecarregada:
+                messages.error(request, MENSAGEM_SOBRECARGA)
+                return await sync_to_async(render)(request, 'auth/registro.html', status=503)
+            messages.success(request, 'Usuário cadastrado com sucesso! Faça login.')
+            return redirect('login_async')
+
+    return await sync_to_async(render)(request, 'auth/registro.html')
+
+
+@usa_replica
+@require_login
+async def dashboard_async(request):
+    """Dashboard principal (versão assíncrona)"""
+    context = {
+        **await obter_contadores_async(),
+        'usuario_nome': await sync_to_async(request.session.get)('usuario_nome'),
+        'usuario_perfil': await sync_to_async(request.session.get)('usuario_perfil'),
+    }
+    return await sync_to_async(render)(request, 'dashboard.html', context)
+
+
+@usa_replica
+@require_login
+async def relatorio_async(request, nome):
+    """Consulta especial `nome` (versão assíncrona de core/views_queries.py)"""
+    relatorio = RELATORIOS.get(nome)
+    if relatorio is None:
+        raise Http404('Relatório não encontrado.')
+
+    arquivavel = bool(relatorio.arquivaveis) and await archive.disponivel_async()
+    com_arquivo = arquivavel and request.GET.get('arquivo') == '1'
+    results, atualizado_em = await obter_relatorio_async(nome, com_arquivo=com_arquivo)
+
+    context = {
+        'nome': nome,
+        'title': relatorio.titulo,
+        'description': relatorio.descricao,
+        'results': results,
+        'atualizado_em': atualizado_em,
+        'desatualizado': esta_desatualizado(atualizado_em),
+        'arquivavel': arquivavel,
+        'com_arquivo': com_arquivo,
+    }
+    return await sync_to_async(render)(request, 'queries/results.html', context)
@@ -4,9 +4,14 @@ Views CRUD para as demais tabelas do sistema.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from .views import require_login, require_admin
+from . import archive
+from .pagination import keyset_paginate
+from .auth import invalidar_usuario
+from .replica import usa_replica
 from .models import (
     Projeto, Contrato, Financeiro, Tarefa, ContaAPagar,
-    ContaAReceber, Usuario, ClienteContrato, UsuarioProjeto, UsuarioTarefa
+    ContaAReceber, Usuario, ClienteContrato, UsuarioProjeto, UsuarioTarefa,
+    FinanceiroComArquivo
 )
 
 
@@ -14,11 +19,12 @@ from .models import (
 # CRUD - PROJETOS
 # =============================================================================
 
+@usa_replica
 @require_login
 def projeto_list(request):
     """Lista todos os projetos"""
-    projetos = Projeto.objects.all().order_by('-id_projeto')
-    return render(request, 'projetos/list.html', {'projetos': projetos})
+    page = keyset_paginate(request, Projeto.objects.all(), ['-id_projeto'])
+    return render(request, 'projetos/list.html', {'projetos': page.object_list, 'page': page})
 
 
 @require_login
@@ -62,6 +68,7 @@ def projeto_delete(request, pk):
 # CRUD - CONTRATOS
 # =============================================================================
 
+@usa_replica
 @require_login
 def contrato_list(request):
     """Lista todos os contratos"""
@@ -118,11 +125,17 @@ def contrato_delete(request, pk):
 # CRUD - FINANCEIRO
 # =============================================================================
 
+@usa_replica
 @require_login
 def financeiro_list(request):
-    """Lista todos os registros financeiros"""
-    financeiros = Financeiro.objects.all().select_related('id_projeto').order_by('-data')
-    return render(request, 'financeiro/list.html', {'financeiros': financeiros})
+    """Lista todos os registros financeiros; com `?arquivo=1`, inclui os arquivados"""
+    arquivavel = archive.disponivel()
+    com_arquivo = arquivavel and request.GET.get('arquivo') == '1'
+    model = FinanceiroComArquivo if com_arquivo else Financeiro
+    page = keyset_paginate(request, model.objects.all().select_related('id_projeto'), ['-data', '-id_financeiro'])
+    return render(request, 'financeiro/list.html', {
+        'financeiros': page.object_list, 'page': page, 'arquivavel': arquivavel, 'com_arquivo': com_arquivo,
+    })
 
 
 @require_login
@@ -172,11 +185,12 @@ def financeiro_delete(request, pk):
 # CRUD - TAREFAS
 # =============================================================================
 
+@usa_replica
 @require_login
 def tarefa_list(request):
     """Lista todas as tarefas"""
-    tarefas = Tarefa.objects.all().select_related('id_projeto').order_by('-id_tarefas')
-    return render(request, 'tarefas/list.html', {'tarefas': tarefas})
+    page = keyset_paginate(request, Tarefa.objects.all().select_related('id_projeto'), ['-id_tarefas'])
+    return render(request, 'tarefas/list.html', {'tarefas': page.object_list, 'page': page})
 
 
 @require_login
@@ -228,11 +242,12 @@ def tarefa_delete(request, pk):
 # CRUD - CONTA A PAGAR
 # =============================================================================
 
+@usa_replica
 @require_login
 def conta_pagar_list(request):
     """Lista todas as contas a pagar"""
-    contas = ContaAPagar.objects.all().order_by('-data_vencimento')
-    return render(request, 'contas_pagar/list.html', {'contas': contas})
+    page = keyset_paginate(request, ContaAPagar.objects.all(), ['-data_vencimento', '-id_conta_pagar'])
+    return render(request, 'contas_pagar/list.html', {'contas': page.object_list, 'page': page})
 
 
 @require_login
@@ -280,11 +295,12 @@ def conta_pagar_delete(request, pk):
 # CRUD - CONTA A RECEBER
 # =============================================================================
 
+@usa_replica
 @require_login
 def conta_receber_list(request):
     """Lista todas as contas a receber"""
-    contas = ContaAReceber.objects.all().select_related('id_cliente').order_by('-data_recebimento')
-    return render(request, 'contas_receber/list.html', {'contas': contas})
+    page = keyset_paginate(request, ContaAReceber.objects.all().select_related('id_cliente'), ['-data_recebimento', '-id_conta_receber'])
+    return render(request, 'contas_receber/list.html', {'contas': page.object_list, 'page': page})
 
 
 @require_login
@@ -301,8 +317,8 @@ def conta_receber_create(request):
         )
         messages.success(request, 'Conta a receber cadastrada com sucesso!')
         return redirect('conta_receber_list')
-    clientes = Cliente.objects.all()
     from .models import Cliente
+    clientes = Cliente.objects.all()
     return render(request, 'contas_receber/form.html', {'clientes': clientes})
 
 
@@ -338,6 +354,7 @@ def conta_receber_delete(request, pk):
 # CRUD - USUÁRIOS (apenas admin)
 # =============================================================================
 
+@usa_replica
 @require_admin
 def usuario_list(request):
     """Lista todos os usuários (apenas admin)"""
@@ -374,9 +391,11 @@ def usuario_update(request, pk):
         nova_senha = request.POST.get('senha')
         if nova_senha:
             from django.contrib.auth.hashers import make_password
-            usuario.senha = make_password(nova_senha)
+            from .auth import executar_hash
+            usuario.senha = executar_hash(make_password, nova_senha)
 
         usuario.save()
+        invalidar_usuario(usuario.cpf)
         messages.success(request, 'Usuário atualizado com sucesso!')
         return redirect('usuario_list')
     return render(request, 'usuarios/form.html', {'usuario': usuario})
@@ -393,6 +412,7 @@ def usuario_delete(request, pk):
         return redirect('usuario_list')
 
     usuario.delete()
+    invalidar_usuario(pk)
     messages.success(request, 'Usuário deletado com sucesso!')
     return redirect('usuario_list')
 
@@ -416,4 +436,5 @@ def usuario_toggle_admin(request, pk):
         messages.success(request, f'{usuario.nome} agora é um administrador!')
 
     usuario.save()
+    invalidar_usuario(usuario.cpf)
     return redirect('usuario_list')
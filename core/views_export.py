@@ -0,0 +1,33 @@
+"""
+Views de exportação (CSV/XLSX) das listagens e das consultas especiais.
+"""
+from django.http import Http404
+
+from . import archive
+from .exports import ENTIDADES, ENTIDADES_COM_ARQUIVO, FORMATOS, exportar_queryset, exportar_relatorio
+from .replica import usa_replica
+from .reports import RELATORIOS
+from .views import require_login
+
+
+@usa_replica
+@require_login
+def exportar_entidade(request, entidade, formato):
+    """Exporta todos os registros de uma entidade; com `?arquivo=1`, inclui os arquivados"""
+    if entidade not in ENTIDADES or formato not in FORMATOS:
+        raise Http404('Exportação não encontrada.')
+
+    model, ordering = ENTIDADES[entidade]
+    if request.GET.get('arquivo') == '1' and entidade in ENTIDADES_COM_ARQUIVO and archive.disponivel():
+        model = ENTIDADES_COM_ARQUIVO[entidade]
+    return exportar_queryset(model.objects.order_by(*ordering), formato, entidade)
+
+
+@usa_replica
+@require_login
+def exportar_consulta(request, nome, formato):
+    """Exporta o resultado completo de uma consulta especial"""
+    if nome not in RELATORIOS or formato not in FORMATOS:
+        raise Http404('Exportação não encontrada.')
+
+    return exportar_relatorio(nome, formato, com_arquivo=request.GET.get('arquivo') == '1')
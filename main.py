@@ -1,17 +1,65 @@
+import itertools
+import time
+
 import psycopg2
-from utils.connection_db import ConnectionDB
+from psycopg2.extras import execute_values
+from utils.batching import chunked
+from utils.connection_db import ConnectionDB, borrow_connection, stream_rows
 from actions.insert import InsertQuery
 from actions.select import SelectQuery
 from actions.delete import DeleteQuery
 from actions.update import UpdateQuery
 from actions.create import CreateTables
 from actions.addons import AddonsQuery
+from actions.statements import execute, primary_key
+
+
+def mark_written(table, deleted=False):
+    """
+    Incrementa a versão da tabela no cache do Django (core/table_versions.py),
+    para que listagens e relatórios em cache deixem de usar dados antigos.
+
+    Só tem efeito quando o Main roda dentro do projeto Django já carregado
+    (ex.: manage.py shell ou comandos de gerenciamento); com o cache local ao
+    processo (LocMemCache), o servidor web só enxerga a mudança após o TTL.
+    """
+    try:
+        from django.apps import apps
+    except ImportError:
+        return
+    if not apps.ready:
+        return
+
+    from core import table_versions
+    from core.signals import tabelas_alteradas
+    table_versions.incrementar(*tabelas_alteradas(table, exclusao=deleted))
 
 
 class Main:
 
-    def __init__(self):
-        self.connection = ConnectionDB().create_connection()
+    def __init__(self, pooled=False, **pool_options):
+        """
+        Args:
+            pooled (bool, optional): Se True, cada operação empresta uma conexão de um
+                pool (ver `ConnectionDB`) em vez de manter uma única conexão aberta.
+            **pool_options: Opções do pool (min_size, max_size, timeout, max_idle, pre_ping).
+        """
+        self.db = ConnectionDB(pooled=pooled, **pool_options)
+        self.connection = None if pooled else self.db.create_connection()
+
+    @property
+    def source(self):
+        """
+        Origem das conexões usada pelas classes de `actions`: o `ConnectionDB`
+        com pool ou a conexão única deste objeto.
+        """
+        return self.db if self.db.pool is not None else self.connection
+
+    def close(self):
+        """Fecha a conexão única ou o pool de conexões."""
+        if self.connection is not None:
+            self.connection.close()
+        self.db.close()
 
     def create_database(self):
         """
@@ -43,13 +91,44 @@ class Main:
             cursor.close()
             conn.close()
 
-    def create_tables(self):
+    def create_tables(self, partitioned_suporte=False):
         """
         Cria todas as tabelas necessárias no banco de dados usando a classe CreateTables.
+
+        Args:
+            partitioned_suporte (bool, optional): Cria `suporte` particionada por mês
+                de `data_solicitacao` (ver `CreateTables.create_suporte_partitions`).
         """
-        creator = CreateTables(self.connection)
+        creator = CreateTables(self.source, partitioned_suporte=partitioned_suporte)
         creator.execute()
 
+    def create_indexes(self):
+        """
+        Cria os índices de apoio ausentes (FKs, parciais e compostos das listagens)
+        usando CREATE INDEX CONCURRENTLY.
+        """
+        return CreateTables(self.source).create_indexes()
+
+    def create_search(self):
+        """
+        Prepara a busca textual (pg_trgm, colunas tsvector e índices GIN) em
+        leads, clientes e suporte.
+        """
+        return CreateTables(self.source).create_search()
+
+    def missing_indexes(self):
+        """
+        Lista os índices de apoio que ainda não existem no banco.
+
+        Returns:
+            list[dict]: Índices ausentes ou inválidos.
+        """
+        missing = CreateTables(self.source).missing_indexes()
+        for index in missing:
+            status = "inválido" if index["invalido"] else "ausente"
+            print(f"{index['nome']} ({status}): {index['tabela']} ({index['colunas']})")
+        return missing
+
     def insert_record(self, table, data):
         """
         Insere um novo registro na tabela especificada.
@@ -59,14 +138,132 @@ class Main:
             data (dict): Dicionário contendo os dados a serem inseridos.
         """
         query_builder = InsertQuery(table, data)
-        query, values = query_builder.build_query()
+        statement, values = query_builder.build_query()
+
+        with borrow_connection(self.source) as conn:
+            with conn.cursor() as cursor:
+                execute(cursor, statement, values)
+                conn.commit()
+                print(f"Registro inserido em '{table}'.")
+        mark_written(table)
+
+    def insert_many(self, table, rows, method="values", batch_size=1000, returning=None):
+        """
+        Insere muitos registros em lote, com um commit por lote.
+
+        Args:
+            table (str): Nome da tabela onde os registros serão inseridos.
+            rows (iterable[dict]): Registros a inserir (todos com as mesmas chaves).
+                Pode ser um gerador; apenas um lote fica em memória por vez.
+            method (str, optional): "values" para INSERT multi-linha (execute_values)
+                ou "copy" para COPY FROM STDIN a partir de um buffer em memória.
+            batch_size (int, optional): Número de registros por lote/transação.
+            returning (str, optional): Coluna gerada a retornar, normalmente a chave
+                primária SERIAL. No modo "copy" os ids são pré-alocados da sequência
+                da coluna, já que o COPY não suporta RETURNING.
+
+        Returns:
+            list | int: Ids gerados, se `returning` for informado; senão o total inserido.
+        """
+        if method not in ("values", "copy"):
+            raise ValueError(f"Método de inserção inválido: {method!r} (use 'values' ou 'copy').")
+
+        ids = []
+        total = 0
+
+        with borrow_connection(self.source) as conn:
+            for batch in chunked(rows, batch_size):
+                query_builder = InsertQuery(table, batch)
+
+                try:
+                    with conn.cursor() as cur:
+                        if method == "values":
+                            statement, values = query_builder.build_values_query(returning)
+                            result = execute_values(
+                                cur, statement.text(cur), values, page_size=len(values), fetch=bool(returning)
+                            )
+                            if returning:
+                                ids.extend(row[0] for row in result)
+                        else:
+                            extra_columns = None
+                            if returning:
+                                cur.execute(
+                                    "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+                                    "FROM generate_series(1, %s);",
+                                    (table, returning, len(batch))
+                                )
+                                batch_ids = [row[0] for row in cur.fetchall()]
+                                extra_columns = {returning: batch_ids}
+                                ids.extend(batch_ids)
+                            statement, buffer = query_builder.build_copy(extra_columns)
+                            cur.copy_expert(statement.text(cur), buffer)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+                total += len(batch)
+
+        if total:
+            mark_written(table)
+        print(f"{total} registro(s) inserido(s) em '{table}'.")
+        return ids if returning else total
+
+    def upsert_many(self, table, rows, conflict="cpf", merge=None, default="overwrite", batch_size=1000):
+        """
+        Insere ou atualiza registros pela coluna única `conflict` (por padrão o
+        CPF de leads e clientes), com um commit por lote. Reprocessar os mesmos
+        dados não altera nada, então a importação pode ser repetida com segurança.
+
+        Args:
+            table (str): Nome da tabela.
+            rows (iterable[dict]): Registros (todos com as mesmas chaves). Pode ser um gerador.
+            conflict (str, optional): Coluna UNIQUE que identifica o registro.
+            merge (dict, optional): Regra por coluna para registros existentes, ex.:
+                {"status_funil": "keep", "email": "coalesce"} (ver `MERGE_RULES`).
+            default (str, optional): Regra das demais colunas ("overwrite").
+            batch_size (int, optional): Registros por lote/transação.
+
+        Returns:
+            dict: {"inserted": n, "updated": n, "unchanged": n}
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+        with borrow_connection(self.source) as conn:
+            for batch in chunked(rows, batch_size):
+                # Um mesmo comando não pode atualizar a mesma linha duas vezes:
+                # dentro do lote, vale o último registro de cada chave
+                unique = {}
+                for row in batch:
+                    key = row.get(conflict)
+                    unique[key if key is not None else object()] = row
+                batch = list(unique.values())
 
-        with self.connection.cursor() as cursor:
-            cursor.execute(query, values)
-            self.connection.commit()
-            print(f"Registro inserido em '{table}'.")
+                statement, values = InsertQuery(table, batch).build_upsert_query(conflict, merge, default)
+                try:
+                    with conn.cursor() as cur:
+                        result = execute_values(
+                            cur, statement.text(cur), values, page_size=len(values), fetch=True
+                        )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
 
-    def select_records(self, table, columns=None, where=None):
+                inserted = sum(1 for (is_new,) in result if is_new)
+                counts["inserted"] += inserted
+                counts["updated"] += len(result) - inserted
+                counts["unchanged"] += len(batch) - len(result)
+
+        if counts["inserted"] or counts["updated"]:
+            mark_written(table)
+        print(
+            f"'{table}': {counts['inserted']} inserido(s), {counts['updated']} atualizado(s), "
+            f"{counts['unchanged']} sem alteração."
+        )
+        return counts
+
+    def select_records(self, table, columns=None, where=None, stream=False, itersize=2000):
         """
         Seleciona registros de uma tabela específica.
 
@@ -74,39 +271,140 @@ class Main:
             table (str): Nome da tabela para consulta.
             columns (list, optional): Lista de colunas a serem retornadas. Se None, retorna todas as colunas.
             where (dict, optional): Condições para filtrar os registros.
+            stream (bool, optional): Se True, retorna um gerador apoiado em cursor
+                server-side (ver `stream_records`) em vez de carregar tudo em memória.
+            itersize (int, optional): Linhas buscadas por lote no modo streaming.
 
         Returns:
-            list: Lista de registros encontrados.
+            list | generator: Lista de registros encontrados, ou gerador no modo streaming.
         """
+        if stream:
+            return self.stream_records(table, columns, where, itersize=itersize)
+
         query_builder = SelectQuery(table, columns, where)
-        query = query_builder.build_query()
+        statement, params = query_builder.build_query()
+
+        with borrow_connection(self.source) as conn:
+            with conn.cursor() as cur:
+                execute(cur, statement, params)
+                rows = cur.fetchall()
+                for row in rows:
+                    print(row)
+                return rows
+
+    def stream_records(self, table, columns=None, where=None, itersize=2000):
+        """
+        Percorre os registros de uma tabela com um cursor nomeado (server-side),
+        em memória constante e sem imprimir cada linha.
 
-        with self.connection.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-            for row in rows:
-                print(row)
-            return rows
+        Args:
+            table (str): Nome da tabela para consulta.
+            columns (list, optional): Lista de colunas a serem retornadas.
+            where (dict, optional): Condições para filtrar os registros.
+            itersize (int, optional): Linhas buscadas do servidor por lote.
+
+        Yields:
+            tuple: Um registro por vez.
+        """
+        query_builder = SelectQuery(table, columns, where)
+        statement, params = query_builder.build_query()
+        yield from stream_rows(self.source, statement.composed, params, itersize=itersize)
 
-    def delete_record(self, table, conditions):
+    def delete_record(self, table, conditions, batch_size=None, key=None, pause=0):
         """
         Remove registros de uma tabela específica com base nas condições fornecidas.
 
         Args:
             table (str): Nome da tabela onde o registro será removido.
-            conditions (dict): Dicionário com as condições para identificar os registros a serem removidos.
+            conditions (dict): Dicionário com as condições para identificar os registros a serem removidos
+                (aceita sufixos de comparação, ex.: {"data_solicitacao__lt": data}).
+            batch_size (int, optional): Se informado, exclui em lotes de até `batch_size`
+                linhas, com um commit por lote, em vez de uma única transação. Linhas
+                bloqueadas por outras transações são puladas.
+            key (str, optional): Coluna usada para escolher as linhas de cada lote
+                (padrão: a chave primária da tabela).
+            pause (float, optional): Segundos de espera entre os lotes, para reduzir
+                o impacto da limpeza (WAL, réplicas, autovacuum) na aplicação.
+
+        Returns:
+            int: Número de registros removidos.
         """
         query_builder = DeleteQuery(table, conditions)
-        query = query_builder.build_query()
+        total = 0
+
+        with borrow_connection(self.source) as conn:
+            with conn.cursor() as cur:
+                if batch_size is None:
+                    statement, params = query_builder.build_query()
+                    batches = [(statement, params)]
+                else:
+                    key = key or primary_key(cur, table)
+                    statement, params = query_builder.build_batch_query(key, batch_size)
+                    batches = itertools.repeat((statement, params))
+
+                for statement, params in batches:
+                    try:
+                        execute(cur, statement, params)
+                        deleted = cur.rowcount
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+
+                    total += deleted
+                    if batch_size is None or deleted < batch_size:
+                        break
+                    if pause:
+                        time.sleep(pause)
+
+        if total:
+            mark_written(table, deleted=True)
+        print(f"{total} registro(s) removido(s) de '{table}'.")
+        return total
+
+    def delete_ids(self, table, ids, key=None, batch_size=1000, pause=0):
+        """
+        Remove registros por uma lista de chaves, com `key = ANY(%s)` e um
+        commit a cada `batch_size` chaves.
+
+        Args:
+            table (str): Nome da tabela.
+            ids (iterable): Chaves dos registros a remover (pode ser um gerador).
+            key (str, optional): Coluna das chaves (padrão: a chave primária da tabela).
+            batch_size (int, optional): Chaves por lote/transação.
+            pause (float, optional): Segundos de espera entre os lotes.
+
+        Returns:
+            int: Número de registros removidos.
+        """
+        total = 0
+
+        with borrow_connection(self.source) as conn:
+            with conn.cursor() as cur:
+                key = key or primary_key(cur, table)
+                for i, batch in enumerate(chunked(ids, batch_size)):
+                    if i and pause:
+                        time.sleep(pause)
 
-        with self.connection.cursor() as cur:
-            cur.execute(query)
-            self.connection.commit()
-            print(f"Registro removido de '{table}'.")
+                    statement, params = DeleteQuery(table, {key: batch}).build_query()
+                    try:
+                        execute(cur, statement, params)
+                        total += cur.rowcount
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+
+        if total:
+            mark_written(table, deleted=True)
+        print(f"{total} registro(s) removido(s) de '{table}'.")
+        return total
 
     def update_record(self, query, params=None):
         """
         Atualiza registros no banco de dados usando uma query SQL personalizada.
+        Como a tabela não é conhecida, não invalida os caches do Django (ver
+        `mark_written`).
 
         Args:
             query (str): Query SQL de atualização.
@@ -115,9 +413,57 @@ class Main:
         Returns:
             int: Número de linhas afetadas pela atualização.
         """
-        updater = UpdateQuery(self.connection)
-        rows_affected = updater.execute(query, params)
+        with borrow_connection(self.source) as conn:
+            updater = UpdateQuery(conn)
+            rows_affected = updater.execute(query, params)
         print(f"{rows_affected} linha(s) atualizada(s).")
+        return rows_affected
+
+    def update_many(self, table, rows, key=None, batch_size=1000):
+        """
+        Atualiza muitos registros, cada um com seus próprios valores, com um
+        `UPDATE ... FROM (VALUES ...)` e um commit a cada `batch_size` registros.
+
+        Args:
+            table (str): Nome da tabela.
+            rows (iterable[dict]): Registros com a chave e as colunas a atualizar,
+                ex.: [{"id_tarefas": 1, "status": "Concluída"}, ...].
+            key (str, optional): Coluna que identifica os registros (padrão: a
+                chave primária da tabela).
+            batch_size (int, optional): Registros por comando/transação.
+
+        Returns:
+            int: Número de linhas atualizadas.
+        """
+        with borrow_connection(self.source) as conn:
+            if key is None:
+                with conn.cursor() as cur:
+                    key = primary_key(cur, table)
+            rows_affected = UpdateQuery(conn).execute_batch(table, key, rows, page_size=batch_size)
+        if rows_affected:
+            mark_written(table)
+        print(f"{rows_affected} linha(s) atualizada(s).")
+        return rows_affected
+
+    def update_values(self, table, values, conditions):
+        """
+        Atualiza colunas dos registros que atendem às condições, com um comando
+        compilado e em cache (ver `UpdateQuery.build_query`).
+
+        Args:
+            table (str): Nome da tabela.
+            values (dict): Novos valores {coluna: valor}.
+            conditions (dict): Condições para identificar os registros.
+
+        Returns:
+            int: Número de linhas afetadas pela atualização.
+        """
+        with borrow_connection(self.source) as conn:
+            rows_affected = UpdateQuery(conn).update(table, values, conditions)
+        if rows_affected:
+            mark_written(table)
+        print(f"{rows_affected} linha(s) atualizada(s).")
+        return rows_affected
 
 
 if __name__ == "__main__":
@@ -126,26 +472,28 @@ if __name__ == "__main__":
     # Criação do banco e tabelas
     app.create_database()
     app.create_tables()
+    app.create_indexes()
+    app.create_search()
 
-    # Inserindo um Lead
-    app.insert_record("leads", {
+    # Inserindo (ou atualizando, pelo CPF) um Lead
+    app.upsert_many("leads", [{
         "nome": "João Silva",
         "telefone": "11988887777",
         "email": "joao@example.com",
         "origem": "Instagram",
         "status_funil": "Novo",
         "cpf": "12345678911"
-    })
+    }])
 
-    # Inserindo um Cliente
-    app.insert_record("clientes", {
+    # Inserindo (ou atualizando, pelo CPF) um Cliente
+    app.upsert_many("clientes", [{
         "nome": "João Silva",
         "telefone": "11988887777",
         "email": "joao@example.com",
         "cpf": "12345678911",
         "plano_ativo": True,
         "id_lead": 1
-    })
+    }])
 
     # Inserindo um chamado de Suporte
     app.insert_record("suporte", {
@@ -160,15 +508,12 @@ if __name__ == "__main__":
     app.select_records("clientes")
 
     # Atualização de exemplo
-    app.update_record(
-        "UPDATE clientes SET plano_ativo = %s WHERE id_cliente = %s",
-        (False, 1)
-    )
+    app.update_values("clientes", {"plano_ativo": False}, {"id_cliente": 1})
 
     # Exclusão de exemplo
     app.delete_record("suporte", {"id_chamado": 1})
 
     print("\n Consulta com tres tabelas")
     from actions.addons import AddonsQuery
-    addons = AddonsQuery(app.connection)
+    addons = AddonsQuery(app.source)
     addons.select_leads_clientes_suporte()
@@ -66,8 +66,13 @@ def criar_banco_e_tabelas():
     try:
         connection = ConnectionDB().create_connection()
         if connection:
-            creator = CreateTables(connection)
+            creator = CreateTables(
+                connection,
+                partitioned_suporte=os.getenv('SUPORTE_PARTICIONADO', 'False') == 'True',
+            )
             creator.execute()
+            creator.create_indexes()
+            creator.create_search()
             connection.close()
         else:
             print("   -> Erro: Nao foi possivel conectar ao banco de dados.")
@@ -0,0 +1,20 @@
+"""
+Testes das classes de `actions` (sem banco de dados).
+"""
+from psycopg2 import sql
+
+
+def render(composable):
+    """
+    Texto de um `sql.Composable` sem conexão (o `as_string` do psycopg2 precisa
+    de uma para citar identificadores); os identificadores saem entre aspas duplas.
+    """
+    if isinstance(composable, sql.Composed):
+        return "".join(render(part) for part in composable)
+    if isinstance(composable, sql.Identifier):
+        return ".".join('"' + nome.replace('"', '""') + '"' for nome in composable.strings)
+    if isinstance(composable, sql.Placeholder):
+        return f"%({composable.name})s" if composable.name else "%s"
+    if isinstance(composable, sql.Literal):
+        return repr(composable.wrapped)
+    return composable.string
@@ -0,0 +1,155 @@
+"""
+Testes do pool de conexões psycopg2 (utils/connection_db.py), com conexões falsas.
+"""
+import unittest
+from unittest import mock
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+
+from utils.connection_db import ConnectionPool, PoolTimeoutError
+
+
+class _Cursor:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.morta:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.conn.pings += 1
+
+
+class _Conexao:
+    """Conexão psycopg2 falsa: `morta` faz o SELECT 1 falhar."""
+
+    def __init__(self):
+        self.closed = 0
+        self.morta = False
+        self.pings = 0
+        self.rollbacks = 0
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.abertas = []
+        self.relogio = 1000.0
+        self.enterContext(mock.patch("utils.connection_db.time.monotonic", lambda: self.relogio))
+
+    def _connect(self):
+        conn = _Conexao()
+        self.abertas.append(conn)
+        return conn
+
+    def _pool(self, **kwargs):
+        opcoes = {"min_size": 0, "max_size": 2, "timeout": 0, "max_idle": 60, "pre_ping": False}
+        opcoes.update(kwargs)
+        return ConnectionPool(self._connect, **opcoes)
+
+    def test_abre_min_size_conexoes(self):
+        pool = self._pool(min_size=2)
+        self.assertEqual(pool.size, 2)
+        self.assertEqual(len(self.abertas), 2)
+
+    def test_reutiliza_a_conexao_devolvida(self):
+        pool = self._pool()
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.size, 1)
+
+    def test_esgotado_levanta_timeout(self):
+        pool = self._pool(max_size=1)
+        pool.getconn()
+        with self.assertRaises(PoolTimeoutError):
+            pool.getconn()
+
+    def test_desfaz_transacao_pendente_na_devolucao(self):
+        pool = self._pool()
+        conn = pool.getconn()
+        conn.status = TRANSACTION_STATUS_INTRANS
+        pool.putconn(conn)
+        self.assertEqual(conn.rollbacks, 1)
+        self.assertIs(pool.getconn(), conn)
+
+    def test_descarta_conexao_marcada(self):
+        pool = self._pool()
+        conn = pool.getconn()
+        pool.putconn(conn, discard=True)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.size, 0)
+        self.assertIsNot(pool.getconn(), conn)
+
+    def test_recicla_conexao_ociosa_alem_de_max_idle(self):
+        pool = self._pool()
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.relogio += 61
+        nova = pool.getconn()
+        self.assertIsNot(nova, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_mantem_min_size_mesmo_ociosas(self):
+        pool = self._pool(min_size=1)
+        conn = self.abertas[0]
+        self.relogio += 61
+        self.assertIs(pool.getconn(), conn)
+
+    def test_pre_ping_troca_conexao_morta(self):
+        pool = self._pool(pre_ping=True)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.morta = True
+        nova = pool.getconn()
+        self.assertIsNot(nova, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_pre_ping_valida_conexao_reutilizada(self):
+        pool = self._pool(pre_ping=True)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(conn.pings, 1)
+
+    def test_bloco_with_descarta_conexao_quebrada(self):
+        pool = self._pool()
+        with self.assertRaises(psycopg2.OperationalError):
+            with pool.connection() as conn:
+                conn.closed = 2
+                raise psycopg2.OperationalError("conexão perdida")
+        self.assertEqual(pool.size, 0)
+
+    def test_closeall_impede_novos_emprestimos(self):
+        pool = self._pool(min_size=1)
+        pool.closeall()
+        self.assertTrue(self.abertas[0].closed)
+        with self.assertRaises(psycopg2.InterfaceError):
+            pool.getconn()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Testes do upsert em lote e do COPY (InsertQuery.build_upsert_query e build_copy).
+"""
+import unittest
+
+from actions.insert import InsertQuery
+from tests import render
+
+
+CLIENTES = [
+    {"cpf": "111", "nome": "Ana", "email": "ana@x.com", "telefone": None},
+    {"cpf": "222", "nome": "Bia", "email": None, "telefone": "9999"},
+]
+
+
+class BuildUpsertQueryTests(unittest.TestCase):
+
+    def test_sobrescreve_e_ignora_linhas_iguais(self):
+        statement, values = InsertQuery("clientes", CLIENTES).build_upsert_query()
+        self.assertEqual(
+            render(statement.composed),
+            'INSERT INTO "clientes" AS t ("cpf", "nome", "email", "telefone") VALUES %s ON CONFLICT ("cpf") '
+            'DO UPDATE SET ("nome", "email", "telefone") = ROW(EXCLUDED."nome", EXCLUDED."email", EXCLUDED."telefone") '
+            'WHERE (t."nome", t."email", t."telefone") IS DISTINCT FROM '
+            '(EXCLUDED."nome", EXCLUDED."email", EXCLUDED."telefone") '
+            'RETURNING (xmax = 0)',
+        )
+        self.assertEqual(values, [("111", "Ana", "ana@x.com", None), ("222", "Bia", None, "9999")])
+        self.assertFalse(statement.preparable)
+
+    def test_regras_por_coluna(self):
+        statement, _ = InsertQuery("clientes", CLIENTES).build_upsert_query(
+            merge={"email": "coalesce", "telefone": "fill", "nome": "keep"},
+        )
+        self.assertIn(
+            'DO UPDATE SET ("email", "telefone") = '
+            'ROW(COALESCE(EXCLUDED."email", t."email"), COALESCE(t."telefone", EXCLUDED."telefone"))',
+            render(statement.composed),
+        )
+
+    def test_tudo_keep_nao_atualiza(self):
+        statement, _ = InsertQuery("clientes", CLIENTES).build_upsert_query(default="keep")
+        self.assertTrue(render(statement.composed).endswith('ON CONFLICT ("cpf") DO NOTHING RETURNING (xmax = 0)'))
+
+    def test_formatos_distintos_por_regra(self):
+        sobrescreve, _ = InsertQuery("clientes", CLIENTES).build_upsert_query()
+        preenche, _ = InsertQuery("clientes", CLIENTES).build_upsert_query(default="fill")
+        self.assertNotEqual(sobrescreve.name, preenche.name)
+
+    def test_exige_coluna_de_conflito(self):
+        with self.assertRaises(ValueError):
+            InsertQuery("clientes", [{"nome": "Ana"}]).build_upsert_query()
+
+    def test_regra_invalida(self):
+        with self.assertRaises(ValueError):
+            InsertQuery("clientes", CLIENTES).build_upsert_query(merge={"email": "soma"})
+
+
+class BuildCopyTests(unittest.TestCase):
+
+    def test_comando_copy_em_csv(self):
+        statement, _ = InsertQuery("clientes", CLIENTES).build_copy()
+        self.assertEqual(
+            render(statement.composed),
+            'COPY "clientes" ("cpf", "nome", "email", "telefone") FROM STDIN WITH (FORMAT csv)',
+        )
+        self.assertFalse(statement.preparable)
+
+    def test_none_sem_aspas_e_string_vazia_entre_aspas(self):
+        _, buffer = InsertQuery("clientes", [
+            {"cpf": "111", "nome": "", "email": None, "telefone": 'a,"b"'},
+        ]).build_copy()
+        self.assertEqual(buffer.read(), '"111","",,"a,""b"""\n')
+
+    def test_colunas_extras_vem_antes(self):
+        statement, buffer = InsertQuery("clientes", CLIENTES).build_copy(extra_columns={"id_cliente": [7, 8]})
+        self.assertTrue(render(statement.composed).startswith(
+            'COPY "clientes" ("id_cliente", "cpf", "nome", "email", "telefone")'
+        ))
+        self.assertEqual(buffer.read().splitlines(), [
+            '"7","111","Ana","ana@x.com",',
+            '"8","222","Bia",,"9999"',
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
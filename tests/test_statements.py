@@ -0,0 +1,120 @@
+"""
+Testes dos comandos compilados (actions/statements.py).
+"""
+import unittest
+from unittest import mock
+
+from psycopg2 import sql
+
+from actions import statements
+from actions.select import SelectQuery
+from actions.statements import Statement, compiled, reset_catalog, where
+from tests import render
+
+
+class PrepareTextTests(unittest.TestCase):
+
+    def _prepare_text(self, texto):
+        return Statement(("teste", texto), sql.SQL(texto)).prepare_text(None)
+
+    def test_numera_os_placeholders_em_ordem(self):
+        self.assertEqual(
+            self._prepare_text("SELECT * FROM t WHERE a = %s AND b = ANY(%s) AND c < %s"),
+            "SELECT * FROM t WHERE a = $1 AND b = ANY($2) AND c < $3",
+        )
+
+    def test_percentual_literal_nao_conta_como_parametro(self):
+        self.assertEqual(
+            self._prepare_text("SELECT * FROM t WHERE a LIKE 'x%%' AND b = %s"),
+            "SELECT * FROM t WHERE a LIKE 'x%' AND b = $1",
+        )
+
+    def test_percentual_literal_seguido_de_s(self):
+        self.assertEqual(
+            self._prepare_text("SELECT * FROM t WHERE a LIKE '%%s%%' AND b = %s"),
+            "SELECT * FROM t WHERE a LIKE '%s%' AND b = $1",
+        )
+
+    def test_sem_parametros(self):
+        self.assertEqual(self._prepare_text("SELECT 1"), "SELECT 1")
+
+
+class WhereTests(unittest.TestCase):
+
+    def test_igualdade_nulo_e_lista(self):
+        composed, params, shape = where({"id_cliente": 3, "cpf": None, "status": ["A", "B"]})
+        self.assertEqual(render(composed), '"id_cliente" = %s AND "cpf" IS NULL AND "status" = ANY(%s)')
+        self.assertEqual(params, [3, ["A", "B"]])
+        self.assertEqual(shape, (("id_cliente", "eq"), ("cpf", "null"), ("status", "any")))
+
+    def test_sufixos_de_comparacao(self):
+        composed, params, shape = where({
+            "data__lt": 1, "data__lte": 2, "valor__gt": 3, "valor__gte": 4, "tipo__ne": "Receita",
+        })
+        self.assertEqual(
+            render(composed),
+            '"data" < %s AND "data" <= %s AND "valor" > %s AND "valor" >= %s AND "tipo" <> %s',
+        )
+        self.assertEqual(params, [1, 2, 3, 4, "Receita"])
+        self.assertEqual(shape, (("data", "lt"), ("data", "lte"), ("valor", "gt"), ("valor", "gte"), ("tipo", "ne")))
+
+    def test_sufixo_com_none_continua_parametro(self):
+        composed, params, _ = where({"data__lt": None})
+        self.assertEqual(render(composed), '"data" < %s')
+        self.assertEqual(params, [None])
+
+    def test_formato_nao_depende_dos_valores(self):
+        self.assertEqual(where({"data__lt": 1})[2], where({"data__lt": 2})[2])
+        self.assertNotEqual(where({"data__lt": 1})[2], where({"data__gt": 1})[2])
+
+    def test_sufixo_invalido(self):
+        with self.assertRaises(ValueError):
+            where({"data__between": (1, 2)})
+
+
+class CompiledCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(statements, "_statements", statements.OrderedDict()))
+        self.enterContext(mock.patch.object(statements, "MAX_STATEMENTS", 2))
+
+    def _compilar(self, nome):
+        return compiled(("teste", nome), lambda: sql.SQL(nome))
+
+    def test_reutiliza_o_comando_compilado(self):
+        self.assertIs(self._compilar("a"), self._compilar("a"))
+
+    def test_remove_o_usado_ha_mais_tempo(self):
+        a = self._compilar("a")
+        self._compilar("b")
+        self._compilar("a")
+        self._compilar("c")
+        self.assertEqual(list(statements._statements), [("teste", "a"), ("teste", "c")])
+        self.assertIs(self._compilar("a"), a)
+
+    def test_where_em_texto_nao_entra_no_cache(self):
+        statement, _ = SelectQuery("leads", ["nome"], "status_funil = 'Novo'").build_query()
+        self.assertFalse(statement.preparable)
+        self.assertEqual(len(statements._statements), 0)
+        statement, _ = SelectQuery("leads", ["nome"], {"status_funil": "Novo"}).build_query()
+        self.assertTrue(statement.preparable)
+        self.assertEqual(len(statements._statements), 1)
+
+
+class ResetCatalogTests(unittest.TestCase):
+
+    def test_esquece_chaves_e_tipos(self):
+        statements._primary_keys["tabela_teste"] = "id"
+        statements._column_types["tabela_teste"] = {"id": "integer"}
+        reset_catalog()
+        self.assertNotIn("tabela_teste", statements._primary_keys)
+        self.assertNotIn("tabela_teste", statements._column_types)
+
+    def test_forget_prepared_tambem_esquece_o_catalogo(self):
+        statements._primary_keys["tabela_teste"] = "id"
+        statements.forget_prepared(type("Conexao", (), {})())
+        self.assertNotIn("tabela_teste", statements._primary_keys)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Testes da atualização em lote (UpdateQuery.build_batch_query).
+"""
+import unittest
+
+from actions.statements import _column_types
+from actions.update import UpdateQuery
+from tests import render
+
+
+class _CatalogCursor:
+    """Cursor que responde à consulta de tipos de `column_types`."""
+
+    def __init__(self, types):
+        self.types = types
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return list(self.types.items())
+
+
+class BuildBatchQueryTests(unittest.TestCase):
+
+    def setUp(self):
+        _column_types.pop("financeiro_teste", None)
+        self.cursor = _CatalogCursor({
+            "id_financeiro": "integer",
+            "valor": "numeric(10,2)",
+            "data": "date",
+            "tipo": "character varying(50)",
+        })
+
+    def test_comando_template_e_valores(self):
+        statement, template, values = UpdateQuery.build_batch_query(self.cursor, "financeiro_teste", "id_financeiro", [
+            {"id_financeiro": 1, "valor": 10, "data": None},
+            {"data": "2025-01-01", "id_financeiro": 2, "valor": 20},
+        ])
+        self.assertEqual(
+            render(statement.composed),
+            'UPDATE "financeiro_teste" AS t SET "valor" = v."valor", "data" = v."data" '
+            'FROM (VALUES %s) AS v ("id_financeiro", "valor", "data") '
+            'WHERE t."id_financeiro" = v."id_financeiro"',
+        )
+        self.assertEqual(render(template.composed), "(%s::integer, %s::numeric(10,2), %s::date)")
+        self.assertEqual(values, [(1, 10, None), (2, 20, "2025-01-01")])
+        self.assertFalse(statement.preparable)
+
+    def test_exige_coluna_alem_da_chave(self):
+        with self.assertRaises(ValueError):
+            UpdateQuery.build_batch_query(self.cursor, "financeiro_teste", "id_financeiro", [{"id_financeiro": 1}])
+
+    def test_registros_com_colunas_diferentes(self):
+        with self.assertRaises(ValueError):
+            UpdateQuery.build_batch_query(self.cursor, "financeiro_teste", "id_financeiro", [
+                {"id_financeiro": 1, "valor": 10},
+                {"id_financeiro": 2, "tipo": "Receita"},
+            ])
+
+    def test_coluna_inexistente(self):
+        with self.assertRaises(ValueError):
+            UpdateQuery.build_batch_query(self.cursor, "financeiro_teste", "id_financeiro", [
+                {"id_financeiro": 1, "saldo": 10},
+            ])
+
+
+if __name__ == "__main__":
+    unittest.main()
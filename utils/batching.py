@@ -0,0 +1,17 @@
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """
+    Divide um iterável (inclusive geradores) em listas de até `size` itens,
+    sem materializar o iterável inteiro em memória.
+    """
+    if size < 1:
+        raise ValueError("O tamanho do lote deve ser maior que zero.")
+
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
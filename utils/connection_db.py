@@ -1,33 +1,302 @@
 import psycopg2
 import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+class PoolTimeoutError(Exception):
+    """Nenhuma conexão ficou disponível no pool dentro do tempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexões psycopg2 seguro para threads.
+
+    Mantém entre `min_size` e `max_size` conexões abertas, reutilizando as
+    mais recentes (LIFO) para aproveitar conexões "quentes". Conexões ociosas
+    há mais de `max_idle` segundos são recicladas e, com `pre_ping`, cada
+    conexão é validada com um `SELECT 1` antes de ser entregue.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0, max_idle=300.0, pre_ping=True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Tamanhos do pool inválidos: exige 0 <= min_size <= max_size e max_size >= 1.")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.pre_ping = pre_ping
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    @property
+    def size(self):
+        """Número total de conexões abertas (ociosas + emprestadas)."""
+        return self._size
+
+    def getconn(self):
+        """
+        Retira uma conexão do pool, abrindo uma nova se houver espaço.
+
+        Raises:
+            PoolTimeoutError: Se nenhuma conexão ficar livre dentro de `timeout`.
+        """
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            conn = None
+            with self._cond:
+                if self._closed:
+                    raise psycopg2.InterfaceError("Pool de conexões fechado.")
+
+                self._recycle_idle()
+
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Nenhuma conexão disponível após {self.timeout}s "
+                            f"(max_size={self.max_size})."
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+
+            if not self.pre_ping or self._ping(conn):
+                return conn
+
+            # Conexão morta (ex.: servidor reiniciado): descarta e tenta outra
+            self._close_quietly(conn)
+            self._release_slot()
+
+    def putconn(self, conn, discard=False):
+        """
+        Devolve uma conexão ao pool.
+
+        Conexões fechadas, quebradas ou marcadas com `discard` são encerradas;
+        transações pendentes são desfeitas antes de a conexão voltar ao pool.
+        """
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._close_quietly(conn)
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão pelo tempo do bloco `with`.
+
+        Em caso de exceção a transação é desfeita; conexões que quebraram
+        durante o uso são descartadas em vez de voltarem ao pool.
+        """
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            self.putconn(conn, discard=conn.closed != 0)
+            raise
+        else:
+            self.putconn(conn)
+
+    def closeall(self):
+        """Fecha todas as conexões ociosas e impede novos empréstimos."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._close_quietly(conn)
+                self._size -= 1
+            self._cond.notify_all()
+
+    def _recycle_idle(self):
+        # Chamado com o lock adquirido: as mais antigas ficam à esquerda
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            conn, returned_at = self._idle[0]
+            if now - returned_at < self.max_idle:
+                break
+            self._idle.popleft()
+            self._close_quietly(conn)
+            self._size -= 1
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _ping(conn):
+        if conn.closed:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
 class ConnectionDB:
 
-    def __init__(self):
+    def __init__(self, pooled=False, min_size=None, max_size=None, timeout=None, max_idle=None, pre_ping=True):
         self.database = os.getenv("DB_NAME")
         self.user = os.getenv("DB_USER")
         self.password = os.getenv("DB_PASSWORD")
         self.host = os.getenv("DB_HOST")
         self.port = os.getenv("DB_PORT")
 
+        self.pool = None
+        if pooled:
+            self.pool = ConnectionPool(
+                self._connect,
+                min_size=min_size if min_size is not None else int(os.getenv("DB_POOL_MIN", 1)),
+                max_size=max_size if max_size is not None else int(os.getenv("DB_POOL_MAX", 10)),
+                timeout=timeout if timeout is not None else float(os.getenv("DB_POOL_TIMEOUT", 30)),
+                max_idle=max_idle if max_idle is not None else float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+                pre_ping=pre_ping,
+            )
+
+    def _connect(self):
+        return psycopg2.connect(
+            database=self.database,
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            port=self.port
+        )
+
     def create_connection(self):
-        
+
         try:
-            connection = psycopg2.connect(
-                database=self.database,
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                port=self.port
-            )
-            
+            connection = self._connect()
+
             print(f"Database connection established: {connection.status}")
             return connection
-        
+
         except Exception as e:
             print(f"Error connecting to database: {e}")
             return None
-        
\ No newline at end of file
+
+    @contextmanager
+    def connection(self):
+        """
+        Empresta uma conexão: do pool, se configurado, ou uma conexão
+        dedicada que é fechada ao final do bloco.
+        """
+        if self.pool is not None:
+            with self.pool.connection() as conn:
+                yield conn
+            return
+
+        conn = self._connect()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def close(self):
+        """Fecha o pool de conexões, se existir."""
+        if self.pool is not None:
+            self.pool.closeall()
+
+
+@contextmanager
+def borrow_connection(source):
+    """
+    Obtém uma conexão a partir de `source`, que pode ser um `ConnectionDB`
+    (a conexão é emprestada e devolvida ao final) ou uma conexão psycopg2
+    já aberta (usada diretamente, sem ser fechada).
+    """
+    if isinstance(source, ConnectionDB):
+        with source.connection() as conn:
+            yield conn
+    else:
+        yield source
+
+
+def stream_rows(source, query, params=None, itersize=2000, name=None):
+    """
+    Executa `query` num cursor nomeado (server-side) e gera as linhas aos
+    poucos, buscando `itersize` linhas por ida ao servidor.
+
+    A conexão fica emprestada enquanto o gerador é consumido e é devolvida
+    quando ele termina ou é fechado.
+
+    Args:
+        source: `ConnectionDB` ou conexão psycopg2 aberta.
+        query (str | psycopg2.sql.Composable): Consulta SELECT (um `;` final
+            é removido, pois o cursor nomeado a envolve em um DECLARE).
+        params (tuple, optional): Parâmetros da consulta.
+        itersize (int, optional): Linhas buscadas por lote.
+        name (str, optional): Nome do cursor; gerado automaticamente se omitido.
+    """
+    if isinstance(query, str):
+        query = query.strip().rstrip(';')
+
+    with borrow_connection(source) as conn:
+        # Só encerra a transação se ela foi aberta aqui, para não interferir
+        # em escritas pendentes de quem compartilha a conexão
+        owns_transaction = conn.get_transaction_status() == TRANSACTION_STATUS_IDLE
+        cursor = conn.cursor(name=name or f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = itersize
+
+        try:
+            cursor.execute(query, params)
+            for row in cursor:
+                yield row
+        finally:
+            cursor.close()
+            if owns_transaction and not conn.closed:
+                conn.rollback()
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
 ]
 
@@ -45,6 +46,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'wevo_media_project.urls'
@@ -53,8 +55,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates compilados uma única vez por processo
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -137,6 +145,99 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
+# Listagens: linhas por página na paginação por cursor (core/pagination.py)
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', 50))
+
+# HTML das linhas das listagens em cache até a próxima escrita nas tabelas
+# exibidas (tag cache_tabelas em core/templatetags/listas.py); 0 desativa.
+# Poupa a renderização das linhas, não a consulta da página
+LIST_CACHE_TTL = int(os.getenv('LIST_CACHE_TTL', 600))
+
+# Cache: com vários processos (gunicorn) use um backend compartilhado
+# (ex.: memcached/redis) para que invalidações cheguem a todos os workers
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'wevo-media'),
+    }
+}
+
+# Validação em cache do usuário logado (core/auth.py): segundos até revalidar
+# no banco e número máximo de usuários mantidos por processo
+USUARIO_CACHE_TTL = int(os.getenv('USUARIO_CACHE_TTL', 30))
+USUARIO_CACHE_MAX_SIZE = int(os.getenv('USUARIO_CACHE_MAX_SIZE', 1024))
+
+# Contadores do dashboard (core/counters.py): 'exato', 'estimado' (pg_class)
+# ou 'mantido' (triggers; ver manage.py instalar_contadores e
+# consolidar_contadores) e segundos em cache
+DASHBOARD_COUNTERS_MODE = os.getenv('DASHBOARD_COUNTERS_MODE', 'exato')
+DASHBOARD_COUNTERS_TTL = int(os.getenv('DASHBOARD_COUNTERS_TTL', 10))
+
+# Consultas especiais (core/reports.py): ler das materialized views
+# atualizadas por manage.py atualizar_relatorios, e idade (s) a partir da
+# qual os dados são sinalizados como desatualizados
+RELATORIOS_MATERIALIZADOS = os.getenv('RELATORIOS_MATERIALIZADOS', 'False') == 'True'
+RELATORIOS_IDADE_MAXIMA = int(os.getenv('RELATORIOS_IDADE_MAXIMA', 3600))
+
+# Cache dos resultados das consultas especiais, invalidado por escritas nas
+# tabelas lidas; o TTL (s) é apenas um limite de segurança
+RELATORIOS_CACHE_TTL = int(os.getenv('RELATORIOS_CACHE_TTL', 300))
+
+# Arquivo (core/archive.py): idade, em meses, a partir da qual chamados de
+# suporte e lançamentos do financeiro são movidos por manage.py arquivar
+ARQUIVO_HORIZONTE_MESES = int(os.getenv('ARQUIVO_HORIZONTE_MESES', 24))
+
+# Máximo de conexões assíncronas (psycopg 3) por event loop, usadas pelas
+# views de core/views_async.py
+ASYNC_DB_POOL_MAX = int(os.getenv('ASYNC_DB_POOL_MAX', 10))
+# Segundos ociosa até a conexão ser fechada / validada com SELECT 1 ao ser reutilizada
+ASYNC_DB_POOL_MAX_IDLE = float(os.getenv('ASYNC_DB_POOL_MAX_IDLE', 300))
+ASYNC_DB_POOL_PING_AFTER = float(os.getenv('ASYNC_DB_POOL_PING_AFTER', 5))
+
+# Hash de senhas (login e cadastro) em um pool de threads limitado
+# (core/auth.py): threads que calculam hashes ao mesmo tempo e hashes
+# pendentes a partir dos quais novas tentativas são recusadas (503)
+AUTH_HASH_THREADS = int(os.getenv('AUTH_HASH_THREADS', 2))
+AUTH_HASH_FILA = int(os.getenv('AUTH_HASH_FILA', 64))
+
+# Linhas lidas do banco por lote nas exportações CSV/XLSX
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# Instrumentação de SQL por requisição (core/middleware.py): cabeçalho
+# Server-Timing e aviso no log 'core.sql' quando a requisição passa do número
+# de consultas, do tempo no banco (ms) ou de repetições do mesmo comando
+SQL_INSTRUMENTACAO = os.getenv('SQL_INSTRUMENTACAO', 'False') == 'True'
+SQL_ORCAMENTO_CONSULTAS = int(os.getenv('SQL_ORCAMENTO_CONSULTAS', 30))
+SQL_ORCAMENTO_TEMPO_MS = int(os.getenv('SQL_ORCAMENTO_TEMPO_MS', 300))
+SQL_ORCAMENTO_REPETICOES = int(os.getenv('SQL_ORCAMENTO_REPETICOES', 5))
+
+if SQL_INSTRUMENTACAO:
+    MIDDLEWARE.insert(0, 'core.middleware.InstrumentacaoSQLMiddleware')
+
+# Armazenamento das sessões (SESSION_MODO):
+# - 'db': tabela django_session (uma leitura no banco por requisição);
+# - 'cache': cache 'sessoes' com gravação também no banco (cached_db); o
+#   banco só é lido quando a sessão não está no cache;
+# - 'cookie': cookie assinado, sem banco nem cache. Leva tudo o que é gravado
+#   na sessão (as chaves usuario_*, o `primario_ate` da réplica e as mensagens
+#   que não couberem no cookie de mensagens), assinado mas não cifrado: não
+#   grave segredos na sessão nesse modo. Para trocar a chave sem derrubar as
+#   sessões, mova a antiga para SECRET_KEY_FALLBACKS.
+# Sessões expiradas no banco são removidas por manage.py limpar_sessoes.
+SESSION_MODO = os.getenv('SESSION_MODO', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cached_db',
+    'cookie': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODO]
+SESSION_CACHE_ALIAS = 'sessoes'
+CACHES['sessoes'] = {
+    'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+    'LOCATION': os.getenv('SESSION_CACHE_LOCATION', os.getenv('CACHE_LOCATION', 'wevo-media-sessoes')),
+    'KEY_PREFIX': 'sessoes',
+}
+SESSION_COOKIE_AGE = int(os.getenv('SESSION_COOKIE_AGE', 1209600))
+
 # ============================================================================
 # CONFIGURAÇÕES DE PRODUÇÃO
 # ============================================================================
@@ -167,6 +268,7 @@ if not DEBUG:
 DEBUG = config('DEBUG', default=False, cast=bool)
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='*').split(',')
 SECRET_KEY = config('SECRET_KEY', default='sua-chave-secreta-aqui')
+SECRET_KEY_FALLBACKS = [chave for chave in config('SECRET_KEY_FALLBACKS', default='').split(',') if chave]
 
 # Database para produção
 if not DEBUG:
@@ -181,6 +283,22 @@ if not DEBUG:
         }
     }
 
+# Réplica de leitura (core/replica.py): com DB_REPLICA_HOST, listagens,
+# relatórios, dashboard e exportações leem do alias 'replica'; após uma
+# escrita, a sessão lê do default por REPLICA_JANELA_SEGUNDOS
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'USER': os.getenv('DB_REPLICA_USER', DATABASES['default'].get('USER')),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', DATABASES['default'].get('PASSWORD')),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default'].get('PORT')),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.replica.ReplicaRouter']
+REPLICA_JANELA_SEGUNDOS = int(os.getenv('REPLICA_JANELA_SEGUNDOS', 10))
+
 # Static files
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')